@@ -1,15 +1,17 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.users import User
 from auth.jwt_handler import verify_jwt_token
+from auth.cache import principal_cache
 from database.connection import get_session
 
 # 요청이 들어올 때, Authorization 헤더에 토큰을 추출
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/signin")
 
 
-async def authenticate(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)):
+async def authenticate(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)):
     if not token:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="액세스 토큰이 누락되었습니다.")
 
@@ -20,11 +22,23 @@ async def authenticate(token: str = Depends(oauth2_scheme), session: Session = D
     if not user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="유효하지 않은 토큰입니다.")
 
-    # user_id를 통해 User 객체를 데이터베이스에서 조회
-
-    user = session.query(User).filter(User.id == user_id).first()
+    user = await load_principal(session, user_id)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="사용자를 찾을 수 없습니다.")
 
-    return user  # 이제는 User 객체를 반환
\ No newline at end of file
+    return user  # 이제는 User 객체를 반환
+
+
+# user_id로 사용자 조회 (없으면 None)
+async def load_principal(session: AsyncSession, user_id: int) -> Optional[User]:
+    # 최근에 조회한 사용자면 캐시에서 가져옴 (요청마다 새 객체를 만들어 세션 간 공유를 피함)
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        return User(**cached)
+
+    # user_id를 통해 User 객체를 데이터베이스에서 조회
+    user = await session.get(User, user_id)
+    if user:
+        principal_cache.set(user_id, user.model_dump())
+    return user
@@ -0,0 +1,81 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import Any, Hashable, Optional
+from database.connection import get_settings
+
+settings = get_settings()
+
+
+# 크기 제한(LRU)과 항목별 만료 시간(TTL)을 가진 캐시
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl  # 기본 유효 시간 (None이면 set 호출 시 지정한 만료 시각만 사용)
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        if expires_at is None:
+            expires_at = time() + self.ttl
+        elif self.ttl is not None:
+            expires_at = min(expires_at, time() + self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# 서명 검증이 끝난 토큰의 페이로드 (토큰의 exp까지 유효)
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+# 사용자 정보 (짧게 유지, 삭제/권한 변경 시 무효화)
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+# 원본 토큰 대신 해시를 키로 사용
+def token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+# 사용자 삭제나 권한 변경 후 호출
+def invalidate_principal(user_id: int):
+    principal_cache.invalidate(user_id)
+
+
+def cache_stats() -> dict:
+    return {"token": token_cache.stats(), "principal": principal_cache.stats()}
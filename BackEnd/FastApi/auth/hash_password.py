@@ -1,9 +1,91 @@
-from passlib.context import CryptContext
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from database.connection import get_settings
+
+settings = get_settings()
+
+
+# passlib/bcrypt는 처음 해싱할 때 import
+def build_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+# 작업 스레드/프로세스마다 한 번만 만드는 CryptContext
+_worker_context = None
+
+
+def _context():
+    global _worker_context
+    if _worker_context is None:
+        _worker_context = build_context()
+    return _worker_context
+
+
+def _hash(password: str) -> str:
+    return _context().hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return _context().verify_and_update(plain_password, hashed_password)
+
+
+# 해싱 전용 실행기: 이벤트 루프와 기본 스레드 풀을 막지 않고, 대기열이 가득 차면 바로 거절
+class HashingPool:
+    def __init__(self, workers: int, queue_limit: int, kind: str = "thread"):
+        self.workers = workers
+        self.max_pending = workers + queue_limit
+        self.kind = kind
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="요청이 많아 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": "1"}
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self.pending, "max_pending": self.max_pending, "rejected": self.rejected}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hash_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    kind=settings.PASSWORD_HASH_EXECUTOR
+)
 
 
 class HashPassword:
-    def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # 인스턴스마다 만들지 않고 처음 쓸 때 공유 컨텍스트를 준비
+    @property
+    def pwd_context(self):
+        return _context()
 
     # 패스워드를 해싱하는 함수
     def hash_password(self, password: str):
@@ -12,3 +94,11 @@ class HashPassword:
     # 패스워드를 검증하는 함수
     def verify_password(self, plain_password: str, hashed_password: str):
         return self.pwd_context.verify(plain_password, hashed_password)
+
+    # 해싱 전용 풀에서 패스워드 해싱
+    async def hash_password_async(self, password: str) -> str:
+        return await hash_pool.submit(_hash, password)
+
+    # 해싱 전용 풀에서 검증하고, 해시 설정이 바뀌었으면 새 해시도 함께 반환
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await hash_pool.submit(_verify_and_update, plain_password, hashed_password)
@@ -1,24 +1,28 @@
 from time import time
 from fastapi import HTTPException, status
-from jose import jwt, JWTError
-from database.connection import Settings
+from database.connection import get_settings
+from auth.cache import token_cache, token_key
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-settings = Settings()
+# jose/cryptography는 처음 키를 읽거나 토큰을 다룰 때 import (앱 import 시간 단축)
+if TYPE_CHECKING:
+    from auth.jwt_keys import JWTKey
 
+settings = get_settings()
 
-# 키 파일 읽기
-def load_keys():
-    current_dir = Path(__file__).parent
-    with open(current_dir / "private.pem", "r") as f:
-        private_key = f.read()
-    with open(current_dir / "public.pem", "r") as f:
-        public_key = f.read()
-    return private_key, public_key
 
-
-private_key, public_key = load_keys()
+# 키 파일을 읽어 kid별 키 객체로 한 번만 파싱 (import 시점이 아니라 처음 서명/검증할 때)
+@lru_cache(maxsize=None)
+def load_keys() -> Tuple[Dict[str, "JWTKey"], "JWTKey"]:
+    from auth.jwt_keys import load_keyring
+    key_dir = Path(settings.JWT_KEY_DIR) if settings.JWT_KEY_DIR else Path(__file__).parent
+    keyring = load_keyring(settings.JWT_KEYS, key_dir)
+    signing_kid = settings.JWT_ACTIVE_KID or next(iter(keyring))
+    if keyring[signing_kid].private_key is None:
+        raise ValueError(f"{signing_kid} 키에 서명용 개인 키가 없습니다.")
+    return keyring, keyring[signing_kid]
 
 
 # Token 생성 함수
@@ -28,6 +32,7 @@ def create_tokens(
         access_expires: int = 3600,  # 1시간
         refresh_expires: int = 604800  # 7일
 ) -> Dict[str, str]:
+    from jose import jwt
     current_time = time()
 
     # Access Token 생성
@@ -48,8 +53,10 @@ def create_tokens(
         "type": "refresh"
     }
 
-    access_token = jwt.encode(access_payload, private_key, algorithm="RS256")
-    refresh_token = jwt.encode(refresh_payload, private_key, algorithm="RS256")
+    signing_key = load_keys()[1]
+    headers = {"kid": signing_key.kid}
+    access_token = jwt.encode(access_payload, signing_key.private_key, algorithm=signing_key.algorithm, headers=headers)
+    refresh_token = jwt.encode(refresh_payload, signing_key.private_key, algorithm=signing_key.algorithm, headers=headers)
 
     return {
         "access_token": access_token,
@@ -59,8 +66,21 @@ def create_tokens(
 
 # JWT 토큰 검증
 def verify_jwt_token(token: str, token_type: str = "access") -> Dict:
+    from jose import jwt, JWTError
+    from auth.jwt_keys import DEFAULT_KID
     try:
-        payload = jwt.decode(token, public_key, algorithms=["RS256"])
+        # 이미 서명을 검증한 토큰이면 캐시된 페이로드 사용
+        cache_key = token_key(token)
+        payload = token_cache.get(cache_key)
+        if payload is None:
+            # kid로 검증 키 선택 (회전 전 키로 서명된 토큰도 검증 가능)
+            kid = jwt.get_unverified_header(token).get("kid", DEFAULT_KID)
+            key = load_keys()[0].get(kid)
+            if key is None:
+                raise JWTError(f"알 수 없는 키 ID입니다: {kid}")
+            payload = jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+            if isinstance(payload.get("exp"), (int, float)):
+                token_cache.set(cache_key, payload, expires_at=payload["exp"])
 
         # 토큰 타입 검증
         if payload.get("type") != token_type:
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from jose import jwk
+from jose.backends.base import Key
+
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+DEFAULT_KID = "default"  # kid 헤더가 없는 기존 토큰용 키
+
+
+# python-jose에는 EdDSA가 없어서 cryptography의 Ed25519로 구현해 등록
+class Ed25519Key(Key):
+    def __init__(self, key, algorithm):
+        if isinstance(key, str):
+            key = key.encode()
+        if isinstance(key, bytes):
+            if b"PRIVATE" in key:
+                key = serialization.load_pem_private_key(key, password=None)
+            else:
+                key = serialization.load_pem_public_key(key)
+        if not isinstance(key, (Ed25519PrivateKey, Ed25519PublicKey)):
+            raise TypeError("Ed25519 키가 아닙니다.")
+        self._key = key
+        self._algorithm = algorithm
+
+    def sign(self, msg: bytes) -> bytes:
+        return self._key.sign(msg)
+
+    def verify(self, msg: bytes, sig: bytes) -> bool:
+        try:
+            self.public_key()._key.verify(sig, msg)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_key(self):
+        if isinstance(self._key, Ed25519PrivateKey):
+            return Ed25519Key(self._key.public_key(), self._algorithm)
+        return self
+
+
+jwk.register_key("EdDSA", Ed25519Key)
+
+
+# 한 번만 파싱해 둔 서명/검증 키
+class JWTKey(NamedTuple):
+    kid: str
+    algorithm: str
+    private_key: Optional[Key]  # 검증 전용 키(회전된 이전 키)는 None
+    public_key: Key
+
+
+def _read(path: Path) -> Optional[str]:
+    return path.read_text() if path.exists() else None
+
+
+# 키 파일 경로: default는 기존 private.pem/public.pem, 그 외는 {kid}.private.pem/{kid}.public.pem
+def _key_paths(key_dir: Path, kid: str):
+    if kid == DEFAULT_KID:
+        return key_dir / "private.pem", key_dir / "public.pem"
+    return key_dir / f"{kid}.private.pem", key_dir / f"{kid}.public.pem"
+
+
+# "kid=ALG,kid=ALG" 형식의 설정을 읽어 kid별 키 객체를 만듦
+def load_keyring(spec: str, key_dir: Path) -> Dict[str, JWTKey]:
+    keyring = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        kid, _, algorithm = entry.partition("=")
+        algorithm = algorithm or "RS256"
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"지원하지 않는 JWT 알고리즘입니다: {algorithm}")
+
+        private_path, public_path = _key_paths(key_dir, kid)
+        private_pem, public_pem = _read(private_path), _read(public_path)
+        if public_pem is None and private_pem is None:
+            raise FileNotFoundError(f"{kid} 키 파일을 찾을 수 없습니다: {public_path}")
+
+        private_key = jwk.construct(private_pem, algorithm) if private_pem else None
+        public_key = jwk.construct(public_pem, algorithm) if public_pem else private_key.public_key()
+        keyring[kid] = JWTKey(kid, algorithm, private_key, public_key)
+    return keyring
@@ -0,0 +1,60 @@
+# JWT 알고리즘별 서명/검증 처리량 비교
+# 실행: BackEnd/FastApi 디렉터리에서 `python -m benchmarks.bench_jwt [반복 횟수]`
+import sys
+import tempfile
+import time
+from pathlib import Path
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import jwt
+from auth.jwt_keys import load_keyring
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+KEY_FACTORIES = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+# 벤치마크용 키 파일을 임시 디렉터리에 생성
+def write_keys(key_dir: Path):
+    for algorithm, factory in KEY_FACTORIES.items():
+        private_key = factory()
+        (key_dir / f"{algorithm}.private.pem").write_bytes(private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+        (key_dir / f"{algorithm}.public.pem").write_bytes(private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ))
+
+
+def measure(fn) -> float:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return ITERATIONS / (time.perf_counter() - started)
+
+
+def main():
+    key_dir = Path(tempfile.mkdtemp())
+    write_keys(key_dir)
+    keyring = load_keyring(",".join(f"{algorithm}={algorithm}" for algorithm in KEY_FACTORIES), key_dir)
+    payload = {"user": "bench@example.com", "user_id": 1, "iat": time.time(), "exp": time.time() + 3600, "type": "access"}
+
+    print(f"반복 {ITERATIONS}회 (ops/sec)")
+    print(f"{'algorithm':<10}{'sign':>12}{'verify':>12}{'sign (PEM)':>14}")
+    for kid, key in keyring.items():
+        private_pem = (key_dir / f"{kid}.private.pem").read_text()
+        token = jwt.encode(payload, key.private_key, algorithm=key.algorithm)
+
+        sign = measure(lambda: jwt.encode(payload, key.private_key, algorithm=key.algorithm))
+        verify = measure(lambda: jwt.decode(token, key.public_key, algorithms=[key.algorithm]))
+        # 기존 방식: 호출할 때마다 PEM 문자열을 다시 파싱
+        sign_pem = measure(lambda: jwt.encode(payload, private_pem, algorithm=key.algorithm))
+        print(f"{kid:<10}{sign:>12.0f}{verify:>12.0f}{sign_pem:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# 동시 요청이 이벤트 루프에서 직렬화되지 않는지 확인하는 벤치마크
+# 실행: BackEnd/FastApi 디렉터리에서 `python -m benchmarks.bench_session_concurrency`
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+
+from sqlalchemy import event, text
+from sqlmodel import Session, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import settings, create_engine_from_settings
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+QUERY_DELAY = 0.1  # 느린 쿼리 하나가 걸리는 시간 (초)
+SLOW_QUERY = text("SELECT slow_query()")
+
+
+# SQLite에 일정 시간 걸리는 함수를 등록해 느린 쿼리를 흉내 냄
+def register_slow_query(dbapi_connection, connection_record):
+    def slow_query():
+        time.sleep(QUERY_DELAY)
+        return 1
+    dbapi_connection.create_function("slow_query", 0, slow_query)
+
+
+# 블로킹 세션: 기존 create_engine + Session 방식
+async def run_sync_requests():
+    engine = create_engine(settings.DATABASE_URL)
+    event.listen(engine, "connect", register_slow_query)
+
+    async def request():
+        with Session(engine) as session:
+            session.exec(SLOW_QUERY).one()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(CONCURRENCY)))
+    return time.perf_counter() - started
+
+
+# 비동기 세션: get_session이 사용하는 AsyncSession 방식
+async def run_async_requests():
+    engine = create_engine_from_settings(settings)
+    event.listen(engine.sync_engine, "connect", register_slow_query)
+    # 앱의 세션 설정과 같은 세션을 느린 쿼리 함수를 등록한 엔진에 연결
+    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def request():
+        async with async_session() as session:
+            (await session.exec(SLOW_QUERY)).one()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed
+
+
+async def main():
+    sync_elapsed = await run_sync_requests()
+    async_elapsed = await run_async_requests()
+
+    print(f"동시 요청 {CONCURRENCY}개, 쿼리당 {QUERY_DELAY:.2f}초")
+    print(f"  sync  Session      : {sync_elapsed:.3f}s")
+    print(f"  async AsyncSession : {async_elapsed:.3f}s")
+    print(f"  speedup            : {sync_elapsed / async_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+# 앱 시작 시간 측정: `import main`의 모듈별 import 시간(-X importtime)과 lifespan 시작 시간
+# 실행: BackEnd/FastApi 디렉터리에서 `python -m benchmarks.bench_startup [반복 횟수]`
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from statistics import median
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+TOP = 15
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# 새 프로세스에서 앱을 import하고 lifespan을 한 번 실행해 startup_profile을 출력
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+
+async def run():
+    async with main.app.router.lifespan_context(main.app):
+        pass
+
+asyncio.run(run())
+print(json.dumps({"wall_import_seconds": imported, **main.startup_profile}))
+"""
+
+
+def _run(env: dict, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE]
+    return subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+
+
+# 최상위 패키지별 자체 import 시간 합계 (마이크로초)
+def _by_package(stderr: str) -> dict:
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            totals[match.group(4).split(".")[0]] += int(match.group(1))
+    return totals
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix="bench-startup-")
+    base_env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(work_dir, 'startup.db')}",
+        "UPLOAD_DIR": os.path.join(work_dir, "uploads/"),
+        "PYTHONPATH": os.getcwd(),
+    }
+    _run(base_env)  # 스키마 생성과 .pyc 캐시 준비 (측정에서 제외)
+
+    print(f"{'mode':<8}{'import s':>10}{'lifespan s':>12}")
+    for mode in ("lazy", "eager"):
+        env = {**base_env, "STARTUP_MODE": mode}
+        profiles = [json.loads(_run(env).stdout.strip().splitlines()[-1]) for _ in range(RUNS)]
+        print(f"{mode:<8}{median(p['wall_import_seconds'] for p in profiles):>10.3f}"
+              f"{median(p['lifespan_seconds'] for p in profiles):>12.3f}")
+
+    totals = _by_package(_run(base_env, importtime=True).stderr)
+    print(f"\nimport 시간 상위 {TOP}개 패키지 (자체 시간 합계)")
+    for package, micros in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:TOP]:
+        print(f"  {package:<24}{micros / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
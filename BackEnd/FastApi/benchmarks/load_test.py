@@ -0,0 +1,286 @@
+# /user/* 엔드포인트 부하 테스트: 데이터를 시드하고 시나리오별로 동시 요청을 보내 p50/p95/p99와 처리량을 측정
+# 실행: BackEnd/FastApi 디렉터리에서 `python -m benchmarks.load_test`
+#   --database-url postgresql://... 로 PostgreSQL에서 실행 (기본: 임시 SQLite)
+#   --url http://localhost:8000 으로 실행 중인 서버에 요청 (같은 DB를 --database-url로 지정)
+#   --update-baseline 으로 현재 결과를 기준값으로 저장, 기준값보다 느려지면 종료 코드 1
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from statistics import median
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+WORDS = ["회의", "메모", "일정", "프로젝트", "여행", "독서", "운동", "report", "draft", "meeting", "plan", "note"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="user 라우터 부하 테스트")
+    parser.add_argument("--database-url", default=None, help="기본: 임시 디렉터리의 SQLite")
+    parser.add_argument("--url", default=None, help="실행 중인 서버 주소 (없으면 앱을 프로세스 안에서 실행)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--max-files", type=int, default=3, help="페이지당 최대 첨부 수")
+    parser.add_argument("--requests", type=int, default=300, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3, help="시나리오 반복 횟수 (지표는 중앙값)")
+    parser.add_argument("--scenarios", default=None, help="쉼표로 구분한 시나리오 이름 (기본: 전체)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="기준값 대비 허용 악화 비율 (공유 CI 장비의 편차 고려)")
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args()
+
+
+args = parse_args()
+work_dir = tempfile.mkdtemp(prefix="load-test-")
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(work_dir, 'load.db')}"
+os.environ.setdefault("UPLOAD_DIR", os.path.join(work_dir, "uploads/"))
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")  # 한 IP에서 처리량을 재므로 인증 요청 제한은 끔
+
+import httpx
+from sqlalchemy import insert, update
+from sqlmodel import select
+from database.connection import async_session, conn
+from models.users import Blob, FileModel, Page, User
+from auth.hash_password import HashPassword
+from auth.jwt_handler import create_tokens
+from services.calendar import rebuild_day_counts
+from services.page_content import insert_contents, make_excerpt
+from services.search import reindex_all_pages
+from main import app
+
+PASSWORD = "load-test-password"
+WRITE_SCENARIOS = {"create_page"}
+REQUEST_LIMITS = {"signin": 60}  # bcrypt 해시 검증이 요청마다 수백 ms라 요청 수를 제한
+SQLITE_WRITE_CONCURRENCY = 4  # SQLite는 쓰기가 DB 단위로 잠겨 동시 쓰기가 많으면 "database is locked"
+
+
+# 사용자, 기간에 고르게 퍼진 페이지, 첨부 메타데이터를 한 번에 삽입
+async def seed(rng: random.Random) -> dict:
+    await conn()
+    password_hash = HashPassword().hash_password(PASSWORD)
+    start = datetime(2024, 1, 1)
+    async with async_session() as session:
+        await session.execute(insert(User), [
+            {"email": f"user{i}@example.com", "password": password_hash, "username": f"user{i:04d}", "is_admin": i == 0}
+            for i in range(args.users)
+        ])
+        user_ids = (await session.exec(select(User.id).order_by(User.id))).all()
+
+        blobs = [
+            {"hash": f"{i:064x}", "path": f"uploads/seed/{i}", "size": 1024 * (i + 1), "ref_count": 0}
+            for i in range(20)
+        ]
+        await session.execute(insert(Blob), blobs)
+
+        titles = []
+        for offset in range(0, args.pages, 1000):
+            pages, contents, files = [], [], []
+            for i in range(offset, min(offset + 1000, args.pages)):
+                created_at = start + timedelta(minutes=rng.randrange(365 * 24 * 60))
+                title = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}"
+                titles.append(title)
+                page_id = f"seed-{i:08d}"
+                content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 400)))
+                contents.append((page_id, content))
+                pages.append({
+                    "id": page_id,
+                    "title": title,
+                    "excerpt": make_excerpt(content),
+                    "public": rng.random() < 0.7,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "scheduled_at": created_at + timedelta(days=rng.randint(0, 30)),
+                    "owner_id": rng.choice(user_ids),
+                })
+                for _ in range(rng.randint(0, args.max_files)):
+                    blob = rng.choice(blobs)
+                    blob["ref_count"] += 1
+                    files.append({
+                        "filename": f"file{i}.pdf", "fileurl": blob["path"], "blob_hash": blob["hash"],
+                        "content_type": "application/pdf", "size": blob["size"], "created_at": created_at,
+                        "page_id": page_id,
+                    })
+            await session.execute(insert(Page), pages)
+            await insert_contents(session, contents)
+            if files:
+                await session.execute(insert(FileModel), files)
+        for blob in blobs:
+            await session.execute(update(Blob).where(Blob.hash == blob["hash"]).values(ref_count=blob["ref_count"]))
+        await session.commit()
+
+        await reindex_all_pages(session)
+        await rebuild_day_counts(session)
+
+    tokens = [create_tokens(f"user{i}@example.com", user_id)["access_token"] for i, user_id in enumerate(user_ids)]
+    return {"user_ids": user_ids, "tokens": tokens, "titles": titles}
+
+
+# 시나리오: 요청 하나를 만드는 함수 (rng, 시드 데이터) -> (method, url, kwargs)
+def _auth(data, rng):
+    return {"Authorization": f"Bearer {rng.choice(data['tokens'])}"}
+
+
+def _month(rng):
+    start = datetime(2024, rng.randint(1, 12), 1)
+    return {"start_date": start.isoformat(), "end_date": (start + timedelta(days=31)).isoformat()}
+
+
+SCENARIOS = {
+    "signin": lambda rng, data: (
+        "POST", "/user/signin",
+        {"json": {"email": f"user{rng.randrange(args.users)}@example.com", "password": PASSWORD}}
+    ),
+    "list_public": lambda rng, data: ("GET", "/user/pages", {"params": {"limit": rng.choice([20, 50, 100])}}),
+    "list_titles": lambda rng, data: (
+        "GET", "/user/pages/titles", {"params": {"order_by": rng.choice(["asc", "desc"])}}
+    ),
+    "users_details": lambda rng, data: ("GET", "/user/users/details", {}),
+    "page_by_title": lambda rng, data: (
+        "GET", "/user/pages/", {"params": {"title": rng.choice(data["titles"])}, "headers": _auth(data, rng)}
+    ),
+    "calendar_view": lambda rng, data: (
+        "GET", "/user/pages/calendar-view", {"params": _month(rng), "headers": _auth(data, rng)}
+    ),
+    "calendar_counts": lambda rng, data: (
+        "GET", "/user/pages/calendar-view",
+        {"params": {**_month(rng), "counts_only": True}, "headers": _auth(data, rng)}
+    ),
+    "search": lambda rng, data: (
+        "GET", "/user/pages/search", {"params": {"q": rng.choice(WORDS)}, "headers": _auth(data, rng)}
+    ),
+    "create_page": lambda rng, data: (
+        "POST", "/user/pages",
+        {
+            "data": {"title": f"load {rng.random()}", "content": " ".join(rng.choices(WORDS, k=50)), "public": "true"},
+            "files": [("files", ("a.txt", rng.randbytes(2048), "text/plain"))],
+            "headers": _auth(data, rng),
+        }
+    ),
+}
+
+
+def percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def _run_once(client: httpx.AsyncClient, name: str, rng: random.Random, data: dict, count: int) -> dict:
+    requests = [SCENARIOS[name](rng, data) for _ in range(count)]
+    latencies, errors, statuses = [], 0, Counter()
+    queue = iter(requests)
+
+    async def worker():
+        nonlocal errors
+        for method, url, kwargs in queue:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            # 없는 제목(404), 다른 사용자의 비공개 페이지(403)는 정상 응답으로 봄
+            if response.status_code >= 400 and response.status_code not in (403, 404):
+                errors += 1
+                statuses[response.status_code] += 1
+
+    concurrency = args.concurrency
+    if name in WRITE_SCENARIOS and os.environ["DATABASE_URL"].startswith("sqlite"):
+        concurrency = min(concurrency, SQLITE_WRITE_CONCURRENCY)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        **({"error_statuses": dict(statuses)} if statuses else {}),
+    }
+
+
+# 준비 요청(캐시, 커넥션 풀 채우기) 후 --repeat번 실행하고 지표별 중앙값을 사용 (실행 간 편차 완화)
+async def run_scenario(client: httpx.AsyncClient, name: str, data: dict) -> dict:
+    rng = random.Random(f"{args.seed}-{name}")
+    count = min(args.requests, REQUEST_LIMITS.get(name, args.requests))
+    await _run_once(client, name, rng, data, min(count, args.concurrency))
+    runs = [await _run_once(client, name, rng, data, count) for _ in range(args.repeat)]
+    result = {key: median(run[key] for run in runs) for key in ("throughput", "p50_ms", "p95_ms", "p99_ms")}
+    result["requests"] = count
+    result["errors"] = sum(run["errors"] for run in runs)
+    statuses = sum((Counter(run.get("error_statuses", {})) for run in runs), Counter())
+    if statuses:
+        result["error_statuses"] = dict(statuses)
+    return result
+
+
+# 기준값보다 p95가 느려졌거나 처리량이 줄었으면 목록으로 반환
+def regressions(results: dict, baseline: dict) -> list:
+    failed = []
+    for name, result in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + args.tolerance):
+            failed.append(f"{name}: p95 {result['p95_ms']}ms > 기준 {base['p95_ms']}ms")
+        if result["throughput"] < base["throughput"] * (1 - args.tolerance):
+            failed.append(f"{name}: 처리량 {result['throughput']}/s < 기준 {base['throughput']}/s")
+        if result["errors"]:
+            failed.append(f"{name}: 오류 {result['errors']}건")
+    return failed
+
+
+async def main():
+    rng = random.Random(args.seed)
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+
+    started = time.perf_counter()
+    data = await seed(rng)
+    print(f"시드: 사용자 {args.users}명, 페이지 {args.pages}개 ({time.perf_counter() - started:.1f}s)")
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        else:
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=60)
+        async with client:
+            print(f"{'scenario':<16}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+            for name in names:
+                result = results[name] = await run_scenario(client, name, data)
+                print(f"{name:<16}{result['throughput']:>9}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+                      f"{result['p99_ms']:>10}{result['errors']:>8}")
+                if result.get("error_statuses"):
+                    print(f"  오류 상태 코드: {result['error_statuses']}")
+
+    profile = {key: getattr(args, key) for key in ("users", "pages", "max_files", "requests", "concurrency", "repeat", "seed")}
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({"profile": profile, "scenarios": results}, indent=2, ensure_ascii=False) + "\n")
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("기준값 파일이 없어 비교를 건너뜁니다 (--update-baseline으로 생성).")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("profile") != profile:
+        print(f"기준값과 실행 조건이 달라 비교를 건너뜁니다: {baseline.get('profile')}")
+        return 0
+    failed = regressions(results, baseline)
+    for line in failed:
+        print(f"회귀: {line}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
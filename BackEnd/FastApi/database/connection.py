@@ -1,23 +1,269 @@
-from sqlmodel import create_engine, SQLModel, Session
+import logging
+from datetime import datetime
+from functools import lru_cache
+from sqlmodel import Field, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from pydantic_settings import BaseSettings
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# 모델(테이블/컬럼/인덱스)을 바꾸면 올림: 저장된 버전과 같으면 시작할 때 스키마 생성을 건너뜀
+# 기존 테이블의 컬럼 변경은 create_all이 반영하지 않으므로 올릴 때 database/migrations.py에 작업도 함께 추가
+SCHEMA_VERSION = 4
+
 class Settings(BaseSettings):
     DATABASE_URL: Optional[str] = None
     SECRET_KEY: Optional[str] = None
 
+    # 커넥션 풀 설정
+    DB_ECHO: bool = False  # SQL 로그 출력 여부 (기본값: 끔)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # 초 단위
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = 5000  # None이면 제한 없음
+
+    # 시작 설정
+    STARTUP_MODE: str = "lazy"  # lazy: 키/해시/DB 엔진을 처음 쓸 때 준비, eager: 시작할 때 미리 준비
+    DB_SCHEMA_MODE: str = "auto"  # auto: 버전이 다를 때만 생성, create: 항상 생성, check: 다르면 시작 실패, off
+
+    # 파일 업로드 설정
+    UPLOAD_DIR: str = "uploads/"
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB 단위로 스트리밍
+    MAX_UPLOAD_FILE_SIZE: int = 50 * 1024 * 1024  # 파일 하나당 최대 50MB
+    MAX_UPLOAD_REQUEST_SIZE: int = 200 * 1024 * 1024  # 요청 하나당 최대 200MB
+    DOWNLOAD_ACCEL_REDIRECT_PREFIX: Optional[str] = None  # 예: "/protected-uploads" (nginx internal location)
+
+    # 첨부 저장소 설정
+    STORAGE_SIZE_CLASSES: str = "8192=db,*=local"  # "최대크기=백엔드" 목록 (db / local / s3), 마지막은 *
+    S3_ENDPOINT_URL: Optional[str] = None  # 예: "http://localhost:9000" (MinIO)
+    S3_BUCKET: Optional[str] = None
+    S3_ACCESS_KEY: Optional[str] = None
+    S3_SECRET_KEY: Optional[str] = None
+    S3_REGION: str = "us-east-1"
+    S3_PREFIX: str = "blobs/"
+
+    # JWT 서명 설정
+    JWT_KEYS: str = "default=RS256"  # "kid=알고리즘" 목록 (RS256, ES256, EdDSA), 이전 키는 검증에만 사용
+    JWT_ACTIVE_KID: Optional[str] = None  # 서명에 사용할 kid (없으면 JWT_KEYS의 첫 번째)
+    JWT_KEY_DIR: Optional[str] = None  # 키 파일 디렉터리 (없으면 auth/)
+
+    # 패스워드 해싱 설정
+    BCRYPT_ROUNDS: int = 12  # 바꾸면 다음 로그인 때 기존 해시가 새 비용으로 갱신됨
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" 또는 "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32  # 이보다 많이 대기하면 503으로 거절
+
+    # 회원가입 인증 코드 설정
+    VERIFICATION_CODE_STORE: str = "memory"  # memory / sqlite:///경로 / redis://호스트:포트
+    VERIFICATION_CODE_TTL: int = 600  # 코드 유효 시간 (초)
+    VERIFICATION_MAX_ATTEMPTS: int = 5  # 발급된 코드 하나에 대한 입력 실패 허용 횟수 (넘으면 코드 무효화)
+    VERIFICATION_MAX_IP_FAILURES: int = 20  # 클라이언트 IP별 입력 실패 허용 횟수 (코드 유효 시간 동안)
+    VERIFICATION_SWEEP_INTERVAL: int = 60  # 만료 항목 정리 주기 (초)
+
+    # 인증 요청 제한 설정 ("ip=횟수/초,account=횟수/초", 빈 문자열이면 제한 없음)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: str = "memory"  # memory / sqlite:///경로 / redis://호스트:포트 (워커 간 공유하려면 sqlite/redis)
+    RATE_LIMIT_SIGNIN: str = "ip=20/60,account=5/60"
+    RATE_LIMIT_REQUEST_CODE: str = "ip=5/60,account=3/600"  # account는 메일을 받을 주소
+    RATE_LIMIT_REFRESH_TOKEN: str = "ip=60/60,account=10/60"
+    RATE_LIMIT_VERIFY_CODE: str = "ip=10/60"
+    RATE_LIMIT_SWEEP_INTERVAL: int = 60  # 가득 찬 버킷 정리 주기 (초)
+    AUTH_MAX_CONCURRENCY: int = 16  # 워커 하나에서 위 라우트들을 동시에 처리하는 최대 요청 수 (넘으면 429)
+
+    # 조회 응답 캐시 설정
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # 무효화는 PAGE_EVENTS_BUS로 다른 워커에 전달됨. 버스가 memory인데 워커가 여럿이면 TTL까지 오래된 응답이 남을 수 있음
+    RESPONSE_CACHE_TTL: float = 300  # 초
+
+    # 페이지 리비전 설정
+    REVISION_SNAPSHOT_INTERVAL: int = 20  # 이 개수마다 전체 스냅샷 저장 (그 사이는 스냅샷 대비 delta)
+
+    # 예약 공개 설정
+    SCHEDULER_HORIZON: int = 24 * 3600  # 이 시간 안에 도래하는 예약만 메모리에 올림 (초)
+    SCHEDULER_RESYNC_INTERVAL: int = 15  # 다른 워커에서 바뀐 예약을 DB에서 다시 읽는 주기 (초)
+
+    # 페이지 변경 알림 설정 (WebSocket)
+    PAGE_EVENTS_BUS: str = "memory"  # memory(워커 하나) / redis://호스트:포트 (모든 워커에 전달)
+    PAGE_EVENTS_QUEUE_SIZE: int = 64  # 연결별 대기 메시지 수 (넘치면 쌓인 이벤트를 버리고 resync 전송)
+    PAGE_EVENTS_MAX_CONNECTIONS: int = 10000  # 워커당 최대 연결 수
+    PAGE_EVENTS_MAX_RANGE_DAYS: int = 366  # range 구독 하나의 최대 일수
+    PAGE_EVENTS_MAX_RANGES: int = 12  # 연결 하나의 최대 range 구독 수
+
+    # 대량 가져오기 설정
+    BULK_IMPORT_BATCH_SIZE: int = 1000  # 한 트랜잭션으로 커밋하는 레코드 수
+    BULK_IMPORT_MAX_SIZE: int = 4 * 1024 * 1024 * 1024  # 가져오기 요청 하나당 최대 4GB
+
+    # 모니터링 설정
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None  # 설정하면 /metrics에 "Authorization: Bearer <토큰>" 필요
+    METRICS_N_PLUS_ONE_THRESHOLD: int = 10  # 한 요청에서 같은 SQL이 이 횟수 이상 실행되면 N+1로 기록
+
+    # 메일 발송 설정
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587
+    SMTP_STARTTLS: bool = True
+    SMTP_USER: Optional[str] = None  # 계정 정보는 환경 변수나 .env에서만 읽음 (없으면 로그인 없이 발송)
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_SENDER: Optional[str] = None  # 없으면 SMTP_USER
+    SMTP_TIMEOUT: float = 10.0
+    SMTP_IDLE_CHECK: float = 30.0  # 이보다 오래 쉰 연결은 NOOP으로 확인 후 재사용
+    SMTP_POOL_SIZE: int = 2  # 동시에 유지하는 SMTP 연결 수
+    SMTP_BATCH_SIZE: int = 20  # 한 번에 묶어 보내는 최대 메일 수
+    OUTBOX_MAX_QUEUE: int = 10000
+    OUTBOX_MAX_RETRIES: int = 5
+    OUTBOX_RETRY_BASE_DELAY: float = 2.0  # 재시도 간격 (2, 4, 8... 초)
+
+    # 인증 캐시 설정
+    TOKEN_CACHE_SIZE: int = 10000  # 검증된 토큰 페이로드 최대 개수
+    PRINCIPAL_CACHE_SIZE: int = 10000  # 사용자 정보 최대 개수
+    PRINCIPAL_CACHE_TTL: int = 30  # 사용자 정보 유지 시간 (초)
+
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
-engine_url = create_engine(settings.DATABASE_URL, echo=True)
+# 동기 드라이버 -> 비동기 드라이버 매핑
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+# DATABASE_URL을 비동기 드라이버 URL로 변환
+def async_database_url(database_url: str):
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+# 백엔드별 statement timeout 설정
+def statement_timeout_args(url, timeout_ms: Optional[int]) -> dict:
+    if not timeout_ms:
+        return {}
+    if url.get_backend_name() == "mysql":
+        return {"init_command": f"SET SESSION max_execution_time={timeout_ms}"}
+    if url.get_backend_name() == "postgresql":
+        return {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    return {}
+
+
+# SQLite는 FOR UPDATE를 무시하고, 드라이버가 트랜잭션을 직접 열고 닫아 SAVEPOINT도 깨짐
+# 트랜잭션을 직접 BEGIN IMMEDIATE로 열어 쓰기 트랜잭션을 순서대로 실행 (blob 참조 수 등 조회 후 갱신하는 곳)
+# 연결은 하나만 두어 프로세스 안에서는 풀에서(이벤트 루프에서) 기다림. 여러 연결이 드라이버 스레드에서 잠금을
+# 기다리면 그 연결의 문장을 정리하는 이벤트 루프도 함께 멈춤
+SQLITE_POOL = {"pool_size": 1, "max_overflow": 0}
+
+
+def serialize_sqlite_transactions(engine: AsyncEngine) -> AsyncEngine:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def create_engine_from_settings(settings: Settings):
+    url = async_database_url(settings.DATABASE_URL)
+    options = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": statement_timeout_args(url, settings.DB_STATEMENT_TIMEOUT_MS),
+    }
+    if url.get_backend_name() == "sqlite":
+        if url.database not in (None, "", ":memory:"):  # 메모리 DB는 원래 연결 하나(StaticPool)
+            options.update(SQLITE_POOL)
+        return serialize_sqlite_transactions(create_async_engine(url, **options))
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return create_async_engine(url, **options)
+
+
+# .env 파일은 프로세스에서 한 번만 읽음 (모듈마다 Settings()를 만들지 않음)
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings()
+
+
+settings = get_settings()
+
+
+# 엔진은 처음 쓸 때 생성 (DB 드라이버 import와 URL 해석을 import 시점에서 뺌)
+@lru_cache(maxsize=None)
+def get_engine() -> AsyncEngine:
+    return create_engine_from_settings(settings)
+
+
+@lru_cache(maxsize=None)
+def _sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+
+
+def async_session() -> AsyncSession:
+    return _sessionmaker()()
+
+
+# 적용된 스키마 버전 (행 하나)
+class SchemaVersion(SQLModel, table=True):
+    __tablename__ = "schema_version"
+
+    id: int = Field(default=1, primary_key=True)
+    version: int
+    applied_at: datetime = Field(default_factory=datetime.now)
+
+
+def _stored_version(connection) -> Optional[int]:
+    if not inspect(connection).has_table(SchemaVersion.__tablename__):
+        return None
+    row = connection.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).first()
+    return row.version if row else None
+
+
+def _create_schema(connection, stored: Optional[int]):
+    from database.migrations import run_migrations
+
+    SQLModel.metadata.create_all(connection)
+    run_migrations(connection, stored)  # 기존 테이블의 컬럼/데이터 변경
+    # create_all은 이미 있는 테이블에 새로 추가된 인덱스는 만들지 않음
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    connection.execute(SchemaVersion.__table__.delete())
+    connection.execute(SchemaVersion.__table__.insert().values(id=1, version=SCHEMA_VERSION, applied_at=datetime.now()))
 
 
-def conn():
-    SQLModel.metadata.create_all(engine_url)
+# 시작할 때 스키마 확인: 매번 create_all로 모든 테이블을 조회하지 않고 버전 행 하나만 읽음
+async def conn():
+    mode = settings.DB_SCHEMA_MODE
+    if mode == "off":
+        return
+    async with get_engine().begin() as connection:
+        stored = None if mode == "create" else await connection.run_sync(_stored_version)
+        if stored == SCHEMA_VERSION:
+            return
+        if mode == "check":
+            raise RuntimeError(
+                f"데이터베이스 스키마 버전({stored})이 코드({SCHEMA_VERSION})와 다릅니다. "
+                "마이그레이션을 적용하거나 DB_SCHEMA_MODE=create로 한 번 실행하세요."
+            )
+        logger.info("스키마 생성/갱신: %s -> %s", stored, SCHEMA_VERSION)
+        await connection.run_sync(_create_schema, stored)
 
 
-def get_session():
-    with Session(engine_url) as session:
+async def get_session():
+    async with async_session() as session:
         yield session
@@ -0,0 +1,120 @@
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import Boolean, Column, bindparam, column, delete, exists, false, insert, inspect, select, table, text
+from sqlalchemy.schema import CreateColumn
+from models.users import Blob, CalendarDayCount, PageBody, PageTerm
+from services.calendar import day_count_query, day_count_values
+from services.search import batch_posting_rows, page_batch_query
+from services.page_content import EXCERPT_LENGTH, body_values, make_excerpt
+
+BATCH_SIZE = 500
+
+
+def _columns(connection, table_name: str) -> set:
+    return {column_info["name"] for column_info in inspect(connection).get_columns(table_name)}
+
+
+# 컬럼 정의(타입, 기본값)는 DB 종류에 맞게 SQLAlchemy가 만듦 (예: 불리언 기본값은 PostgreSQL에서 false, SQLite에서 0)
+def _add_column(connection, table_name: str, new_column: Column):
+    definition = CreateColumn(new_column).compile(dialect=connection.dialect)
+    connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {definition}"))
+
+
+# 1: 예약 공개 플래그 (user-017 이전에 만든 DB에는 없음, ix_page_publish_schedule보다 먼저 있어야 함)
+def add_scheduled_public(connection):
+    if "scheduled_public" not in _columns(connection, "page"):
+        _add_column(connection, "page", Column("scheduled_public", Boolean, nullable=False, server_default=false()))
+
+
+# 1: 첨부 내용 주소(blob_hash) (user-003 이전에 만든 DB에는 없음, 인덱스는 뒤의 인덱스 생성 단계에서 만듦)
+def add_file_blob_hash(connection):
+    if "blob_hash" in _columns(connection, "filemodel"):
+        return
+    if connection.dialect.name == "sqlite":
+        # SQLite는 ADD CONSTRAINT가 없지만 기본값이 NULL인 컬럼에는 REFERENCES를 붙일 수 있음
+        connection.execute(text("ALTER TABLE filemodel ADD COLUMN blob_hash VARCHAR(64) REFERENCES blob (hash)"))
+    else:
+        connection.execute(text("ALTER TABLE filemodel ADD COLUMN blob_hash VARCHAR(64)"))
+        connection.execute(text(
+            "ALTER TABLE filemodel ADD CONSTRAINT fk_filemodel_blob_hash FOREIGN KEY (blob_hash) REFERENCES blob (hash)"
+        ))
+
+
+# 1: 날짜별 페이지 수 집계를 페이지 테이블로부터 다시 계산 (집계 도입 전 페이지는 집계에 없음)
+def backfill_day_counts(connection):
+    connection.execute(delete(CalendarDayCount))
+    rows = connection.execute(day_count_query()).all()
+    if rows:
+        connection.execute(insert(CalendarDayCount), day_count_values(rows))
+
+
+# 3: page.content를 pagebody(압축 본문)로 옮기고 page.excerpt를 채움
+def move_page_content(connection):
+    columns = _columns(connection, "page")
+    if "excerpt" not in columns:
+        connection.execute(text(f"ALTER TABLE page ADD COLUMN excerpt VARCHAR({EXCERPT_LENGTH}) NOT NULL DEFAULT ''"))
+    if "content" not in columns:
+        return
+
+    page = table("page", column("id"), column("content"), column("excerpt"))
+    body = PageBody.__table__
+    last_id = ""
+    while True:
+        # 중간에 실패했다가 다시 실행해도 이미 옮긴 페이지는 건너뜀
+        rows = connection.execute(
+            select(page.c.id, page.c.content)
+            .where(page.c.id > last_id, ~exists().where(body.c.page_id == page.c.id))
+            .order_by(page.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(body.insert(), [body_values(row.id, row.content or "") for row in rows])
+        connection.execute(
+            page.update().where(page.c.id == bindparam("target_id")).values(excerpt=bindparam("new_excerpt")),
+            [{"target_id": row.id, "new_excerpt": make_excerpt(row.content or "")} for row in rows]
+        )
+        last_id = rows[-1].id
+    connection.execute(text("ALTER TABLE page DROP COLUMN content"))
+
+
+# 1: 검색 색인 도입 전 페이지의 posting 채우기 (본문을 읽으므로 pagebody로 옮긴 뒤에 실행)
+def backfill_page_terms(connection):
+    last_id = ""
+    while True:
+        pages = connection.execute(page_batch_query(last_id, BATCH_SIZE, missing_only=True)).all()
+        if not pages:
+            break
+        rows = batch_posting_rows(pages)
+        if rows:
+            connection.execute(insert(PageTerm), rows)
+        last_id = pages[-1].id
+
+
+# 4: blob에 저장소 백엔드(backend)와 DB 보관 내용(data)을 추가하고, 쓰이지 않던 filemodel.content를 삭제
+def add_blob_backends(connection):
+    columns = _columns(connection, "blob")
+    if "backend" not in columns:
+        connection.execute(text("ALTER TABLE blob ADD COLUMN backend VARCHAR(16) NOT NULL DEFAULT 'local'"))
+    if "data" not in columns:
+        data_type = Blob.__table__.c.data.type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE blob ADD COLUMN data {data_type}"))
+    if "content" in _columns(connection, "filemodel"):
+        connection.execute(text("ALTER TABLE filemodel DROP COLUMN content"))
+
+
+# (버전, 작업): 저장된 버전이 그보다 낮으면 실행. 목록 순서대로 실행 (create_all 뒤, 인덱스 생성 전)
+# 버전 1은 버전 관리 이전(버전 행 없음)의 변경들. 각 작업은 현재 상태를 확인하고 필요한 것만 수행
+MIGRATIONS: List[Tuple[int, Callable]] = [
+    (1, add_file_blob_hash),
+    (1, add_scheduled_public),
+    (1, backfill_day_counts),
+    (3, move_page_content),
+    (1, backfill_page_terms),
+    (4, add_blob_backends),
+]
+
+
+def run_migrations(connection, stored: Optional[int]):
+    for version, migrate in MIGRATIONS:
+        if stored is None or stored < version:
+            migrate(connection)
@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import DateTime, and_, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# 마지막 행의 정렬 키 값을 불투명한 토큰으로 인코딩
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value) if value is not None and isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 커서입니다.")
+
+
+# (a, b, c) > (x, y, z) 를 인덱스를 탈 수 있는 OR/AND 조합으로 전개
+def keyset_predicate(columns: list, values: list, descending: bool):
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        beyond = column < value if descending else column > value
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
+
+
+# 정렬 키 기준으로 limit 개를 가져오고, 다음 페이지가 있으면 커서를 함께 반환
+async def paginate(
+        session: AsyncSession,
+        statement,
+        columns: list,
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = False
+) -> Tuple[List, Optional[str]]:
+    if cursor:
+        statement = statement.where(keyset_predicate(columns, decode_cursor(cursor, columns), descending))
+    statement = statement.order_by(*(column.desc() if descending else column.asc() for column in columns))
+
+    rows = (await session.exec(statement.limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,13 +1,64 @@
-from fastapi import FastAPI
+from time import perf_counter
+_import_started = perf_counter()  # 시작 시간 측정: 이 모듈이 불러오는 패키지 import 포함
+
+import logging
+import secrets
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
 from routes.users import user_router
 from contextlib import asynccontextmanager
-from database.connection import conn
+from database.connection import conn, settings, get_engine
+from auth.hash_password import HashPassword, hash_pool
+from auth.jwt_handler import load_keys
+from services.code_store import code_store
+from services.rate_limit import auth_limiter, rate_limit_store
+from services.outbox import outbox
+from services.scheduler import scheduler
+from services.page_events import page_events
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
+from storage.uploads import UploadSizeLimitMiddleware
+from storage.backends import storage
+from services.metrics import MetricsMiddleware, instrument_engine, register_collector, render_metrics
+from services.response_cache import response_cache
+from auth.cache import cache_stats
+
+logger = logging.getLogger(__name__)
+
+# 시작 단계별 소요 시간 (초)
+startup_profile = {}
+
+
+# STARTUP_MODE=eager: 첫 요청이 기다리지 않도록 키 파싱, 해시 컨텍스트, DB 엔진을 미리 준비
+def warm_up():
+    load_keys()
+    HashPassword().pwd_context
+    get_engine()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    conn()  # 데이터베이스 연결 초기화
+    started = perf_counter()
+    if settings.STARTUP_MODE == "eager":
+        warm_up()
+    await conn()  # 스키마 버전 확인 (DB_SCHEMA_MODE)
+    # 만료된 인증 코드를 주기적으로 정리
+    sweeper = asyncio.create_task(code_store.run_sweeper(settings.VERIFICATION_SWEEP_INTERVAL))
+    limit_sweeper = asyncio.create_task(rate_limit_store.run_sweeper(settings.RATE_LIMIT_SWEEP_INTERVAL))
+    await outbox.start()  # 메일 발송 작업자 시작
+    scheduler.start()  # 예약 공개 타이머 시작
+    await page_events.start()  # 다른 워커의 페이지 변경 수신
+    startup_profile["lifespan_seconds"] = perf_counter() - started
+    logger.info("시작 완료: import %.3fs, lifespan %.3fs",
+                startup_profile["import_seconds"], startup_profile["lifespan_seconds"])
     yield
+    await page_events.stop()
+    await scheduler.stop()
+    await outbox.stop()
+    sweeper.cancel()
+    limit_sweeper.cancel()
+    hash_pool.shutdown()  # 패스워드 해싱 풀 정리
+    await storage.close()  # 저장소 클라이언트(S3 등) 정리
 
 
 # FastAPI 애플리케이션 생성
@@ -23,8 +74,36 @@ app.add_middleware(
     allow_methods=["GET", "POST", "DELETE", "PUT", "OPTIONS"],
     allow_credentials=True,
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 커서 페이지네이션 토큰
 )
 
+# 너무 큰 업로드 요청은 본문을 읽기 전에 거절
+app.add_middleware(UploadSizeLimitMiddleware, exempt_paths=("/user/pages/import",))  # 가져오기는 자체 제한 사용
+
+# 라우트별 지연 시간/상태 코드와 요청당 SQL 수를 수집해 /metrics로 노출 (Prometheus 텍스트 형식)
+if settings.METRICS_ENABLED:
+    instrument_engine()  # 엔진은 처음 쓸 때 생성됨
+    app.add_middleware(MetricsMiddleware)
+    register_collector("response_cache", response_cache.stats)
+    register_collector("auth_cache", cache_stats)
+    register_collector("password_hash", hash_pool.stats)
+    register_collector("auth_limiter", auth_limiter.stats)
+    register_collector("email_outbox", outbox.stats)
+    register_collector("publish_scheduler", scheduler.stats)
+    register_collector("page_events", page_events.stats)
+    register_collector("startup", lambda: startup_profile)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        if settings.METRICS_TOKEN:
+            authorization = request.headers.get("authorization", "")
+            if not secrets.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="인증이 필요합니다.")
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+startup_profile["import_seconds"] = perf_counter() - _import_started
+
 
 if __name__ == "__main__":
     import uvicorn
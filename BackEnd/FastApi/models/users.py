@@ -1,7 +1,8 @@
 from pydantic import EmailStr
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from sqlalchemy import Column, Index, LargeBinary
+from datetime import datetime, date
 
 
 class User(SQLModel, table=True):
@@ -12,6 +13,9 @@ class User(SQLModel, table=True):
     is_admin: bool = Field(default=False)  # 관리자 여부 추가
     pages: List["Page"] = Relationship(back_populates="owner")  # 사용자와 연결된 페이지들
 
+    # 사용자 목록 커서 페이지네이션용 (is_admin 필터 + username 정렬)
+    __table_args__ = (Index("ix_user_admin_username_id", "is_admin", "username", "id"),)
+
 
 class UserSignUp(SQLModel):
     email: EmailStr
@@ -27,23 +31,131 @@ class UserSignIn(SQLModel):
 class Page(SQLModel, table=True):
     id: str = Field(default=None, primary_key=True)  # Page의 기본 키
     title: str  # 제목
-    content: str  # 내용
+    excerpt: str = Field(default="", max_length=200)  # 목록용 본문 앞부분 (본문은 PageBody에 압축 저장)
     public: bool = Field(default=True)  # 공개 여부 (기본값: True)
     created_at: datetime = Field(default_factory=datetime.now)  # 생성 시간
     updated_at: Optional[datetime] = None  # 수정 시간
     scheduled_at: Optional[datetime] = None
+    scheduled_public: bool = Field(default=False)  # True이면 scheduled_at에 공개로 전환 (예약 공개)
     owner_id: int = Field(foreign_key="user.id")  # 페이지 소유자의 ID, Optional 제거
     owner: User = Relationship(back_populates="pages")  # 페이지 소유자와의 관계
     files: List["FileModel"] = Relationship(back_populates="page") # FileModel과의 관계
 
+    # 목록 API의 정렬 순서와 같은 복합 인덱스 (커서 페이지네이션)
+    __table_args__ = (
+        Index("ix_page_public_created_id", "public", "created_at", "id"),
+        Index("ix_page_owner_created_id", "owner_id", "created_at", "id"),
+        Index("ix_page_title_id", "title", "id"),  # 제목 조회와 제목 정렬 겸용
+        Index("ix_page_scheduled_public_owner", "scheduled_at", "public", "owner_id"),  # 캘린더 조회
+        Index("ix_page_publish_schedule", "scheduled_public", "scheduled_at"),  # 예약 공개 타이머 로딩
+    )
+
+
+class PageBody(SQLModel, table=True):
+    # 페이지 본문: 목록/날짜 조회에서 읽지 않도록 page 테이블과 분리하고 압축해서 저장
+    page_id: str = Field(primary_key=True, foreign_key="page.id")
+    encoding: str = Field(default="gzip", max_length=16)  # gzip 또는 identity (짧은 본문은 압축하지 않음)
+    size: int = Field(default=0)  # 압축 전 UTF-8 바이트 수
+    data: bytes = Field(sa_column=Column(LargeBinary(length=2 ** 32 - 1), nullable=False))
+
+
+# 목록 응답용 요약: 본문 없이 필요한 컬럼과 첨부 수만 SELECT (본문은 단일 페이지 조회에서만 반환)
+class PageSummary(SQLModel):
+    id: str
+    title: str
+    excerpt: str = ""
+    public: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    scheduled_at: Optional[datetime] = None
+    scheduled_public: bool = False
+    owner_id: int
+    file_count: int = 0
+
+
+class Blob(SQLModel, table=True):
+    hash: str = Field(primary_key=True, max_length=64)  # 파일 내용의 SHA-256
+    path: str = Field(..., max_length=1024)  # 백엔드 안의 위치 (로컬 경로, S3 키 등)
+    size: int = Field(..., ge=0)
+    ref_count: int = Field(default=0, ge=0)  # 이 blob을 가리키는 FileModel 수
+    created_at: datetime = Field(default_factory=datetime.now)
+    backend: str = Field(default="local", max_length=16)  # local / db / s3
+    data: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(length=2 ** 24 - 1)))  # db 백엔드의 내용
+
 
 class FileModel(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    filename: str = Field(..., index=True, max_length=1024)
+    filename: str = Field(..., index=True, max_length=1024)  # 업로드 당시의 원본 파일명
     fileurl: Optional[str] = Field(default=None, index=True, max_length=1024)  # NULL 허용
+    blob_hash: Optional[str] = Field(default=None, foreign_key="blob.hash", index=True, max_length=64)
     content_type: Optional[str] = Field(..., max_length=1024)
     size: int = Field(..., ge=0)
-    content: Optional[bytes] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.now)
-    page_id: Optional[str] = Field(default=None, foreign_key="page.id")
-    page: Optional[Page] = Relationship(back_populates="files")
\ No newline at end of file
+    page_id: Optional[str] = Field(default=None, foreign_key="page.id", index=True)  # 페이지별 첨부 조회/개수
+    page: Optional[Page] = Relationship(back_populates="files")
+
+
+class PageTerm(SQLModel, table=True):
+    # 검색용 역색인: 토큰 하나가 페이지 하나에 나타나는 가중치
+    term: str = Field(primary_key=True, max_length=64)
+    page_id: str = Field(primary_key=True, foreign_key="page.id", index=True)
+    weight: int = Field(default=1)  # 제목 출현은 본문보다 높은 가중치
+    public: bool = Field(default=True)  # 색인 조회에서 바로 공개/소유자 필터링을 하기 위해 복사
+    owner_id: int
+
+    __table_args__ = (Index("ix_pageterm_term_public_owner", "term", "public", "owner_id"),)
+
+
+class CalendarDayCount(SQLModel, table=True):
+    # 날짜별 페이지 수 집계 (scope_owner_id=0: 공개 페이지, 그 외: 해당 사용자의 비공개 페이지)
+    day: date = Field(primary_key=True)
+    scope_owner_id: int = Field(default=0, primary_key=True)
+    count: int = Field(default=0)
+
+
+class PageRevision(SQLModel, table=True):
+    # 페이지 수정 이력 (추가만 함). snapshot은 전체 내용, delta는 base 스냅샷 대비 변경분 (둘 다 zlib 압축)
+    page_id: str = Field(primary_key=True, foreign_key="page.id")
+    number: int = Field(primary_key=True)  # 페이지별 1부터 증가
+    base: int  # 기준 스냅샷 번호 (스냅샷이면 자기 자신)
+    title: str
+    data: bytes = Field(sa_column=Column(LargeBinary(length=2 ** 32 - 1), nullable=False))
+    size: int = Field(default=0)  # 압축 전 본문 길이
+    author_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class ImportJob(SQLModel, table=True):
+    # NDJSON 대량 가져오기 진행 상황 (청크를 커밋할 때마다 함께 갱신, 실패 시 lines_done부터 재개)
+    id: str = Field(primary_key=True, max_length=36)
+    owner_id: int = Field(foreign_key="user.id", index=True)
+    status: str = Field(default="running", max_length=16)  # running / failed / done
+    lines_done: int = Field(default=0)  # 커밋된 마지막 줄 번호
+    pages: int = Field(default=0)
+    files: int = Field(default=0)
+    error: Optional[str] = Field(default=None, max_length=1024)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class PageRecord(SQLModel):
+    # 가져오기/내보내기 NDJSON의 page 레코드
+    id: Optional[str] = None
+    title: str
+    content: str
+    public: bool = True
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    scheduled_at: Optional[datetime] = None
+    owner_id: Optional[int] = None  # 관리자가 가져올 때만 사용, 그 외에는 요청한 사용자
+
+
+class FileRecord(SQLModel):
+    # 가져오기/내보내기 NDJSON의 file 레코드 (첨부 메타데이터만, 내용은 blob 저장소에 있어야 함)
+    filename: str
+    fileurl: Optional[str] = None
+    blob_hash: Optional[str] = None
+    content_type: Optional[str] = None
+    size: int = Field(default=0, ge=0)
+    created_at: Optional[datetime] = None
+    page_id: str
@@ -1,22 +1,20 @@
-import random
-import smtplib
+import secrets
 from email.mime.text import MIMEText
+from database.connection import get_settings
+from services.outbox import outbox
 
-def generate_verification_code():
-    return str(random.randint(1000, 9999))
+settings = get_settings()
 
-def send_email_verification(email: str, code: str):
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587
-    sender_email = "whrudgh83@gmail.com"
-    sender_password = "ayjd vmrb rjif pffz"
+def generate_verification_code():
+    return str(1000 + secrets.randbelow(9000))  # 추측할 수 없도록 CSPRNG 사용
 
+def build_verification_message(email: str, code: str) -> MIMEText:
     message = MIMEText(f"Your verification code is: {code}")
     message['Subject'] = "Verification Code"
-    message['From'] = sender_email
+    message['From'] = settings.SMTP_SENDER or settings.SMTP_USER
     message['To'] = email
+    return message
 
-    with smtplib.SMTP(smtp_server, smtp_port) as server:
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, email, message.as_string())
\ No newline at end of file
+# 발송 대기열에 넣고 바로 반환 (실제 발송은 백그라운드 작업자가 처리)
+def send_email_verification(email: str, code: str):
+    outbox.enqueue(build_verification_message(email, code))
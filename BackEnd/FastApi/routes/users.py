@@ -1,42 +1,83 @@
 from typing import List,  Optional
-from fastapi import APIRouter, HTTPException, status, Depends, Query, File, UploadFile, Form, Response
-from auth.authenticate import authenticate
-from auth.jwt_handler import create_tokens, refresh_access_token
-from models.users import Page, User, UserSignIn, UserSignUp, FileModel
-from models.utils import generate_verification_code, send_email_verification
-from database.connection import get_session
-from sqlmodel import select
+from fastapi import (
+    APIRouter, HTTPException, status, Depends, Query, File, UploadFile, Form, Request, Response, WebSocket,
+    WebSocketDisconnect
+)
+from auth.authenticate import authenticate, load_principal
+from auth.jwt_handler import create_tokens, refresh_access_token, verify_jwt_token
+from auth.cache import cache_stats, invalidate_principal
+from models.users import Blob, Page, PageSummary, User, UserSignIn, UserSignUp, FileModel, ImportJob, PageRevision
+from models.utils import send_email_verification
+from services.code_store import code_store, verify_code
+from services.rate_limit import auth_limiter, client_ip
+from services.outbox import outbox
+from services.bulk import PageImporter, export_ndjson, ndjson_lines
+from services.scheduler import scheduler, local_time
+from services.page_events import REVOKED, page_events, page_event
+from services.page_content import (
+    make_excerpt, insert_contents, save_content, load_content, load_contents, delete_content,
+    content_response
+)
+from services.serialization import FastJSONResponse, dumps
+from services.revisions import (
+    record_revision, ensure_initial_revision, load_revision, diff_revisions, delete_revisions
+)
+from services.response_cache import (
+    response_cache, invalidate_page, user_scope, calendar_owner,
+    PUBLIC_SCOPE, PUBLIC_PAGES, PAGE_TITLES, USERS, CALENDAR, CALENDAR_PUBLIC
+)
+from database.connection import async_session, get_session, settings
+from database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_next_cursor
+from storage.uploads import UploadLimiter, digest_upload
+from storage.blobs import acquire_blobs, detach_files, purge_files
+from storage.downloads import file_response
+from fastapi.responses import StreamingResponse
+from services.search import index_page, unindex_page, search_pages, reindex_all_pages
+from services.calendar import (
+    calendar_pages, calendar_counts, count_page_added, count_page_moved, count_page_removed, count_pages_removed,
+    rebuild_day_counts
+)
+from sqlmodel import select, exists
 from auth.hash_password import HashPassword
 from uuid import uuid4
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session, joinedload
-import os
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.orm import selectinload
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import logging
 import re
+from time import time
 
 
 
-user_router = APIRouter()
+user_router = APIRouter(default_response_class=FastJSONResponse)
 hash_password = HashPassword()
-UPLOAD_DIR = "uploads/"
-verification_codes = {} # 이메일과 코드 저장
-signup_data = {}
+logger = logging.getLogger(__name__)
 
 
 #1.사용자 등록-이메일 보내기
-@user_router.post("/signup/request-code", status_code=status.HTTP_200_OK)
+@user_router.post(
+    "/signup/request-code", status_code=status.HTTP_200_OK, dependencies=[Depends(auth_limiter.guard("request-code"))]
+)
 async def request_signup_code(data: UserSignUp, session=Depends(get_session)) -> dict:
+    # 같은 주소로 메일을 계속 보내지 않도록 받는 주소별로 제한
+    await auth_limiter.hit("request-code", "account", data.email)
+
     # 중복 이메일 확인
     statement = select(User).where(User.email == data.email)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="이미 사용 중인 이메일입니다."
         )
 
-    # 인증 코드 생성
-    code = generate_verification_code()
-    verification_codes[data.email] = code  # 이메일과 인증 코드 매핑
-    signup_data[data.email] = data.dict()  # 회원가입 데이터를 임시 저장
+    # 회원가입 데이터를 임시 저장 (공유 저장소에 평문 패스워드가 남지 않도록 미리 해싱)
+    signup_data = data.dict()
+    signup_data["password"] = await hash_password.hash_password_async(data.password)
+
+    # 인증 코드 생성 (다른 이메일이 사용 중인 코드와 겹치지 않음, TTL 후 만료)
+    code = await code_store.issue(data.email, signup_data)
 
     # 이메일 전송
     send_email_verification(data.email, code)
@@ -44,40 +85,41 @@ async def request_signup_code(data: UserSignUp, session=Depends(get_session)) ->
     return {"message": "인증 코드가 이메일로 전송되었습니다."}
 
 #2.사용자 등록-숫자 랜덤으로 날라온거 입력
-@user_router.post("/signup/verify-code", status_code=status.HTTP_201_CREATED)
-async def verify_signup_code(code: str, session=Depends(get_session)):
-    # 인증 코드 확인
-    email = next((key for key, value in verification_codes.items() if value == code), None)
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 인증 코드입니다."
-        )
-
-    # 회원가입 데이터 확인
-    if email not in signup_data:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="회원가입 데이터가 없습니다."
-        )
+@user_router.post(
+    "/signup/verify-code", status_code=status.HTTP_201_CREATED, dependencies=[Depends(auth_limiter.guard("verify-code"))]
+)
+async def verify_signup_code(
+    code: str,
+    request: Request,
+    email: Optional[str] = None,  # 함께 보내면 (이메일, 코드) 쌍으로 확인
+    session=Depends(get_session)
+):
+    # 인증 코드 확인 (IP별 실패는 차단만, 코드별 실패가 쌓이면 코드 무효화)
+    pending = await verify_code(
+        code_store, code, email, client_ip(request),
+        max_attempts=settings.VERIFICATION_MAX_ATTEMPTS,
+        max_ip_failures=settings.VERIFICATION_MAX_IP_FAILURES,
+    )
 
     # 데이터베이스에 사용자 저장
-    user_data = signup_data[email]
+    user_data = pending.data
     new_user = User(
-        email=email,
-        password=hash_password.hash_password(user_data["password"]),
+        email=pending.email,
+        password=user_data["password"],  # 코드 요청 시 이미 해싱됨
         username=user_data["username"]
     )
     session.add(new_user)
-    session.commit()
+    await session.commit()
+    response_cache.invalidate({USERS})
 
     # 인증 완료 후 데이터 삭제
-    del verification_codes[email]
-    del signup_data[email]
+    await code_store.delete(pending.email)
 
     return {"message": "회원가입이 완료되었습니다."}
 
 #3.로그인 처리
-@user_router.post("/signin")
-def sign_in(data: UserSignIn, session=Depends(get_session)) -> dict:
+@user_router.post("/signin", dependencies=[Depends(auth_limiter.guard("signin"))])
+async def sign_in(data: UserSignIn, session=Depends(get_session)) -> dict:
     # 이메일 형식 검증
     if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', data.email):
         raise HTTPException(
@@ -85,9 +127,12 @@ def sign_in(data: UserSignIn, session=Depends(get_session)) -> dict:
             detail="올바르지 않은 이메일 형식입니다."
         )
 
+    # 계정별 시도 횟수 제한 (여러 IP에서 한 계정을 대입하는 경우)
+    await auth_limiter.hit("signin", "account", data.email)
+
     # 사용자 검색
     statement = select(User).where(User.email == data.email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
 
     if not user:
         raise HTTPException(
@@ -95,13 +140,19 @@ def sign_in(data: UserSignIn, session=Depends(get_session)) -> dict:
             detail="일치하는 사용자가 존재하지 않습니다.",
         )
 
-    # 패스워드 검증
-    if not hash_password.verify_password(data.password, user.password):
+    # 패스워드 검증 (해싱 전용 풀에서 실행)
+    verified, new_hash = await hash_password.verify_and_update(data.password, user.password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="패스워드가 일치하지 않습니다.",
         )
 
+    # 해시 비용 설정이 바뀌었으면 로그인 성공 시 새 해시로 교체
+    if new_hash:
+        user.password = new_hash
+        await session.commit()
+
     # Access Token과 Refresh Token 생성
     tokens = create_tokens(email=user.email, user_id=user.id)
 
@@ -116,12 +167,16 @@ def sign_in(data: UserSignIn, session=Depends(get_session)) -> dict:
     }
 
 #3-1.토큰 갱신
-@user_router.post("/refresh-token")
+@user_router.post("/refresh-token", dependencies=[Depends(auth_limiter.guard("refresh-token"))])
 async def refresh_token(
         refresh_token: str = Form(...),
-        session: Session = Depends(get_session)
+        session: AsyncSession = Depends(get_session)
 ) -> dict:
     try:
+        # 서명을 확인한 토큰의 계정별로 발급 횟수 제한 (검증 결과는 캐시되어 아래에서 다시 검증하지 않음)
+        payload = verify_jwt_token(refresh_token, token_type="refresh")
+        await auth_limiter.hit("refresh-token", "account", str(payload["user_id"]))
+
         # Refresh 토큰으로 새 Access 토큰 발급
         new_access_token = refresh_access_token(refresh_token)
 
@@ -145,62 +200,86 @@ async def create_page_with_file(
     content: str = Form(...),
     public: bool = Form(...),
     scheduled_at: datetime = Form(None),
+    publish_at_schedule: bool = Form(False),  # True이면 비공개로 두었다가 scheduled_at에 공개
     files: Optional[List[UploadFile]] = File(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(authenticate)
 ):
+    # 예약 공개는 예약 시각이 미래일 때만 (이미 지났으면 바로 공개)
+    scheduled_at = local_time(scheduled_at) or datetime.now()
+    scheduled_public = publish_at_schedule and not public and scheduled_at > datetime.now()
+    if publish_at_schedule and not scheduled_public:
+        public = True
+
     # 새 페이지 생성
     new_page = Page(
         id=str(uuid4()),
         title=title,
-        content=content,
+        excerpt=make_excerpt(content),
         public=public,
         created_at=datetime.now(),
         updated_at=datetime.now(),
-        scheduled_at=scheduled_at or datetime.now(),
+        scheduled_at=scheduled_at,
+        scheduled_public=scheduled_public,
         owner_id=current_user.id,
     )
     session.add(new_page)
-    session.commit()
-    session.refresh(new_page)
 
-    # 파일이 있으면 업로드 처리
+    # 페이지와 첨부를 한 트랜잭션으로 저장 (실패하면 이 요청이 새로 쓴 파일도 정리)
     file_data_list = []
-    if files:
-        for file in files:
-            try:
-                # 파일 저장
-                file_path = os.path.join(UPLOAD_DIR, file.filename)
-                with open(file_path, "wb") as f:
-                    f.write(await file.read())
-
-                file_data = FileModel(
-                    fileurl=file_path,
+    written = []
+    try:
+        if files:
+            # 내용 해시로 blob을 찾고, 처음 보는 내용만 동시에 저장소에 기록
+            limiter = UploadLimiter()  # 요청 전체 크기 제한
+            digests = await asyncio.gather(*(digest_upload(file, limiter) for file in files))
+            blobs = await acquire_blobs(session, list(zip(files, digests)), written)
+
+            file_data_list = [
+                FileModel(
+                    fileurl=blobs[digest.sha256].path,
                     filename=file.filename,
                     content_type=file.content_type,
-                    size=os.path.getsize(file_path),
+                    size=digest.size,
+                    blob_hash=digest.sha256,
                     created_at=datetime.now(),
                     page_id=new_page.id
                 )
+                for file, digest in zip(files, digests)
+            ]
+
+        await session.flush()
+        await insert_contents(session, [(new_page.id, content)])  # 압축된 본문
+        if file_data_list:
+            await session.execute(insert(FileModel), [file.model_dump(exclude={"id"}) for file in file_data_list])
+        await index_page(session, new_page, content)  # 검색 색인 추가
+        await count_page_added(session, new_page)  # 날짜별 집계 갱신
+        await record_revision(session, new_page, content, current_user.id)  # 첫 리비전
+        await session.commit()
+    except HTTPException as e:
+        await session.rollback()
+        await purge_files(session, written)
+        raise e
+    except Exception as e:
+        await session.rollback()
+        await purge_files(session, written)
+        raise HTTPException(status_code=500, detail=f"파일 업로드 중 오류 발생: {str(e)}")
 
-                session.add(file_data)
-                session.commit()
-                session.refresh(file_data)
-
-                file_data_list.append(file_data)
-            except Exception as e:
-                session.rollback()
-                raise HTTPException(status_code=500, detail=f"파일 업로드 중 오류 발생: {str(e)}")
+    invalidate_page(new_page.owner_id, [new_page.public], [new_page.scheduled_at])  # 캐시된 조회 응답 무효화
+    await page_events.publish(page_event("created", new_page))  # 구독 중인 클라이언트에 알림
+    if new_page.scheduled_public:
+        scheduler.schedule(new_page.id, new_page.scheduled_at)
 
     # 새 페이지와 업로드된 파일들을 함께 반환
     return {
         "id": new_page.id,
         "title": new_page.title,
-        "content": new_page.content,
+        "content": content,
         "public": new_page.public,
         "created_at": new_page.created_at,
         "updated_at": new_page.updated_at,
         "scheduled_at": new_page.scheduled_at,
+        "scheduled_public": new_page.scheduled_public,
         "owner_id": new_page.owner_id,
         "uploaded_files": [
             {"filename": file.filename, "content_type": file.content_type, "size": file.size, "fileurl": file.fileurl}
@@ -208,33 +287,49 @@ async def create_page_with_file(
         ]
     }
 
-#5.공개된 페이지 조회 (public이 True인 경우만)
-@user_router.get("/pages", response_model=List[Page])
-def get_public_pages(session=Depends(get_session)):
-    # 공개된 페이지만 조회
-    public_pages = session.query(Page).filter(Page.public == True).all()
-    return public_pages
+# 목록용 요약 조회: 본문을 읽지 않고 PageSummary 컬럼과 첨부 수만 SELECT
+def select_page_summaries():
+    file_count = (
+        select(func.count(FileModel.id)).where(FileModel.page_id == Page.id).correlate(Page).scalar_subquery()
+    )
+    return select(
+        Page.id, Page.title, Page.excerpt, Page.public, Page.created_at, Page.updated_at,
+        Page.scheduled_at, Page.scheduled_public, Page.owner_id, file_count.label("file_count")
+    )
+
+
+#5.공개된 페이지 조회 (public이 True인 경우만, 최신순 커서 페이지네이션)
+@user_router.get("/pages", response_model=List[PageSummary])
+async def get_public_pages(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    session: AsyncSession = Depends(get_session)
+):
+    async def build(response: Response):
+        # 공개된 페이지만 조회
+        statement = select_page_summaries().where(Page.public == True)
+        public_pages, next_cursor = await paginate(
+            session, statement, [Page.created_at, Page.id], limit, cursor, descending=True
+        )
+        set_next_cursor(response, next_cursor)
+        return [row._asdict() for row in public_pages]
+
+    # 공개 페이지가 바뀔 때까지 같은 응답을 재사용 (ETag/If-None-Match 지원)
+    return await response_cache.serve(request, PUBLIC_SCOPE, {PUBLIC_PAGES}, build)
 
 
 #6.특정 페이지 조회
 @user_router.get("/pages/")
 async def get_pages_by_title(
         title: str = Query(..., description="조회할 페이지의 제목"),
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_session),
         current_user: User = Depends(authenticate),
 ):
     try:
         # 쿼리 수정
-        pages = (
-            session.query(Page)
-            .options(joinedload(Page.files))
-            .filter(Page.title == title)
-            .all()
-        )
-
-        print(
-            f"SQL Query executed: {str(session.query(Page).options(joinedload(Page.files)).filter(Page.title == title))}")
-        print(f"Found pages: {pages}")
+        statement = select(Page).options(selectinload(Page.files)).where(Page.title == title)
+        pages = (await session.exec(statement)).all()
 
         if not pages:
             raise HTTPException(status_code=404, detail="페이지를 찾을 수 없습니다")
@@ -248,69 +343,57 @@ async def get_pages_by_title(
                 detail="페이지에 접근할 권한이 없습니다"
             )
 
+        contents = await load_contents(session, [page.id for page in filtered_pages])  # 본문은 여기서만 읽음
         response_data = []
         for page in filtered_pages:
             page_data = {
                 "id": page.id,
                 "title": page.title,
-                "content": page.content,
+                "content": contents.get(page.id, ""),
                 "public": page.public,
                 "created_at": page.created_at,
                 "updated_at": page.updated_at,
                 "scheduled_at": page.scheduled_at,
                 "owner_id": page.owner_id,
+                "file_ids": [file.id for file in (page.files or [])],
                 "file_names": [file.filename for file in (page.files or [])],
                 "fileurl": [file.fileurl for file in (page.files or [])]  # file_url을 fileurl로 수정
             }
             response_data.append(page_data)
 
-        return response_data
+        return FastJSONResponse(response_data)  # 기본 타입만 있으므로 jsonable_encoder 없이 바로 직렬화
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        print(f"Error occurred: {str(e)}")  # 디버깅을 위한 에러 로그
+        logger.exception("페이지 조회 중 오류")
         raise HTTPException(status_code=500, detail=f"서버 오류가 발생했습니다: {str(e)}")
 
 #7.날짜별로 그룹화
 @user_router.get("/pages/calendar-view", response_model=List[dict])
-def get_calendar_view(
+async def get_calendar_view(
+        request: Request,
         start_date: datetime,
         end_date: datetime,
-        session=Depends(get_session),
+        counts_only: bool = Query(False, description="True이면 날짜별 페이지 수만 반환 (월/연 단위 달력용)"),
+        session: AsyncSession = Depends(get_session),
         current_user: User = Depends(authenticate)  # 인증된 사용자만
 ):
-    # 지정된 기간 내의 페이지 가져오기
-    pages = (
-        session.query(Page)
-        .filter(Page.scheduled_at.between(start_date, end_date))  # 날짜 범위 필터링
-        .all()
-    )
+    start_date, end_date = local_time(start_date), local_time(end_date)  # 저장된 예약 시각과 같은 로컬 시간으로
 
-    # 비공개 페이지는 소유자만 접근 가능하도록 필터링
-    filtered_pages = []
-    for page in pages:
-        if not page.public and page.owner_id != current_user.id:
-            continue  # 비공개 페이지는 소유자가 아니면 건너뜀
-        filtered_pages.append(page)
-
-    # 날짜별로 페이지 그룹화
-    calendar_data = {}
-    for page in filtered_pages:
-        date_key = page.scheduled_at.date()  # 날짜만 추출
-        if date_key not in calendar_data:
-            calendar_data[date_key] = []
-        calendar_data[date_key].append({
-            "id": page.id,
-            "title": page.title,
-            "content": page.content,
-            "public": page.public,
-            "owner_id" : page.owner_id
-        })
-
-    # 날짜별로 정렬 (오름차순)
-    sorted_calendar_data = sorted(calendar_data.items(), key=lambda x: x[0])
-
-    # 정렬된 데이터를 반환
-    return [{"date": key, "pages": value} for key, value in sorted_calendar_data]
+    async def build(response: Response):
+        # 날짜별 개수만 필요하면 집계 테이블에서 바로 조회
+        if counts_only:
+            return await calendar_counts(session, start_date, end_date, current_user.id)
+
+        # 비공개 페이지 필터링과 날짜별 그룹화는 SQL에서 처리 (날짜 오름차순)
+        return await calendar_pages(session, start_date, end_date, current_user.id)
+
+    # 사용자별로 캐시, 공개 페이지나 본인 페이지가 이 기간 안에서 바뀌면 무효화
+    tags = {CALENDAR, CALENDAR_PUBLIC, calendar_owner(current_user.id)}
+    return await response_cache.serve(
+        request, user_scope(current_user.id), tags, build, span=(start_date, end_date)
+    )
 
 
 #8.페이지 수정
@@ -320,14 +403,18 @@ async def update_page(
     title: str = Form(...),
     content: str = Form(...),
     public: bool = Form(...),
+    scheduled_at: Optional[datetime] = Form(None),  # 주면 예약 시각 변경
+    publish_at_schedule: Optional[bool] = Form(None),  # 주면 예약 공개 설정 변경
     files: Optional[List[UploadFile]] = File(None),
     delete_files: bool = Form(False),  # 파일 삭제 여부
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(authenticate)
 ):
+    written = []  # 이 요청이 새로 쓴 blob 객체 (롤백 시 정리)
     try:
         # 페이지 존재 여부 확인
-        page = session.query(Page).filter(Page.id == page_id).first()
+        statement = select(Page).options(selectinload(Page.files)).where(Page.id == page_id)
+        page = (await session.exec(statement)).first()
         if not page:
             raise HTTPException(status_code=404, detail="페이지를 찾을 수 없습니다.")
 
@@ -336,61 +423,96 @@ async def update_page(
             raise HTTPException(status_code=403, detail="자신의 페이지만 수정할 수 있습니다.")
 
         # 페이지 정보 업데이트
+        old_scheduled_at, old_public, old_title = page.scheduled_at, page.public, page.title
+        old_content, old_updated_at = await load_content(session, page.id), page.updated_at or page.created_at
         page.title = title
-        page.content = content
         page.public = public
         page.updated_at = datetime.now()
+        if scheduled_at is not None:
+            page.scheduled_at = local_time(scheduled_at)
+        if publish_at_schedule is not None:
+            page.scheduled_public = publish_at_schedule
+
+        # 예약 공개: 지금 공개로 바꾸거나 예약 시각이 지났으면 예약을 끝내고 바로 공개
+        if page.scheduled_public:
+            if public or not page.scheduled_at or page.scheduled_at <= datetime.now():
+                page.public, page.scheduled_public = True, False
 
         file_data_list = []
+        orphan_paths = []  # 커밋 후 저장소에서 지울 파일
 
         # 파일 삭제 요청이 있는 경우
         if delete_files:
-            for existing_file in page.files:
-                if os.path.exists(existing_file.fileurl):
-                    os.remove(existing_file.fileurl)
-                session.delete(existing_file)
-            session.commit()
+            orphan_paths += await detach_files(session, page.files)
 
         # 새 파일 업로드 요청이 있는 경우
         elif files:
-            # 기존 파일 삭제
+            # 기존 첨부를 내용 해시별로 묶음
+            existing_files = {}
             for existing_file in page.files:
-                if os.path.exists(existing_file.fileurl):
-                    os.remove(existing_file.fileurl)
-                session.delete(existing_file)
-            session.commit()
-
-            # 새 파일 업로드
-            for file in files:
-                try:
-                    # 파일 저장
-                    file_path = os.path.join(UPLOAD_DIR, file.filename)
-                    with open(file_path, "wb") as f:
-                        f.write(await file.read())
-
-                    file_data = FileModel(
-                        fileurl=file_path,
-                        filename=file.filename,
-                        content_type=file.content_type,
-                        size=os.path.getsize(file_path),
-                        created_at=datetime.now(),
-                        page_id=page.id
-                    )
-
-                    session.add(file_data)
-                    session.commit()
-                    session.refresh(file_data)
-
+                existing_files.setdefault(existing_file.blob_hash, []).append(existing_file)
+
+            limiter = UploadLimiter()  # 요청 전체 크기 제한
+            digests = await asyncio.gather(*(digest_upload(file, limiter) for file in files))
+
+            # 내용이 같은 기존 첨부는 blob을 건드리지 않고 메타데이터만 갱신
+            new_uploads = []
+            for file, digest in zip(files, digests):
+                unchanged = existing_files.get(digest.sha256)
+                if unchanged:
+                    file_data = unchanged.pop()
+                    file_data.filename = file.filename
+                    file_data.content_type = file.content_type
                     file_data_list.append(file_data)
-                except Exception as e:
-                    session.rollback()
-                    raise HTTPException(status_code=500, detail=f"파일 업로드 중 오류 발생: {str(e)}")
+                else:
+                    new_uploads.append((file, digest))
+
+            # 새 내용은 한 번에 blob 참조를 얻고 첨부 행을 함께 추가
+            blobs = await acquire_blobs(session, new_uploads, written)
+            new_files = [
+                FileModel(
+                    fileurl=blobs[digest.sha256].path,
+                    filename=file.filename,
+                    content_type=file.content_type,
+                    size=digest.size,
+                    blob_hash=digest.sha256,
+                    created_at=datetime.now(),
+                    page_id=page.id
+                )
+                for file, digest in new_uploads
+            ]
+            if new_files:
+                await session.execute(insert(FileModel), [file.model_dump(exclude={"id"}) for file in new_files])
+            file_data_list.extend(new_files)
+
+            # 새 목록에 없는 기존 첨부만 삭제
+            orphan_paths += await detach_files(session, [
+                existing_file for removed_files in existing_files.values() for existing_file in removed_files
+            ])
         else:
             # 파일 변경이 없는 경우 기존 파일 정보 유지
             file_data_list = page.files
 
-        session.commit()
-        session.refresh(page)
+        if content != old_content:
+            await save_content(session, page, content)
+        await index_page(session, page, content)  # 검색 색인 갱신
+        await count_page_moved(session, page, old_scheduled_at, old_public)  # 날짜별 집계 갱신
+
+        # 제목이나 내용이 바뀌었으면 리비전 추가 (이력이 없던 페이지는 수정 전 내용부터 남김)
+        if page.title != old_title or content != old_content:
+            await ensure_initial_revision(session, page.id, old_title, old_content, page.owner_id, old_updated_at)
+            await record_revision(session, page, content, current_user.id)
+        await session.commit()
+        await purge_files(session, orphan_paths)
+        invalidate_page(
+            page.owner_id, [old_public, page.public], [old_scheduled_at, page.scheduled_at],
+            title_changed=(page.title != old_title)
+        )
+        await page_events.publish(page_event("updated", page, old_public, old_scheduled_at))
+        if page.scheduled_public:
+            scheduler.schedule(page.id, page.scheduled_at)  # 예약 시각이 바뀌었으면 새 시각으로
+        else:
+            scheduler.cancel(page.id)
 
         # 업데이트된 페이지와 파일 정보 반환
         return {
@@ -398,11 +520,12 @@ async def update_page(
             "page": {
                 "id": page.id,
                 "title": page.title,
-                "content": page.content,
+                "content": content,
                 "public": page.public,
                 "created_at": page.created_at,
                 "updated_at": page.updated_at,
                 "scheduled_at": page.scheduled_at,
+                "scheduled_public": page.scheduled_public,
                 "owner_id": page.owner_id,
             },
             "files": [
@@ -416,8 +539,13 @@ async def update_page(
             ] if file_data_list else []
         }
 
+    except HTTPException as e:
+        await session.rollback()
+        await purge_files(session, written)
+        raise e
     except Exception as e:
-        session.rollback()
+        await session.rollback()
+        await purge_files(session, written)
         raise HTTPException(
             status_code=500,
             detail=f"페이지 수정 중 오류가 발생했습니다: {str(e)}"
@@ -425,27 +553,30 @@ async def update_page(
 
 #9.페이지 리스트(제목으로만)로 정렬
 @user_router.get("/pages/titles", response_model=List[str])
-def get_sorted_page_titles(
+async def get_sorted_page_titles(
+    request: Request,
     order_by: str = Query("asc", enum=["asc", "desc"], description="정렬 순서: asc(오름차순) 또는 desc(내림차순)"),
-    session: Session = Depends(get_session)):
-    statement = select(Page.title)
-    result = session.exec(statement).all()
-
-    # 정렬
-    if order_by == "asc":
-        sorted_titles = sorted(result)
-    else:
-        sorted_titles = sorted(result, reverse=True)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    session: AsyncSession = Depends(get_session)):
+    async def build(response: Response):
+        # 정렬은 (title, id) 인덱스를 타도록 SQL에서 처리
+        statement = select(Page.title, Page.id)
+        result, next_cursor = await paginate(
+            session, statement, [Page.title, Page.id], limit, cursor, descending=(order_by == "desc")
+        )
+        set_next_cursor(response, next_cursor)
+        return [row.title for row in result]
 
-    return sorted_titles
+    return await response_cache.serve(request, PUBLIC_SCOPE, {PAGE_TITLES}, build)
 
 
 #10.관리자가 사용자 삭제
 @user_router.delete("/users/email/{email}", status_code=status.HTTP_200_OK)
-def delete_user_by_email(
+async def delete_user_by_email(
         email: str,
         current_user: User = Depends(authenticate),  # 현재 인증된 사용자
-        session=Depends(get_session),
+        session: AsyncSession = Depends(get_session),
 ):
     # 관리자 권한 확인
     if not current_user.is_admin:
@@ -455,7 +586,8 @@ def delete_user_by_email(
         )
 
     # 삭제할 사용자 조회
-    user_to_delete = session.query(User).filter(User.email == email).first()
+    statement = select(User).where(User.email == email)
+    user_to_delete = (await session.exec(statement)).first()
     if not user_to_delete:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -469,20 +601,44 @@ def delete_user_by_email(
             detail="관리자는 자신을 삭제할 수 없습니다."
         )
 
-    session.delete(user_to_delete)
-    session.commit()
+    # 사용자의 페이지를 페이지 삭제(#11)와 같이 정리: 첨부 blob 참조, 검색 색인, 날짜별 집계, 이력, 본문
+    pages = (await session.exec(
+        select(Page).options(selectinload(Page.files)).where(Page.owner_id == user_to_delete.id)
+    )).all()
+    orphan_paths = await detach_files(session, [file for page in pages for file in page.files])
+    for page in pages:
+        await unindex_page(session, page.id)
+        await delete_revisions(session, page.id)
+        await delete_content(session, page.id)
+        await session.delete(page)
+    await count_pages_removed(session, pages)
+    # 다른 사용자의 페이지에 남긴 이력은 작성자만 비우고, 가져오기 작업 기록은 삭제
+    await session.execute(
+        update(PageRevision).where(PageRevision.author_id == user_to_delete.id).values(author_id=None)
+    )
+    await session.execute(delete(ImportJob).where(ImportJob.owner_id == user_to_delete.id))
+    await session.delete(user_to_delete)
+    await session.commit()
+    await purge_files(session, orphan_paths)
+    invalidate_principal(user_to_delete.id)  # 캐시된 사용자 정보 제거
+    await page_events.revoke(user_to_delete.id)  # 열려 있는 변경 구독 연결 종료
+    response_cache.clear()  # 사용자의 페이지도 함께 삭제되므로 조회 응답 전체 무효화
+    for page in pages:
+        scheduler.cancel(page.id)
+        await page_events.publish(page_event("deleted", page))
     return {"message": f"{email} 유저가 성공적으로 삭제되었습니다."}
 
 
 #11.관리자 또는 페이지 소유자 페이지 삭제
 @user_router.delete("/pages/{page_id}")
-def delete_page(
+async def delete_page(
     page_id: str,
-    session=Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(authenticate)  # 인증된 사용자
 ):
     # 삭제할 페이지 조회
-    page = session.query(Page).filter(Page.id == page_id).first()
+    statement = select(Page).options(selectinload(Page.files)).where(Page.id == page_id)
+    page = (await session.exec(statement)).first()
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
 
@@ -492,50 +648,404 @@ def delete_page(
             status_code=403, detail="You do not have permission to delete this page."
         )
 
-    # 페이지 삭제
-    session.delete(page)
-    session.commit()
+    # 첨부 파일의 blob 참조 반납 후 페이지 삭제
+    orphan_paths = await detach_files(session, page.files)
+    await unindex_page(session, page.id)
+    await count_page_removed(session, page)
+    await delete_revisions(session, page.id)
+    await delete_content(session, page.id)
+    await session.delete(page)
+    await session.commit()
+    await purge_files(session, orphan_paths)
+    invalidate_page(page.owner_id, [page.public], [page.scheduled_at])
+    await page_events.publish(page_event("deleted", page))
+    scheduler.cancel(page.id)
     return {"message": "Page  has been deleted."}
 
 #12.owner_Id가 만든 페이지 출력
-@user_router.get("/pages/by-owner/{owner_id}", response_model=List[Page])
-def get_pages_by_owner(
+@user_router.get("/pages/by-owner/{owner_id}", response_model=List[PageSummary])
+async def get_pages_by_owner(
     owner_id: int,
-    session: Session = Depends(get_session),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(authenticate)  # 인증된 사용자
 ):
-    # owner_id에 해당하는 페이지를 조회
-    pages = session.query(Page).filter(Page.owner_id == owner_id).all()
+    # 비공개 페이지 접근 권한 확인 (현재 페이지뿐 아니라 소유자의 전체 페이지 기준)
+    if owner_id != current_user.id:
+        has_private = (await session.exec(
+            select(exists().where(Page.owner_id == owner_id, Page.public == False))
+        )).one()
+        if has_private:
+            raise HTTPException(
+                status_code=403,
+                detail="비공개 페이지는 소유자만 접근 가능합니다."
+            )
+
+    # owner_id에 해당하는 페이지를 최신순으로 조회
+    statement = select_page_summaries().where(Page.owner_id == owner_id)
+    pages, next_cursor = await paginate(
+        session, statement, [Page.created_at, Page.id], limit, cursor, descending=True
+    )
 
     # 페이지가 없을 경우 에러 반환
-    if not pages:
+    if not pages and not cursor:
         raise HTTPException(status_code=404, detail="해당 소유자가 만든 페이지가 없습니다.")
 
-    # 비공개 페이지 접근 권한 확인
-    if any(not page.public and page.owner_id != current_user.id for page in pages):
+    # 조회한 컬럼이 곧 응답이므로 모델 검증 없이 바로 직렬화
+    response = FastJSONResponse([row._asdict() for row in pages])
+    set_next_cursor(response, next_cursor)
+    return response
+
+#13.User정보 username과 email로 list 정렬
+@user_router.get("/users/details", response_model=List[dict])
+async def get_sorted_user_details(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    session: AsyncSession = Depends(get_session)
+):
+    async def build(response: Response):
+        # User 테이블에서 username, email 가져오기 (is_admin이 False인 사용자만, 무조건 오름차순)
+        statement = select(User.username, User.email, User.id).where(User.is_admin == False)
+        user_details, next_cursor = await paginate(session, statement, [User.username, User.id], limit, cursor)
+        set_next_cursor(response, next_cursor)
+
+        # 리스트로 변환
+        return [{"username": detail.username, "email": detail.email} for detail in user_details]
+
+    return await response_cache.serve(request, PUBLIC_SCOPE, {USERS}, build)
+
+
+#14.첨부 파일 다운로드 (공개 페이지이거나 소유자만)
+@user_router.api_route("/files/{file_id}", methods=["GET", "HEAD"])
+async def download_file(
+    file_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    statement = (
+        select(FileModel, Page, Blob)
+        .join(Page, FileModel.page_id == Page.id)
+        .outerjoin(Blob, FileModel.blob_hash == Blob.hash)
+        .where(FileModel.id == file_id)
+    )
+    row = (await session.exec(statement)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
+
+    file, page, blob = row
+    if not page.public and page.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="파일에 접근할 권한이 없습니다.")
+
+    return file_response(request.headers, file, blob)
+
+
+
+#15.페이지 검색 (제목 + 본문, 공개 페이지이거나 본인 페이지만, 점수순 커서 페이지네이션)
+@user_router.get("/pages/search")
+async def search_pages_by_text(
+    q: str = Query(..., min_length=1, description="검색어"),
+    size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    result, next_cursor = await search_pages(session, q, current_user.id, size=size, cursor=cursor)
+    response = FastJSONResponse(result)
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+#16.관리자가 검색 색인 재구성
+@user_router.post("/pages/search/reindex")
+async def reindex_pages(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    if not current_user.is_admin:
         raise HTTPException(
-            status_code=403,
-            detail="비공개 페이지는 소유자만 접근 가능합니다."
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다."
         )
+    count = await reindex_all_pages(session)
+    return {"message": f"{count}개의 페이지를 다시 색인했습니다."}
 
-    return pages
 
-#13.User정보 username과 email로 list 정렬
-@user_router.get("/users/details", response_model=List[dict])
-def get_sorted_user_details(
-    session: Session = Depends(get_session)
+#17.관리자가 날짜별 페이지 수 집계 재구성
+@user_router.post("/pages/calendar-view/rebuild-counts")
+async def rebuild_calendar_counts(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
 ):
-    # User 테이블에서 username, email 가져오기 (is_admin이 False인 사용자만)
-    user_details = session.query(User.username, User.email).filter(User.is_admin == False).all()
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다."
+        )
+    count = await rebuild_day_counts(session)
+    response_cache.invalidate({CALENDAR})
+    return {"message": f"{count}개의 날짜별 집계를 다시 계산했습니다."}
+
+
+#18.관리자가 인증 캐시 적중률 조회
+@user_router.get("/auth/cache-stats")
+async def get_auth_cache_stats(current_user: User = Depends(authenticate)):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다."
+        )
+    return cache_stats()
+
+
+#19.관리자가 메일 발송 대기열 상태 조회
+@user_router.get("/outbox/stats")
+async def get_outbox_stats(current_user: User = Depends(authenticate)):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다."
+        )
+    return outbox.stats()
+
+
+#20.관리자가 조회 응답 캐시 상태 조회
+@user_router.get("/pages/cache-stats")
+async def get_response_cache_stats(current_user: User = Depends(authenticate)):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다."
+        )
+    return response_cache.stats()
+
 
-    # 리스트로 변환
-    user_details_list = [{"username": detail[0], "email": detail[1]} for detail in user_details]
+#21.페이지/첨부 메타데이터 대량 가져오기 (NDJSON, job_id를 주면 실패한 지점부터 재개)
+# 페이지 ID는 보존됨: 이미 있는 ID의 줄은 건너뛰고 conflicts에 줄별 409로 보고
+@user_router.post("/pages/import")
+async def import_pages(
+    request: Request,
+    job_id: Optional[str] = Query(None, description="재개할 가져오기 작업 ID"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    if job_id:
+        job = await session.get(ImportJob, job_id)
+        if not job or job.owner_id != current_user.id:
+            raise HTTPException(status_code=404, detail="가져오기 작업을 찾을 수 없습니다.")
+        if job.status == "done":
+            raise HTTPException(status_code=409, detail="이미 완료된 가져오기 작업입니다.")
+        job.status, job.error = "running", None
+    else:
+        job = ImportJob(id=str(uuid4()), owner_id=current_user.id)
+    session.add(job)
+    await session.commit()
 
-    # 무조건 오름차순으로 정렬
-    sorted_user_details = sorted(user_details_list, key=lambda x: x["username"])
+    importer = PageImporter(session, current_user, job, settings.BULK_IMPORT_BATCH_SIZE)
+    job = await importer.run(ndjson_lines(request.stream(), settings.BULK_IMPORT_MAX_SIZE))
+    response_cache.clear()  # 커밋된 청크가 있으면 조회 응답이 바뀜
 
-    return sorted_user_details
+    report = {**job.model_dump(mode="json"), "skipped": importer.skipped, "conflicts": importer.conflicts}
+    if job.status == "failed":
+        raise HTTPException(
+            status_code=importer.error_status,
+            detail={"message": job.error, "job": report}
+        )
+    return report
 
 
+#22.가져오기 진행 상황 조회
+@user_router.get("/pages/import/{job_id}")
+async def get_import_job(
+    job_id: str,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    job = await session.get(ImportJob, job_id)
+    if not job or job.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="가져오기 작업을 찾을 수 없습니다.")
+    return job
 
 
+#23.페이지/첨부 메타데이터 내보내기 (NDJSON 스트리밍, 관리자는 owner_id 생략 시 전체)
+@user_router.get("/pages/export")
+async def export_pages(
+    owner_id: Optional[int] = Query(None, description="내보낼 소유자 ID (관리자만 다른 사용자 지정 가능)"),
+    current_user: User = Depends(authenticate)
+):
+    if not current_user.is_admin:
+        if owner_id not in (None, current_user.id):
+            raise HTTPException(status_code=403, detail="자신의 페이지만 내보낼 수 있습니다.")
+        owner_id = current_user.id
+    return StreamingResponse(
+        export_ndjson(owner_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="pages.ndjson"'}
+    )
+
+
+# 리비전 조회/복원은 페이지 소유자(또는 관리자)만 (비공개였던 시점의 내용이 있을 수 있음)
+async def _revision_page(session: AsyncSession, page_id: str, current_user: User) -> Page:
+    page = await session.get(Page, page_id)
+    if not page:
+        raise HTTPException(status_code=404, detail="페이지를 찾을 수 없습니다.")
+    if page.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="페이지 이력은 소유자만 볼 수 있습니다.")
+    return page
+
+
+#24.페이지 리비전 목록 (최신순 커서 페이지네이션)
+@user_router.get("/pages/{page_id}/revisions")
+async def list_page_revisions(
+    page_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    await _revision_page(session, page_id, current_user)
+    statement = select(
+        PageRevision.number, PageRevision.base, PageRevision.title, PageRevision.size,
+        PageRevision.author_id, PageRevision.created_at
+    ).where(PageRevision.page_id == page_id)
+    revisions, next_cursor = await paginate(session, statement, [PageRevision.number], limit, cursor, descending=True)
+    response = FastJSONResponse([
+        {**revision._asdict(), "snapshot": revision.base == revision.number}
+        for revision in revisions
+    ])
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+#25.두 리비전 비교 (unified diff)
+@user_router.get("/pages/{page_id}/revisions/diff")
+async def diff_page_revisions(
+    page_id: str,
+    from_number: int = Query(..., alias="from", ge=1),
+    to_number: int = Query(..., alias="to", ge=1),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    await _revision_page(session, page_id, current_user)
+    return await diff_revisions(session, page_id, from_number, to_number)
+
+
+#26.특정 리비전 내용 조회
+@user_router.get("/pages/{page_id}/revisions/{number}")
+async def get_page_revision(
+    page_id: str,
+    number: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    await _revision_page(session, page_id, current_user)
+    revision, content = await load_revision(session, page_id, number)
+    return {
+        "number": revision.number,
+        "title": revision.title,
+        "content": content,
+        "author_id": revision.author_id,
+        "created_at": revision.created_at,
+    }
+
+
+#27.리비전으로 복원 (복원 결과도 새 리비전으로 추가)
+@user_router.post("/pages/{page_id}/revisions/{number}/restore")
+async def restore_page_revision(
+    page_id: str,
+    number: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    page = await _revision_page(session, page_id, current_user)
+    if page.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="자신의 페이지만 복원할 수 있습니다.")
+
+    revision, content = await load_revision(session, page_id, number)
+    old_title = page.title
+    page.title = revision.title
+    page.updated_at = datetime.now()
+    await save_content(session, page, content)
+
+    await index_page(session, page, content)
+    restored = await record_revision(session, page, content, current_user.id)
+    await session.commit()
+    invalidate_page(page.owner_id, [page.public], [page.scheduled_at], title_changed=(page.title != old_title))
+    await page_events.publish(page_event("updated", page))
+    return {"message": f"{number}번 리비전으로 복원했습니다.", "revision": restored}
+
+
+#28.페이지 본문 (text/plain, gzip을 받는 클라이언트에는 저장된 압축 본문을 그대로 전송)
+@user_router.get("/pages/{page_id}/content")
+async def get_page_content(
+    page_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(authenticate)
+):
+    page = await session.get(Page, page_id)
+    if not page:
+        raise HTTPException(status_code=404, detail="페이지를 찾을 수 없습니다.")
+    if not page.public and page.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="페이지에 접근할 권한이 없습니다.")
+    return await content_response(session, request.headers, page)
+
+
+# 웹소켓은 요청 세션 의존성 없이 짧은 세션으로 사용자 존재 확인 (캐시에 있으면 DB 조회 없음)
+async def _principal_exists(user_id: int) -> bool:
+    async with async_session() as session:
+        return await load_principal(session, user_id) is not None
+
+
+#29.페이지 변경 구독 (WebSocket): 목록을 반복 조회하는 대신 변경 이벤트를 받음
+# 접속: /user/pages/events?token=<액세스 토큰> (브라우저가 아니면 Authorization 헤더도 가능)
+# 구독: {"action": "subscribe", "topic": "own" | "public" | "range", "start": "2024-01-01", "end": "2024-01-31"}
+@user_router.websocket("/pages/events")
+async def page_events_socket(websocket: WebSocket, token: Optional[str] = None):
+    token = token or websocket.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    try:
+        payload = verify_jwt_token(token) if token else {}
+    except HTTPException:
+        payload = {}
+    user_id = payload.get("user_id")
+    if not user_id or not await _principal_exists(user_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    subscriber = page_events.hub.connect(user_id)
+    if subscriber is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)  # 이 워커의 연결 수 초과
+        return
+    await websocket.accept()
+
+    # 보내기는 연결별 작업 하나가 큐에서 꺼내 전송 (이벤트를 발행하는 쪽은 소켓을 기다리지 않음)
+    async def send_events():
+        while True:
+            message = await subscriber.queue.get()
+            if message is REVOKED:  # 사용자가 삭제됨
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                return
+            await websocket.send_text(message)
+
+    sender = asyncio.create_task(send_events())
+    try:
+        while True:
+            # 토큰이 만료되면 연결 종료 (클라이언트는 새 토큰으로 다시 접속)
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), timeout=max(payload["exp"] - time(), 0))
+            except asyncio.TimeoutError:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="토큰이 만료되었습니다.")
+                break
+            # 구독을 바꿀 때마다 사용자가 남아 있는지 다시 확인 (보통 캐시에서 확인됨)
+            if not await _principal_exists(user_id):
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                break
+            reply = page_events.handle(subscriber, raw)
+            subscriber.push(dumps(reply).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        page_events.hub.disconnect(subscriber)
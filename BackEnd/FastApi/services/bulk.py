@@ -0,0 +1,261 @@
+import json
+from collections import Counter
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional, Set, Tuple
+from uuid import uuid4
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_settings, async_session
+from models.users import Blob, FileModel, FileRecord, ImportJob, Page, PageBody, PageRecord, User
+from services.calendar import count_pages_added
+from services.page_content import decode_body, insert_contents, make_excerpt
+from services.search import index_new_pages
+
+settings = get_settings()
+
+EXPORT_LINES_PER_CHUNK = 500  # 응답으로 한 번에 내보내는 줄 수
+MAX_REPORTED_CONFLICTS = 100  # 응답에 담는 충돌 레코드 수 (나머지는 개수만)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__}은(는) JSON으로 변환할 수 없습니다.")
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+
+
+# 요청 본문을 줄 단위로 나눔: (줄 번호, 내용) - 빈 줄도 번호를 차지함
+async def ndjson_lines(chunks: AsyncIterator[bytes], max_size: int) -> AsyncIterator[Tuple[int, bytes]]:
+    buffer = b""
+    received = 0
+    line_no = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_size:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="가져올 데이터가 너무 큽니다.")
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+    if buffer:
+        yield line_no + 1, buffer
+
+
+def _parse(line_no: int, line: bytes):
+    try:
+        record = json.loads(line)
+        kind = record.pop("type", "page")
+        if kind == "page":
+            return PageRecord.model_validate(record)
+        if kind == "file":
+            return FileRecord.model_validate(record)
+        raise ValueError(f"알 수 없는 레코드 종류입니다: {kind}")
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{line_no}번째 줄을 해석할 수 없습니다: {e}")
+
+
+# NDJSON 가져오기: 청크마다 다중 행 INSERT 후 진행 상황과 함께 한 트랜잭션으로 커밋
+# 페이지 ID는 그대로 보존 (내보낸 첨부가 page_id로 페이지를 가리키므로). 이미 있는 ID는 덮어쓰지 않고
+# 그 줄만 건너뛰어 충돌(409)로 보고하고, 건너뛴 페이지의 첨부도 함께 건너뜀
+class PageImporter:
+    def __init__(self, session: AsyncSession, user: User, job: ImportJob, batch_size: int):
+        self.session = session
+        self.user = user
+        self.job = job
+        self.batch_size = batch_size
+        self.conflicts: List[dict] = []  # 이번 요청에서 건너뛴 줄 (최대 MAX_REPORTED_CONFLICTS개)
+        self.skipped = 0
+        self.error_status = status.HTTP_400_BAD_REQUEST
+        self._skipped_pages: Set[str] = set()
+
+    def _conflict(self, line_no: int, detail: str, page_id: Optional[str]):
+        self.skipped += 1
+        if len(self.conflicts) < MAX_REPORTED_CONFLICTS:
+            self.conflicts.append({"line": line_no, "status": status.HTTP_409_CONFLICT, "id": page_id, "detail": detail})
+
+    # 이미 있는 ID, 같은 요청 안에서 반복된 ID, 건너뛴 페이지의 첨부를 걸러냄
+    async def _without_conflicts(self, records: List[Tuple[int, object]]) -> list:
+        page_ids = [record.id for _, record in records if isinstance(record, PageRecord) and record.id]
+        existing = set((await self.session.exec(select(Page.id).where(Page.id.in_(page_ids)))).all()) if page_ids else set()
+        accepted = []
+        for line_no, record in records:
+            if isinstance(record, PageRecord) and record.id:
+                if record.id in existing or record.id in self._skipped_pages:
+                    self._skipped_pages.add(record.id)
+                    self._conflict(line_no, "이미 있는 페이지 ID입니다.", record.id)
+                    continue
+                existing.add(record.id)
+            elif isinstance(record, FileRecord) and record.page_id in self._skipped_pages:
+                self._conflict(line_no, "건너뛴 페이지의 첨부입니다.", record.page_id)
+                continue
+            accepted.append(record)
+        return accepted
+
+    def _page(self, record: PageRecord) -> Page:
+        now = datetime.now()
+        created_at = record.created_at or now
+        return Page(
+            id=record.id or str(uuid4()),
+            title=record.title,
+            excerpt=make_excerpt(record.content),
+            public=record.public,
+            created_at=created_at,
+            updated_at=record.updated_at or created_at,
+            scheduled_at=record.scheduled_at or created_at,
+            owner_id=record.owner_id if self.user.is_admin and record.owner_id else self.user.id,
+        )
+
+    # [(페이지, 본문)]
+    async def _insert_pages(self, pages: List[Tuple[Page, str]]):
+        await self.session.execute(insert(Page), [page.model_dump(exclude={"owner", "files"}) for page, _ in pages])
+        await insert_contents(self.session, [(page.id, content) for page, content in pages])  # 압축된 본문
+        await index_new_pages(self.session, pages)  # 검색 색인
+        await count_pages_added(self.session, [page for page, _ in pages])  # 날짜별 집계
+
+    async def _insert_files(self, records: List[FileRecord], last_line: int):
+        page_ids = {record.page_id for record in records}
+        statement = select(Page.id).where(Page.id.in_(page_ids))
+        if not self.user.is_admin:
+            statement = statement.where(Page.owner_id == self.user.id)
+        allowed = set((await self.session.exec(statement)).all())
+        missing = page_ids - allowed
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{last_line}번째 줄까지의 청크에 가져올 수 없는 페이지의 첨부가 있습니다: {sorted(missing)[:5]}"
+            )
+
+        # 이 저장소에 있는 blob만 참조하고 참조 수를 올림 (없으면 기존 경로만 유지)
+        hashes = {record.blob_hash for record in records if record.blob_hash}
+        known = set((await self.session.exec(select(Blob.hash).where(Blob.hash.in_(hashes)))).all()) if hashes else set()
+        references = Counter(record.blob_hash for record in records if record.blob_hash in known)
+        for blob_hash, count in references.items():
+            await self.session.execute(
+                update(Blob).where(Blob.hash == blob_hash).values(ref_count=Blob.ref_count + count)
+            )
+
+        now = datetime.now()
+        await self.session.execute(insert(FileModel), [
+            {
+                "filename": record.filename,
+                "fileurl": record.fileurl,
+                "blob_hash": record.blob_hash if record.blob_hash in known else None,
+                "content_type": record.content_type,
+                "size": record.size,
+                "created_at": record.created_at or now,
+                "page_id": record.page_id,
+            }
+            for record in records
+        ])
+
+    # records: [(줄 번호, 레코드)]
+    async def _flush(self, records: List[Tuple[int, object]], last_line: int):
+        records = await self._without_conflicts(records)
+        pages = [(self._page(record), record.content) for record in records if isinstance(record, PageRecord)]
+        files = [record for record in records if isinstance(record, FileRecord)]
+        try:
+            if pages:
+                await self._insert_pages(pages)
+            if files:
+                await self._insert_files(files, last_line)
+        except IntegrityError:
+            # 확인한 뒤 다른 요청이 같은 ID를 먼저 넣은 경우: 이 청크만 되돌리고 재개하면 그 줄부터 다시 확인
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{last_line}번째 줄까지의 청크를 저장하는 중 다른 요청과 충돌했습니다. 다시 시도해 주세요."
+            )
+
+        self.job.lines_done = last_line
+        self.job.pages += len(pages)
+        self.job.files += len(files)
+        self.job.updated_at = datetime.now()
+        self.session.add(self.job)
+        await self.session.commit()
+
+    # 이미 커밋된 줄(job.lines_done)은 건너뛰고 이어서 가져옴
+    async def run(self, lines: AsyncIterator[Tuple[int, bytes]]) -> ImportJob:
+        resume_after = self.job.lines_done
+        records, last_line = [], resume_after
+        try:
+            async for line_no, line in lines:
+                if line_no <= resume_after:
+                    continue
+                last_line = line_no
+                if line.strip():
+                    records.append((line_no, _parse(line_no, line)))
+                if len(records) >= self.batch_size:
+                    await self._flush(records, last_line)
+                    records = []
+            await self._flush(records, last_line)
+            self.job.status = "done"
+        except Exception as e:
+            await self.session.rollback()
+            await self.session.refresh(self.job)  # 마지막으로 커밋된 진행 상황
+            self.job.status = "failed"
+            self.job.error = (e.detail if isinstance(e, HTTPException) else repr(e))[:1024]
+            if isinstance(e, HTTPException):
+                self.error_status = e.status_code
+        self.job.updated_at = datetime.now()
+        self.session.add(self.job)
+        await self.session.commit()
+        return self.job
+
+
+# MySQL/PostgreSQL의 statement timeout은 긴 스트리밍 조회를 끊으므로 현재 트랜잭션에서만 해제
+async def _disable_statement_timeout(session: AsyncSession):
+    backend = session.bind.dialect.name
+    if backend == "postgresql":
+        await session.execute(text("SET LOCAL statement_timeout = 0"))
+    elif backend == "mysql":
+        await session.execute(text("SET SESSION max_execution_time = 0"))
+
+
+async def _restore_statement_timeout(session: AsyncSession):
+    if session.bind.dialect.name == "mysql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        await session.execute(text(f"SET SESSION max_execution_time = {int(settings.DB_STATEMENT_TIMEOUT_MS)}"))
+
+
+# 내보내기 한 줄: 페이지는 압축된 본문을 풀어 content로 (가져오기 형식과 같게)
+def _record(row) -> dict:
+    record = dict(row._mapping)
+    if "data" in record:
+        encoding, data = record.pop("encoding"), record.pop("data")
+        record["content"] = decode_body(encoding, data) if data is not None else ""
+    return record
+
+
+# NDJSON 내보내기: 서버 측 커서로 페이지, 첨부 순서로 흘려보내 메모리 사용량이 데이터 크기와 무관
+async def export_ndjson(owner_id: Optional[int]) -> AsyncIterator[str]:
+    page_columns = [column for column in Page.__table__.columns if column.key != "excerpt"]
+    file_columns = [
+        FileModel.filename, FileModel.fileurl, FileModel.blob_hash, FileModel.content_type,
+        FileModel.size, FileModel.created_at, FileModel.page_id
+    ]
+    pages = (
+        select(*page_columns, PageBody.encoding, PageBody.data)
+        .outerjoin(PageBody, PageBody.page_id == Page.id)
+        .order_by(Page.id)
+    )
+    files = select(*file_columns).join(Page, FileModel.page_id == Page.id).order_by(FileModel.id)
+    if owner_id is not None:
+        pages = pages.where(Page.owner_id == owner_id)
+        files = files.where(Page.owner_id == owner_id)
+
+    # 응답을 보내는 동안 요청의 세션은 이미 닫히므로 전용 세션 사용
+    async with async_session() as session:
+        await _disable_statement_timeout(session)
+        try:
+            for kind, statement in (("page", pages), ("file", files)):
+                result = await session.stream(statement.execution_options(yield_per=EXPORT_LINES_PER_CHUNK))
+                async for partition in result.partitions():
+                    yield "".join(_dumps({"type": kind, **_record(row)}) for row in partition)
+        finally:
+            await _restore_statement_timeout(session)
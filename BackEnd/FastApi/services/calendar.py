@@ -0,0 +1,158 @@
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import List, Optional
+from sqlalchemy import Select, case, delete, func, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models.users import CalendarDayCount, Page
+
+PUBLIC_SCOPE = 0  # 공개 페이지 집계 행의 scope_owner_id
+
+
+# 페이지가 어느 집계 행에 속하는지: 공개면 0, 비공개면 소유자 ID
+def _scope(public: bool, owner_id: int) -> int:
+    return PUBLIC_SCOPE if public else owner_id
+
+
+# 날짜별 집계 행의 count를 delta만큼 변경 (행이 없으면 생성)
+async def _add_count(session: AsyncSession, scheduled_at: Optional[datetime], scope_owner_id: int, delta: int):
+    if scheduled_at is None:
+        return
+    day = scheduled_at.date()
+    statement = (
+        update(CalendarDayCount)
+        .where(CalendarDayCount.day == day, CalendarDayCount.scope_owner_id == scope_owner_id)
+        .values(count=CalendarDayCount.count + delta)
+    )
+    if (await session.execute(statement)).rowcount:
+        return
+    try:
+        async with session.begin_nested():
+            await session.execute(insert(CalendarDayCount).values(day=day, scope_owner_id=scope_owner_id, count=delta))
+    except IntegrityError:
+        await session.execute(statement)  # 다른 요청이 먼저 행을 만든 경우
+
+
+async def count_page_added(session: AsyncSession, page: Page):
+    await _add_count(session, page.scheduled_at, _scope(page.public, page.owner_id), 1)
+
+
+async def count_page_removed(session: AsyncSession, page: Page):
+    await _add_count(session, page.scheduled_at, _scope(page.public, page.owner_id), -1)
+
+
+async def _add_counts(session: AsyncSession, pages: List[Page], sign: int):
+    deltas = Counter(
+        (page.scheduled_at.date(), _scope(page.public, page.owner_id)) for page in pages if page.scheduled_at
+    )
+    for (day, scope_owner_id), delta in deltas.items():
+        await _add_count(session, datetime.combine(day, datetime.min.time()), scope_owner_id, sign * delta)
+
+
+# 여러 페이지를 한 번에 추가/삭제할 때 (날짜, 범위)별로 묶어서 갱신
+async def count_pages_added(session: AsyncSession, pages: List[Page]):
+    await _add_counts(session, pages, 1)
+
+
+async def count_pages_removed(session: AsyncSession, pages: List[Page]):
+    await _add_counts(session, pages, -1)
+
+
+# 페이지 수정 시 날짜나 공개 여부가 바뀐 경우에만 집계 이동
+async def count_page_moved(
+        session: AsyncSession,
+        page: Page,
+        old_scheduled_at: Optional[datetime],
+        old_public: bool
+):
+    old_day = old_scheduled_at.date() if old_scheduled_at else None
+    new_day = page.scheduled_at.date() if page.scheduled_at else None
+    if old_day == new_day and old_public == page.public:
+        return
+    await _add_count(session, old_scheduled_at, _scope(old_public, page.owner_id), -1)
+    await count_page_added(session, page)
+
+
+# 기간 내 페이지를 날짜별로 묶어 반환 (가벼운 필드만, 공개/소유자 필터는 SQL에서)
+async def calendar_pages(session: AsyncSession, start_date: datetime, end_date: datetime, user_id: int) -> List[dict]:
+    day = func.date(Page.scheduled_at).label("day")
+    statement = (
+        select(day, Page.id, Page.title, Page.public, Page.owner_id, Page.scheduled_at)
+        .where(
+            Page.scheduled_at.between(start_date, end_date),
+            or_(Page.public == True, Page.owner_id == user_id)
+        )
+        .order_by(Page.scheduled_at, Page.id)
+    )
+    rows = (await session.exec(statement)).all()
+    return [
+        {
+            "date": key,
+            "pages": [
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "public": row.public,
+                    "owner_id": row.owner_id,
+                    "scheduled_at": row.scheduled_at
+                }
+                for row in group
+            ]
+        }
+        for key, group in groupby(rows, key=lambda row: str(row.day))
+    ]
+
+
+# 기간 내 날짜별 페이지 수 (calendar_pages와 같은 시각 범위)
+# 기간에 온전히 들어가는 날짜는 집계 테이블에서, 일부만 걸친 처음/마지막 날짜는 페이지 테이블에서 셈
+async def calendar_counts(session: AsyncSession, start_date: datetime, end_date: datetime, user_id: int) -> List[dict]:
+    first_day = start_date.date() if start_date.time() == time.min else start_date.date() + timedelta(days=1)
+    last_day = end_date.date() if end_date.time() == time.max else end_date.date() - timedelta(days=1)
+    counts = Counter()
+
+    edges = [Page.scheduled_at.between(start_date, end_date), or_(Page.public == True, Page.owner_id == user_id)]
+    if first_day <= last_day:
+        rows = (await session.exec(
+            select(CalendarDayCount.day, func.sum(CalendarDayCount.count).label("count"))
+            .where(
+                CalendarDayCount.day.between(first_day, last_day),
+                CalendarDayCount.scope_owner_id.in_([PUBLIC_SCOPE, user_id])
+            )
+            .group_by(CalendarDayCount.day)
+        )).all()
+        counts.update({row.day: row.count for row in rows})
+        edges.append(or_(
+            Page.scheduled_at < datetime.combine(first_day, time.min),
+            Page.scheduled_at >= datetime.combine(last_day + timedelta(days=1), time.min)
+        ))
+
+    day = func.date(Page.scheduled_at).label("day")
+    rows = (await session.exec(select(day, func.count().label("count")).where(*edges).group_by(day))).all()
+    counts.update({date.fromisoformat(str(row.day)): row.count for row in rows})
+    return [{"date": key, "count": count} for key, count in sorted(counts.items()) if count > 0]
+
+
+# 페이지 테이블에서 (날짜, 범위)별 페이지 수를 세는 쿼리 (집계 재구성과 마이그레이션에서 사용)
+def day_count_query() -> Select:
+    day = func.date(Page.scheduled_at).label("day")
+    scope = case((Page.public == True, PUBLIC_SCOPE), else_=Page.owner_id).label("scope_owner_id")
+    return select(day, scope, func.count().label("count")).where(Page.scheduled_at != None).group_by(day, scope)
+
+
+def day_count_values(rows) -> List[dict]:
+    return [
+        {"day": date.fromisoformat(str(row.day)), "scope_owner_id": row.scope_owner_id, "count": row.count}
+        for row in rows
+    ]
+
+
+# 집계 테이블을 페이지 테이블로부터 다시 계산 (집계 도입 전 데이터용)
+async def rebuild_day_counts(session: AsyncSession) -> int:
+    await session.execute(delete(CalendarDayCount))
+    rows = (await session.exec(day_count_query())).all()
+    if rows:
+        await session.execute(insert(CalendarDayCount), day_count_values(rows))
+    await session.commit()
+    return len(rows)
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import sqlite3
+from time import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+from fastapi import HTTPException, status
+from database.connection import get_settings
+from models.utils import generate_verification_code
+
+settings = get_settings()
+
+MAX_ISSUE_RETRIES = 20  # 사용 중인 코드와 겹칠 때 다시 뽑는 횟수
+
+
+class PendingSignup(NamedTuple):
+    email: str
+    code: str
+    data: dict
+
+
+def _codes_exhausted():
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="인증 코드를 발급할 수 없습니다. 잠시 후 다시 시도해 주세요."
+    )
+
+
+# 인증 코드 저장소 인터페이스: 이메일 -> 코드와 코드 -> 이메일을 함께 유지해 양방향 O(1) 조회
+class CodeStore:
+    def __init__(self, ttl: int, generate: Callable[[], str] = generate_verification_code):
+        self.ttl = ttl
+        self.generate = generate
+
+    # 이메일에 새 코드를 발급 (이전 코드는 무효화, 사용 중인 코드와 겹치지 않게 발급)
+    async def issue(self, email: str, data: dict) -> str:
+        raise NotImplementedError
+
+    async def get(self, email: str) -> Optional[PendingSignup]:
+        raise NotImplementedError
+
+    async def find(self, code: str) -> Optional[PendingSignup]:
+        raise NotImplementedError
+
+    async def delete(self, email: str):
+        raise NotImplementedError
+
+    # 실패 횟수를 1 늘리고 현재 값을 반환
+    async def record_failure(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def failures(self, key: str) -> int:
+        raise NotImplementedError
+
+    # 만료된 항목 정리, 지운 개수 반환
+    async def sweep(self) -> int:
+        return 0
+
+    async def run_sweeper(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.sweep()
+
+
+# 프로세스 메모리 백엔드 (워커 하나일 때 또는 테스트용)
+class MemoryCodeStore(CodeStore):
+    def __init__(self, ttl: int, generate: Callable[[], str] = generate_verification_code):
+        super().__init__(ttl, generate)
+        self._by_email: Dict[str, Tuple[str, dict, float]] = {}
+        self._by_code: Dict[str, str] = {}
+        self._failures: Dict[str, Tuple[int, float]] = {}
+
+    def _live(self, email: Optional[str]) -> Optional[PendingSignup]:
+        entry = self._by_email.get(email) if email else None
+        if entry is None:
+            return None
+        code, data, expires_at = entry
+        if expires_at <= time():
+            self._remove(email)
+            return None
+        return PendingSignup(email, code, data)
+
+    def _remove(self, email: str):
+        entry = self._by_email.pop(email, None)
+        if entry and self._by_code.get(entry[0]) == email:
+            del self._by_code[entry[0]]
+
+    async def issue(self, email: str, data: dict) -> str:
+        self._remove(email)
+        for _ in range(MAX_ISSUE_RETRIES):
+            code = self.generate()
+            if self._live(self._by_code.get(code)) is None:
+                self._by_email[email] = (code, data, time() + self.ttl)
+                self._by_code[code] = email
+                return code
+        _codes_exhausted()
+
+    async def get(self, email: str) -> Optional[PendingSignup]:
+        return self._live(email)
+
+    async def find(self, code: str) -> Optional[PendingSignup]:
+        return self._live(self._by_code.get(code))
+
+    async def delete(self, email: str):
+        self._remove(email)
+
+    async def record_failure(self, key: str) -> int:
+        count, expires_at = self._failures.get(key, (0, 0.0))
+        if expires_at <= time():
+            count, expires_at = 0, time() + self.ttl
+        self._failures[key] = (count + 1, expires_at)
+        return count + 1
+
+    async def failures(self, key: str) -> int:
+        count, expires_at = self._failures.get(key, (0, 0.0))
+        return count if expires_at > time() else 0
+
+    async def sweep(self) -> int:
+        now = time()
+        expired = [email for email, (_, _, expires_at) in self._by_email.items() if expires_at <= now]
+        for email in expired:
+            self._remove(email)
+        for key in [key for key, (_, expires_at) in self._failures.items() if expires_at <= now]:
+            del self._failures[key]
+        return len(expired)
+
+
+# SQLite 파일 백엔드 (같은 호스트의 여러 uvicorn 워커가 공유, 재시작해도 유지)
+class SqliteCodeStore(CodeStore):
+    def __init__(self, path: str, ttl: int, generate: Callable[[], str] = generate_verification_code):
+        super().__init__(ttl, generate)
+        self.path = path
+        with self._connect() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS signup_code (
+                    email TEXT PRIMARY KEY,
+                    code TEXT NOT NULL UNIQUE,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_signup_code_expires_at ON signup_code (expires_at);
+                CREATE TABLE IF NOT EXISTS signup_failure (
+                    key TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+            """)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _run(self, fn, *args):
+        def call():
+            db = self._connect()
+            try:
+                return fn(db, *args)
+            finally:
+                db.close()
+        return asyncio.to_thread(call)
+
+    @staticmethod
+    def _row(row) -> Optional[PendingSignup]:
+        return PendingSignup(row[0], row[1], json.loads(row[2])) if row else None
+
+    def _issue(self, db, email: str, data: dict) -> Optional[str]:
+        now = time()
+        payload = json.dumps(data)
+        for _ in range(MAX_ISSUE_RETRIES):
+            code = self.generate()
+            try:
+                with db:
+                    db.execute("BEGIN IMMEDIATE")
+                    db.execute("DELETE FROM signup_code WHERE email = ? OR (code = ? AND expires_at <= ?)", (email, code, now))
+                    db.execute(
+                        "INSERT INTO signup_code (email, code, data, expires_at) VALUES (?, ?, ?, ?)",
+                        (email, code, payload, now + self.ttl)
+                    )
+                return code
+            except sqlite3.IntegrityError:
+                continue  # 다른 이메일이 쓰고 있는 코드
+        return None
+
+    async def issue(self, email: str, data: dict) -> str:
+        code = await self._run(self._issue, email, data)
+        if code is None:
+            _codes_exhausted()
+        return code
+
+    async def get(self, email: str) -> Optional[PendingSignup]:
+        return self._row(await self._run(lambda db: db.execute(
+            "SELECT email, code, data FROM signup_code WHERE email = ? AND expires_at > ?", (email, time())
+        ).fetchone()))
+
+    async def find(self, code: str) -> Optional[PendingSignup]:
+        return self._row(await self._run(lambda db: db.execute(
+            "SELECT email, code, data FROM signup_code WHERE code = ? AND expires_at > ?", (code, time())
+        ).fetchone()))
+
+    async def delete(self, email: str):
+        await self._run(lambda db: db.execute("DELETE FROM signup_code WHERE email = ?", (email,)))
+
+    def _record_failure(self, db, key: str) -> int:
+        now = time()
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM signup_failure WHERE key = ? AND expires_at <= ?", (key, now))
+            db.execute(
+                "INSERT INTO signup_failure (key, count, expires_at) VALUES (?, 1, ?) "
+                "ON CONFLICT(key) DO UPDATE SET count = count + 1",
+                (key, now + self.ttl)
+            )
+            return db.execute("SELECT count FROM signup_failure WHERE key = ?", (key,)).fetchone()[0]
+
+    async def record_failure(self, key: str) -> int:
+        return await self._run(self._record_failure, key)
+
+    async def failures(self, key: str) -> int:
+        row = await self._run(lambda db: db.execute(
+            "SELECT count FROM signup_failure WHERE key = ? AND expires_at > ?", (key, time())
+        ).fetchone())
+        return row[0] if row else 0
+
+    async def sweep(self) -> int:
+        def sweep(db):
+            now = time()
+            removed = db.execute("DELETE FROM signup_code WHERE expires_at <= ?", (now,)).rowcount
+            db.execute("DELETE FROM signup_failure WHERE expires_at <= ?", (now,))
+            return removed
+        return await self._run(sweep)
+
+
+# Redis 프로토콜 백엔드 (redis 패키지 필요, 만료는 서버의 TTL로 처리)
+class RedisCodeStore(CodeStore):
+    def __init__(self, url: str, ttl: int, generate: Callable[[], str] = generate_verification_code):
+        super().__init__(ttl, generate)
+        from redis import asyncio as redis_asyncio
+        self.redis = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def issue(self, email: str, data: dict) -> str:
+        await self.delete(email)
+        for _ in range(MAX_ISSUE_RETRIES):
+            code = self.generate()
+            if await self.redis.set(f"signup:code:{code}", email, ex=self.ttl, nx=True):
+                await self.redis.set(
+                    f"signup:email:{email}", json.dumps({"code": code, "data": data}), ex=self.ttl
+                )
+                return code
+        _codes_exhausted()
+
+    async def get(self, email: str) -> Optional[PendingSignup]:
+        raw = await self.redis.get(f"signup:email:{email}")
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return PendingSignup(email, entry["code"], entry["data"])
+
+    async def find(self, code: str) -> Optional[PendingSignup]:
+        email = await self.redis.get(f"signup:code:{code}")
+        pending = await self.get(email) if email else None
+        return pending if pending and pending.code == code else None
+
+    async def delete(self, email: str):
+        pending = await self.get(email)
+        keys = [f"signup:email:{email}"] + ([f"signup:code:{pending.code}"] if pending else [])
+        await self.redis.delete(*keys)
+
+    async def record_failure(self, key: str) -> int:
+        count = await self.redis.incr(f"signup:failure:{key}")
+        if count == 1:
+            await self.redis.expire(f"signup:failure:{key}", self.ttl)
+        return count
+
+    async def failures(self, key: str) -> int:
+        return int(await self.redis.get(f"signup:failure:{key}") or 0)
+
+
+# 코드를 확인하고 실패 횟수를 제한
+# - IP별 실패: 한 클라이언트가 이메일이나 코드를 바꿔 가며 계속 맞춰 보지 못하게 막기만 함 (코드는 그대로 둠)
+# - 코드별 실패: 발급된 코드 하나에 대한 실패가 IP와 관계없이 max_attempts번 쌓이면 그 코드를 무효화
+#   (코드가 없는 이메일에 대한 실패는 세지 않고, 새로 발급한 코드는 다시 처음부터 셈)
+async def verify_code(
+        store: CodeStore, code: str, email: Optional[str], ip: str, max_attempts: int, max_ip_failures: int
+) -> PendingSignup:
+    ip_key = f"ip:{ip}"
+    if await store.failures(ip_key) >= max_ip_failures:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="인증 시도 횟수를 초과했습니다."
+        )
+
+    pending = await store.get(email) if email else await store.find(code)
+    if pending and pending.code == code:
+        return pending
+
+    await store.record_failure(ip_key)
+    if pending is not None:
+        if await store.record_failure(f"code:{pending.email}:{pending.code}") >= max_attempts:
+            await store.delete(pending.email)  # 너무 많이 틀리면 코드를 다시 요청해야 함
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 인증 코드입니다."
+    )
+
+
+# VERIFICATION_CODE_STORE 설정으로 백엔드 선택: memory / sqlite:///경로 / redis://호스트
+def create_code_store(url: str, ttl: int) -> CodeStore:
+    if url.startswith("sqlite:///"):
+        return SqliteCodeStore(url[len("sqlite:///"):], ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCodeStore(url, ttl)
+    return MemoryCodeStore(ttl)
+
+
+code_store = create_code_store(settings.VERIFICATION_CODE_STORE, settings.VERIFICATION_CODE_TTL)
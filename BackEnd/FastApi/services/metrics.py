@@ -0,0 +1,212 @@
+import logging
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from database.connection import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + "}"
+
+
+# 기록은 dict 갱신만 하고, 텍스트 변환은 /metrics를 긁어갈 때만 수행
+# (이벤트 루프 스레드에서만 기록하므로 잠금 없음)
+class CounterMetric:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(**labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(labels)} {value}" for labels, value in self.values.items()]
+        return lines
+
+
+class HistogramMetric:
+    def __init__(self, name: str, help: str, buckets: tuple):
+        self.name, self.help, self.buckets = name, help, buckets
+        self.values: Dict[Labels, list] = {}  # [버킷별 개수..., 합계, 개수]
+
+    def observe(self, value: float, **labels):
+        key = _labels(**labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            entry[index] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, entry in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', str(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', '+Inf'))} {entry[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {entry[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {entry[-1]}")
+        return lines
+
+
+http_requests = CounterMetric("http_requests_total", "HTTP requests by route, method and status")
+http_latency = HistogramMetric("http_request_duration_seconds", "HTTP request latency by route", LATENCY_BUCKETS)
+sql_queries = HistogramMetric("http_request_sql_queries", "SQL statements executed per request", QUERY_BUCKETS)
+sql_time = HistogramMetric("http_request_sql_seconds", "Total SQL time per request", LATENCY_BUCKETS)
+n_plus_one = CounterMetric("http_request_n_plus_one_total", "Requests that repeated the same SQL statement many times")
+
+METRICS = [http_requests, http_latency, sql_queries, sql_time, n_plus_one]
+
+# 다른 모듈의 stats() 결과를 gauge로 노출: 이름 -> dict를 반환하는 함수
+_collectors: Dict[str, Callable[[], dict]] = {}
+
+
+def register_collector(name: str, collect: Callable[[], dict]):
+    _collectors[name] = collect
+
+
+def _render_collectors() -> List[str]:
+    lines = []
+    for name, collect in _collectors.items():
+        try:
+            stats = collect()
+        except Exception:
+            logger.exception("%s 지표 수집 실패", name)
+            continue
+        lines += _render_stats(name, stats)
+    return lines
+
+
+def _render_stats(prefix: str, stats: dict) -> List[str]:
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            lines += _render_stats(f"{prefix}_{key}", value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines += [f"# TYPE {prefix}_{key} gauge", f"{prefix}_{key} {value}"]
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += _render_collectors()
+    return "\n".join(lines) + "\n"
+
+
+# 요청 하나 동안 실행된 SQL 통계 (SQLAlchemy 이벤트에서 갱신)
+class RequestSQLStats:
+    __slots__ = ("queries", "seconds", "statements", "started")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+        self.started = 0.0
+
+
+_request_sql: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_sql.get()
+    if stats is not None:
+        stats.started = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_sql.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += perf_counter() - stats.started
+        stats.statements[statement] += 1
+
+
+# 엔진에 SQL 카운트 훅 연결 (비동기 엔진은 sync_engine에 등록)
+# engine이 없으면 Engine 클래스에 등록해 나중에 만들어지는 엔진도 포함
+def instrument_engine(engine=None):
+    sync_engine = getattr(engine, "sync_engine", engine) if engine is not None else Engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # 매칭되지 않은 경로는 하나로 묶어 라벨 수가 늘지 않게 함
+    return getattr(route, "path", None) or "unmatched"
+
+
+# 라우트(경로 템플릿)별 지연 시간, 상태 코드, 요청당 SQL 수/시간을 기록하는 ASGI 미들웨어
+class MetricsMiddleware:
+    def __init__(self, app, n_plus_one_threshold: int = settings.METRICS_N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._reported = set()  # 이미 로그를 남긴 (라우트, 문장)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestSQLStats()
+        token = _request_sql.set(stats)
+        started = perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_sql.reset(token)
+            self._record(scope, status_code, perf_counter() - started, stats)
+
+    def _record(self, scope, status_code: int, elapsed: float, stats: RequestSQLStats):
+        route = _route_label(scope)
+        if route == "/metrics":
+            return
+        method = scope["method"]
+        http_requests.inc(route=route, method=method, status=status_code)
+        http_latency.observe(elapsed, route=route, method=method)
+        sql_queries.observe(stats.queries, route=route, method=method)
+        sql_time.observe(stats.seconds, route=route, method=method)
+
+        # 같은 문장이 한 요청에서 여러 번 실행되면 N+1 조회로 의심 (지연 로딩된 관계 등)
+        if stats.statements:
+            statement, count = stats.statements.most_common(1)[0]
+            if count >= self.n_plus_one_threshold:
+                n_plus_one.inc(route=route, method=method)
+                if (route, statement) not in self._reported:
+                    self._reported.add((route, statement))
+                    logger.warning("N+1 의심: %s %s 에서 같은 SQL이 %d번 실행됨: %s", method, route, count, statement)
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import smtplib
+from collections import deque
+from dataclasses import dataclass, field
+from email.message import Message
+from time import monotonic, time
+from typing import List, Optional
+from fastapi import HTTPException, status
+from database.connection import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 1000  # 지연 시간 통계에 쓰는 최근 발송 건수
+
+
+@dataclass
+class OutboxItem:
+    message: Message
+    enqueued_at: float = field(default_factory=monotonic)
+    attempts: int = 0
+
+
+# 인증을 마친 SMTP 연결 하나를 재사용 (작업 스레드에서만 호출됨)
+class SMTPConnection:
+    def __init__(self):
+        self.smtp: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+
+    def _connect(self):
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+        if settings.SMTP_STARTTLS:
+            smtp.starttls()
+        if settings.SMTP_USER:
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        self.smtp = smtp
+
+    def _ensure(self):
+        if self.smtp is not None and monotonic() - self.last_used > settings.SMTP_IDLE_CHECK:
+            # 오래 쉬었던 연결은 서버가 끊었을 수 있으므로 확인
+            try:
+                if self.smtp.noop()[0] != 250:
+                    self.close()
+            except smtplib.SMTPException:
+                self.close()
+            except OSError:
+                self.close()
+        if self.smtp is None:
+            self._connect()
+
+    def _send(self, message: Message):
+        self._ensure()
+        self.smtp.send_message(message)
+        self.last_used = monotonic()
+
+    # 메시지 묶음을 한 연결로 발송하고, 메시지별 오류(성공이면 None)를 반환
+    def send_batch(self, messages: List[Message]) -> List[Optional[Exception]]:
+        errors = []
+        for message in messages:
+            try:
+                try:
+                    self._send(message)
+                except smtplib.SMTPServerDisconnected:
+                    self.close()
+                    self._send(message)  # 끊긴 연결은 한 번 다시 연결해서 재시도
+                except smtplib.SMTPException:
+                    raise  # 서버의 응답 오류 (SMTPException도 OSError의 하위 클래스라 따로 구분)
+                except OSError:
+                    self.close()
+                    self._send(message)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except Exception:
+                pass
+            self.smtp = None
+
+
+# 요청 처리와 분리된 메일 발송 큐: enqueue는 바로 반환되고, 백그라운드 작업자가 연결을 재사용해 묶어서 발송
+class EmailOutbox:
+    def __init__(self, pool_size: int, batch_size: int, max_queue: int, max_retries: int, retry_base_delay: float):
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.connections = [SMTPConnection() for _ in range(pool_size)]
+        self.workers: List[asyncio.Task] = []
+        self.retrying = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+
+    def enqueue(self, message: Message):
+        try:
+            self.queue.put_nowait(OutboxItem(message))
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="메일 발송 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": "5"}
+            )
+
+    async def start(self):
+        if not self.workers:
+            self.workers = [asyncio.create_task(self._work(connection)) for connection in self.connections]
+
+    async def stop(self, timeout: float = 5.0):
+        # 남은 메일을 잠시 기다렸다가 작업자 종료
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("메일 %d건을 보내지 못하고 종료합니다.", self.queue.qsize())
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        await asyncio.gather(*(asyncio.to_thread(connection.close) for connection in self.connections))
+
+    async def _work(self, connection: SMTPConnection):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            try:
+                errors = await asyncio.to_thread(connection.send_batch, [item.message for item in batch])
+            except Exception as e:
+                errors = [e] * len(batch)
+
+            for item, error in zip(batch, errors):
+                if error is None:
+                    self.sent += 1
+                    self.latencies.append(monotonic() - item.enqueued_at)
+                else:
+                    self._retry_or_fail(item, error)
+                self.queue.task_done()
+
+    def _retry_or_fail(self, item: OutboxItem, error: Exception):
+        self.last_error, self.last_error_at = repr(error), time()
+        item.attempts += 1
+        if item.attempts > self.max_retries:
+            self.failed += 1
+            logger.error("메일 발송 실패 (%s): %r", item.message["To"], error)
+            return
+        # 지수 백오프 후 다시 대기열에 넣음
+        self.retried += 1
+        self.retrying += 1
+        delay = self.retry_base_delay * (2 ** (item.attempts - 1))
+        asyncio.get_running_loop().call_later(delay, self._requeue, item)
+
+    def _requeue(self, item: OutboxItem):
+        self.retrying -= 1
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.failed += 1
+            logger.error("대기열이 가득 차 메일을 버립니다 (%s)", item.message["To"])
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+        percentile = lambda p: round(latencies[min(int(len(latencies) * p), len(latencies) - 1)], 4) if latencies else None
+        return {
+            "queue_depth": self.queue.qsize(),
+            "retrying": self.retrying,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": round(latencies[-1], 4) if latencies else None,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+
+outbox = EmailOutbox(
+    pool_size=settings.SMTP_POOL_SIZE,
+    batch_size=settings.SMTP_BATCH_SIZE,
+    max_queue=settings.OUTBOX_MAX_QUEUE,
+    max_retries=settings.OUTBOX_MAX_RETRIES,
+    retry_base_delay=settings.OUTBOX_RETRY_BASE_DELAY
+)
@@ -0,0 +1,106 @@
+import gzip
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import Response
+from sqlalchemy import delete, insert, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import Headers
+from models.users import Page, PageBody
+from storage.downloads import etag_matches
+
+EXCERPT_LENGTH = 200  # Page.excerpt 컬럼 길이
+GZIP_LEVEL = 6
+MIN_COMPRESS_SIZE = 256  # 이보다 짧은 본문은 압축 이득이 없어 그대로 저장
+TEXT_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+
+# 목록에 보여줄 본문 앞부분 (공백 정리 후 길이 제한)
+def make_excerpt(content: str) -> str:
+    text = " ".join(content.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH - 1].rstrip() + "…"
+
+
+# PageBody 행 값: gzip 스트림 그대로 저장해 응답에 바로 실을 수 있게 함 (mtime=0으로 같은 본문은 같은 바이트)
+def body_values(page_id: str, content: str) -> dict:
+    raw = content.encode()
+    if len(raw) >= MIN_COMPRESS_SIZE:
+        data = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(data) < len(raw):
+            return {"page_id": page_id, "encoding": "gzip", "size": len(raw), "data": data}
+    return {"page_id": page_id, "encoding": "identity", "size": len(raw), "data": raw}
+
+
+def decode_body(encoding: str, data: bytes) -> str:
+    return (gzip.decompress(data) if encoding == "gzip" else data).decode()
+
+
+# 새 페이지들의 본문을 한 번에 추가 (페이지 행이 먼저 INSERT/flush 되어 있어야 함)
+async def insert_contents(session: AsyncSession, contents: Iterable[Tuple[str, str]]):
+    rows = [body_values(page_id, content) for page_id, content in contents]
+    if rows:
+        await session.execute(insert(PageBody), rows)
+
+
+# 기존 페이지의 본문 교체 + 요약 갱신 (이전 본문은 읽지 않음)
+async def save_content(session: AsyncSession, page: Page, content: str):
+    page.excerpt = make_excerpt(content)
+    values = body_values(page.id, content)
+    result = await session.execute(update(PageBody).where(PageBody.page_id == page.id).values(**values))
+    if result.rowcount == 0:
+        await session.execute(insert(PageBody).values(**values))
+
+
+async def load_contents(session: AsyncSession, page_ids: List[str]) -> Dict[str, str]:
+    if not page_ids:
+        return {}
+    rows = (await session.exec(
+        select(PageBody.page_id, PageBody.encoding, PageBody.data).where(PageBody.page_id.in_(page_ids))
+    )).all()
+    return {row.page_id: decode_body(row.encoding, row.data) for row in rows}
+
+
+async def load_content(session: AsyncSession, page_id: str) -> str:
+    return (await load_contents(session, [page_id])).get(page_id, "")
+
+
+async def load_body(session: AsyncSession, page_id: str) -> Optional[PageBody]:
+    return await session.get(PageBody, page_id)
+
+
+async def delete_content(session: AsyncSession, page_id: str):
+    await session.execute(delete(PageBody).where(PageBody.page_id == page_id))
+
+
+# Accept-Encoding에 gzip이 있고 q=0이 아니면 True
+def accepts_gzip(accept_encoding: str) -> bool:
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip().removeprefix("q=")
+            try:
+                return not params or float(q) > 0
+            except ValueError:
+                return False
+    return False
+
+
+# 본문 응답: gzip을 받는 클라이언트에는 저장된 압축 바이트를 그대로, 아니면 풀어서 전송
+# 본문이 바뀌면 updated_at도 바뀌므로 본문을 읽기 전에 304 판단
+async def content_response(session: AsyncSession, headers: Headers, page: Page) -> Response:
+    # 인코딩(gzip/평문)과 관계없이 같은 본문이므로 약한 ETag
+    tag = f'"{page.id}-{(page.updated_at or page.created_at).timestamp()}"'
+    common_headers = {"ETag": f"W/{tag}", "Vary": "Accept-Encoding", "Cache-Control": "private, no-cache"}
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, tag):
+        return Response(status_code=304, headers=common_headers)
+
+    body = await load_body(session, page.id)
+    if body is None:
+        return Response(b"", media_type=TEXT_MEDIA_TYPE, headers=common_headers)
+    if body.encoding == "gzip":
+        if accepts_gzip(headers.get("accept-encoding", "")):
+            return Response(body.data, media_type=TEXT_MEDIA_TYPE, headers={**common_headers, "Content-Encoding": "gzip"})
+        return Response(gzip.decompress(body.data), media_type=TEXT_MEDIA_TYPE, headers=common_headers)
+    return Response(body.data, media_type=TEXT_MEDIA_TYPE, headers=common_headers)
@@ -0,0 +1,382 @@
+import asyncio
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from uuid import uuid4
+from database.connection import get_settings
+from models.users import Page
+from services.response_cache import ResponseCache, response_cache
+from services.scheduler import scheduler
+from services.serialization import dumps
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+WORKER_ID = uuid4().hex  # 버스에서 자기가 보낸 메시지를 거르는 데 사용
+RESYNC = dumps({"type": "resync"}).decode()  # 쌓인 이벤트를 버렸으니 목록을 다시 불러오라는 신호
+REVOKED = object()  # 큐에 넣으면 보내는 쪽이 연결을 닫음 (사용자 삭제)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _day(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value[:10]) if value else None
+
+
+# 페이지 변경 이벤트 (created / updated / deleted / published): 목록 항목을 갱신할 만큼만 담음
+# was_public / previous_scheduled_at은 변경 전 값 (공개 해제나 날짜 이동을 구독자에게 알리기 위함)
+def page_event(
+        kind: str,
+        page: Page,
+        was_public: Optional[bool] = None,
+        previous_scheduled_at: Optional[datetime] = None
+) -> dict:
+    return {
+        "type": kind,
+        "page_id": page.id,
+        "owner_id": page.owner_id,
+        "title": page.title,
+        "excerpt": page.excerpt,
+        "public": page.public,
+        "was_public": page.public if was_public is None else was_public,
+        "scheduled_at": _iso(page.scheduled_at),
+        "previous_scheduled_at": _iso(previous_scheduled_at or page.scheduled_at),
+        "updated_at": _iso(page.updated_at),
+    }
+
+
+# 연결 하나: 보낼 메시지 큐와 구독 목록
+class Subscriber:
+    __slots__ = ("user_id", "queue", "own", "public", "ranges", "days")
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.own = False
+        self.public = False
+        self.ranges: Set[Tuple[date, date]] = set()
+        self.days: Dict[date, int] = {}  # 날짜 -> 그 날짜를 덮는 range 구독 수
+
+    # 기다리지 않고 큐에 넣음. 느린 연결은 쌓인 이벤트를 버리고 resync 하나만 남김
+    def push(self, message: str) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return False
+
+    # 쌓인 이벤트를 버리고 연결 종료 신호만 남김
+    def revoke(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(REVOKED)
+
+
+# 워커 안의 구독 색인: 이벤트 하나를 관련된 연결에만, 직렬화는 한 번만 해서 전달
+class PageEventHub:
+    def __init__(self, queue_size: int, max_connections: int, max_range_days: int, max_ranges: int):
+        self.queue_size = queue_size
+        self.max_connections = max_connections
+        self.max_range_days = max_range_days
+        self.max_ranges = max_ranges
+        self._subscribers: Set[Subscriber] = set()
+        self._by_owner: Dict[int, Set[Subscriber]] = {}
+        self._public: Set[Subscriber] = set()
+        self._by_day: Dict[date, Set[Subscriber]] = {}
+        self.delivered = 0
+        self.dropped = 0
+        self.events = 0
+
+    def connect(self, user_id: int) -> Optional[Subscriber]:
+        if len(self._subscribers) >= self.max_connections:
+            return None
+        subscriber = Subscriber(user_id, self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber):
+        self.unsubscribe(subscriber, "own")
+        self.unsubscribe(subscriber, "public")
+        for day in subscriber.days:
+            subscribers = self._by_day[day]
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._by_day[day]
+        subscriber.days.clear()
+        subscriber.ranges.clear()
+        self._subscribers.discard(subscriber)
+
+    @staticmethod
+    def _days(start: date, end: date) -> Iterable[date]:
+        return (start + timedelta(days=offset) for offset in range((end - start).days + 1))
+
+    # topic: own(내 페이지) / public(공개 페이지) / range(start~end 날짜의 캘린더)
+    def subscribe(self, subscriber: Subscriber, topic: str, start: Optional[date] = None, end: Optional[date] = None):
+        if topic == "own":
+            subscriber.own = True
+            self._by_owner.setdefault(subscriber.user_id, set()).add(subscriber)
+        elif topic == "public":
+            subscriber.public = True
+            self._public.add(subscriber)
+        elif topic == "range":
+            if start is None or end is None or start > end:
+                raise ValueError("range 구독에는 start <= end 인 날짜가 필요합니다.")
+            if (end - start).days + 1 > self.max_range_days:
+                raise ValueError(f"range 구독은 최대 {self.max_range_days}일까지 가능합니다.")
+            if (start, end) not in subscriber.ranges:
+                if len(subscriber.ranges) >= self.max_ranges:
+                    raise ValueError(f"range 구독은 연결당 최대 {self.max_ranges}개까지 가능합니다.")
+                subscriber.ranges.add((start, end))
+                for day in self._days(start, end):
+                    covering = subscriber.days.get(day, 0)
+                    if not covering:
+                        self._by_day.setdefault(day, set()).add(subscriber)
+                    subscriber.days[day] = covering + 1
+        else:
+            raise ValueError(f"알 수 없는 구독 대상입니다: {topic}")
+
+    def unsubscribe(self, subscriber: Subscriber, topic: str, start: Optional[date] = None, end: Optional[date] = None):
+        if topic == "own" and subscriber.own:
+            subscriber.own = False
+            owners = self._by_owner.get(subscriber.user_id)
+            owners.discard(subscriber)
+            if not owners:
+                del self._by_owner[subscriber.user_id]
+        elif topic == "public":
+            subscriber.public = False
+            self._public.discard(subscriber)
+        elif topic == "range" and (start, end) in subscriber.ranges:
+            subscriber.ranges.discard((start, end))
+            # 겹치는 다른 구간이 같은 날짜를 덮고 있으면 색인에 남김
+            for day in self._days(start, end):
+                covering = subscriber.days[day] - 1
+                if covering:
+                    subscriber.days[day] = covering
+                else:
+                    del subscriber.days[day]
+                    subscribers = self._by_day.get(day)
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._by_day[day]
+
+    def _targets(self, event: dict) -> Set[Subscriber]:
+        targets = set(self._by_owner.get(event["owner_id"], ()))
+        if event["public"] or event["was_public"]:
+            targets |= self._public
+        for day in {_day(event["scheduled_at"]), _day(event["previous_scheduled_at"])}:
+            if day is not None:
+                targets |= self._by_day.get(day, set())
+        return targets
+
+    # 이 워커의 연결에 전달: 소유자이거나 공개 페이지면 전체 이벤트, 공개였다가 비공개가 되었으면 removed만
+    def deliver(self, event: dict) -> int:
+        self.events += 1
+        targets = self._targets(event)
+        if not targets:
+            return 0
+        full = hidden = None
+        sent = 0
+        for subscriber in targets:
+            if event["public"] or subscriber.user_id == event["owner_id"]:
+                message = full = full or dumps(event).decode()
+            elif event["was_public"]:
+                message = hidden = hidden or dumps({"type": "removed", "page_id": event["page_id"]}).decode()
+            else:
+                continue
+            if subscriber.push(message):
+                sent += 1
+            else:
+                self.dropped += 1
+        self.delivered += sent
+        return sent
+
+    # 사용자의 연결을 구독 색인에서 빼고 닫게 함 (연결 수만큼 순회, 사용자 삭제 때만 호출)
+    def revoke(self, user_id: int) -> int:
+        revoked = [subscriber for subscriber in self._subscribers if subscriber.user_id == user_id]
+        for subscriber in revoked:
+            self.disconnect(subscriber)
+            subscriber.revoke()
+        return len(revoked)
+
+    def broadcast(self, message: str):
+        for subscriber in self._subscribers:
+            subscriber.push(message)
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._subscribers),
+            "owner_subscriptions": sum(len(subscribers) for subscribers in self._by_owner.values()),
+            "public_subscriptions": len(self._public),
+            "indexed_days": len(self._by_day),
+            "events": self.events,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+# 워커 간 이벤트 전달 인터페이스
+class PageEventBus:
+    async def publish(self, message: str):
+        pass
+
+    # 다른 워커가 보낸 이벤트를 받을 때마다 on_event 호출
+    async def start(self, on_event: Callable[[dict], None]):
+        pass
+
+    async def stop(self):
+        pass
+
+
+# 워커 하나일 때: 전달할 다른 워커가 없음
+class LocalPageEventBus(PageEventBus):
+    pass
+
+
+# Redis pub/sub 채널로 모든 워커에 전달 (redis 패키지 필요)
+class RedisPageEventBus(PageEventBus):
+    CHANNEL = "page-events"
+
+    def __init__(self, url: str):
+        from redis import asyncio as redis_asyncio
+        self.redis = redis_asyncio.from_url(url, decode_responses=True)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, message: str):
+        await self.redis.publish(self.CHANNEL, message)
+
+    async def _listen(self, on_event: Callable[[dict], None]):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        envelope = json.loads(message["data"])
+                        if envelope["origin"] != WORKER_ID:
+                            on_event(envelope["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # 연결이 끊기는 동안의 이벤트는 잃으므로 클라이언트가 목록을 다시 불러오게 함
+                logger.exception("페이지 이벤트 버스 연결이 끊겼습니다. 다시 연결합니다.")
+                on_event({"type": "resync"})
+                await asyncio.sleep(1)
+
+    async def start(self, on_event: Callable[[dict], None]):
+        self._listener = asyncio.create_task(self._listen(on_event))
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        await self.redis.aclose()
+
+
+# PAGE_EVENTS_BUS 설정으로 선택: memory / redis://호스트
+def create_page_event_bus(url: str) -> PageEventBus:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisPageEventBus(url)
+    return LocalPageEventBus()
+
+
+class PageEvents:
+    def __init__(self, hub: PageEventHub, bus: PageEventBus, cache: ResponseCache):
+        self.hub = hub
+        self.bus = bus
+        self.cache = cache
+        self.received = 0
+        self._sending: Set[asyncio.Task] = set()
+        cache.subscribe(self._on_invalidated)
+
+    async def _send(self, event: dict):
+        try:
+            await self.bus.publish(dumps({"origin": WORKER_ID, "event": event}).decode())
+        except Exception:
+            logger.exception("이벤트를 다른 워커로 보내지 못했습니다 (%s)", event["type"])
+
+    # 커밋이 끝난 변경을 이 워커의 구독자에게 바로 전달하고 다른 워커로 보냄 (실패해도 요청은 성공)
+    async def publish(self, event: dict):
+        self.hub.deliver(event)
+        await self._send(event)
+
+    # 삭제된 사용자의 연결을 이 워커와 다른 워커에서 모두 닫음
+    async def revoke(self, user_id: int):
+        self.hub.revoke(user_id)
+        await self._send({"type": "revoke", "user_id": user_id})
+
+    # 이 워커의 조회 응답 캐시 무효화(태그별, 전체)를 다른 워커로 보냄
+    # 캐시는 동기 코드에서 무효화되므로 전송은 작업으로 띄움 (이벤트 루프 밖이면 보낼 곳이 없음)
+    def _on_invalidated(self, message: dict):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._send(message))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    # 다른 워커의 메시지: 캐시 무효화는 이 워커의 캐시에 적용, 연결 종료는 해당 사용자의 연결에, 페이지 변경은 구독자에게 전달
+    def _on_remote(self, event: dict):
+        self.received += 1
+        if event["type"] == "resync":
+            self.cache.clear(publish=False)  # 연결이 끊긴 동안의 무효화도 잃었을 수 있음
+            self.hub.broadcast(RESYNC)
+            return
+        if event["type"] == "invalidate":
+            self.cache.apply(event)
+            return
+        if event["type"] == "revoke":
+            self.hub.revoke(event["user_id"])
+            return
+        self.hub.deliver(event)
+
+    # 클라이언트 메시지: {"action": "subscribe" | "unsubscribe", "topic": "own" | "public" | "range",
+    #                    "start": "YYYY-MM-DD", "end": "YYYY-MM-DD"} -> 응답 메시지
+    def handle(self, subscriber: Subscriber, raw: str) -> dict:
+        try:
+            message = json.loads(raw)
+            action, topic = message.get("action"), message.get("topic")
+            start = date.fromisoformat(message["start"][:10]) if message.get("start") else None
+            end = date.fromisoformat(message["end"][:10]) if message.get("end") else None
+            if action == "subscribe":
+                self.hub.subscribe(subscriber, topic, start, end)
+            elif action == "unsubscribe":
+                self.hub.unsubscribe(subscriber, topic, start, end)
+            elif action == "ping":
+                return {"type": "pong"}
+            else:
+                raise ValueError(f"알 수 없는 요청입니다: {action}")
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"type": "error", "detail": str(e)}
+        return {"type": f"{action}d", "topic": topic, "start": _iso(start), "end": _iso(end)}
+
+    async def _on_published(self, page: Page):
+        await self.publish(page_event("published", page, was_public=False))
+
+    async def start(self):
+        await self.bus.start(self._on_remote)
+
+    async def stop(self):
+        await self.bus.stop()
+
+    def stats(self) -> dict:
+        return {**self.hub.stats(), "received": self.received}
+
+
+page_events = PageEvents(
+    PageEventHub(
+        queue_size=settings.PAGE_EVENTS_QUEUE_SIZE,
+        max_connections=settings.PAGE_EVENTS_MAX_CONNECTIONS,
+        max_range_days=settings.PAGE_EVENTS_MAX_RANGE_DAYS,
+        max_ranges=settings.PAGE_EVENTS_MAX_RANGES,
+    ),
+    create_page_event_bus(settings.PAGE_EVENTS_BUS),
+    response_cache,
+)
+scheduler.subscribe(page_events._on_published)  # 예약 공개도 변경 이벤트로 알림
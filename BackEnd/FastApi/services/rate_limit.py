@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import math
+import sqlite3
+from time import time
+from typing import Dict, NamedTuple, Tuple
+from fastapi import HTTPException, Request, status
+from database.connection import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+# 토큰 버킷: capacity개까지 몰아서 쓸 수 있고 초당 refill개씩 다시 참
+class Rate(NamedTuple):
+    capacity: float
+    refill: float
+
+
+# "횟수/초" -> Rate (예: "5/60"은 60초에 5번, 한 번에 최대 5번)
+def parse_rate(spec: str) -> Rate:
+    count, _, period = spec.partition("/")
+    return Rate(float(count), float(count) / float(period or 1))
+
+
+# "ip=20/60,account=5/60" -> {"ip": Rate, "account": Rate} (빈 문자열이면 제한 없음)
+def parse_limits(spec: str) -> Dict[str, Rate]:
+    limits = {}
+    for item in spec.split(","):
+        scope, _, rate = item.strip().partition("=")
+        if scope:
+            limits[scope.strip()] = parse_rate(rate.strip())
+    return limits
+
+
+# 남은 토큰을 갱신하고 하나를 씀: (새 토큰 수, 다시 시도할 때까지 초, 버킷이 가득 차는 데 걸리는 초)
+def _take(tokens: float, elapsed: float, rate: Rate) -> Tuple[float, float, float]:
+    tokens = min(rate.capacity, tokens + max(elapsed, 0.0) * rate.refill)
+    if tokens >= 1:
+        tokens -= 1
+        retry_after = 0.0
+    else:
+        retry_after = (1 - tokens) / rate.refill
+    return tokens, retry_after, (rate.capacity - tokens) / rate.refill
+
+
+# 토큰 버킷 저장소 인터페이스
+class RateLimitStore:
+    # 토큰 하나를 쓰고, 남은 토큰이 없으면 다시 시도할 수 있을 때까지의 초를 반환 (허용이면 0)
+    async def take(self, key: str, rate: Rate) -> float:
+        raise NotImplementedError
+
+    # 가득 찬 버킷(없는 것과 같음) 정리, 지운 개수 반환
+    async def sweep(self) -> int:
+        return 0
+
+    async def run_sweeper(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.sweep()
+
+
+# 프로세스 메모리 백엔드 (워커마다 따로 셈)
+class MemoryRateLimitStore(RateLimitStore):
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}  # key -> (토큰, 갱신 시각, 가득 차는 시각)
+
+    async def take(self, key: str, rate: Rate) -> float:
+        now = time()
+        tokens, updated, _ = self._buckets.get(key, (rate.capacity, now, now))
+        tokens, retry_after, refill_seconds = _take(tokens, now - updated, rate)
+        self._buckets[key] = (tokens, now, now + refill_seconds)
+        return retry_after
+
+    async def sweep(self) -> int:
+        now = time()
+        full = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+        for key in full:
+            del self._buckets[key]
+        return len(full)
+
+
+# SQLite 파일 백엔드 (같은 호스트의 여러 uvicorn 워커가 공유)
+class SqliteRateLimitStore(RateLimitStore):
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS rate_bucket (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    full_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_rate_bucket_full_at ON rate_bucket (full_at);
+            """)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _run(self, fn, *args):
+        def call():
+            db = self._connect()
+            try:
+                return fn(db, *args)
+            finally:
+                db.close()
+        return asyncio.to_thread(call)
+
+    def _take(self, db, key: str, rate: Rate) -> float:
+        now = time()
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT tokens, updated FROM rate_bucket WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (rate.capacity, now)
+            tokens, retry_after, refill_seconds = _take(tokens, now - updated, rate)
+            db.execute(
+                "INSERT INTO rate_bucket (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, now + refill_seconds)
+            )
+        return retry_after
+
+    async def take(self, key: str, rate: Rate) -> float:
+        return await self._run(self._take, key, rate)
+
+    async def sweep(self) -> int:
+        return await self._run(lambda db: db.execute("DELETE FROM rate_bucket WHERE full_at <= ?", (time(),)).rowcount)
+
+
+# 읽기-계산-쓰기를 서버에서 한 번에 실행 (시각도 서버 기준이라 워커 간 시계 차이와 무관)
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated, 0) * refill)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / refill * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+# Redis 프로토콜 백엔드 (redis 패키지 필요, 가득 찬 버킷은 서버의 TTL로 사라짐)
+class RedisRateLimitStore(RateLimitStore):
+    def __init__(self, url: str):
+        from redis import asyncio as redis_asyncio
+        self.redis = redis_asyncio.from_url(url, decode_responses=True)
+        self._take = self.redis.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: Rate) -> float:
+        return float(await self._take(keys=[f"ratelimit:{key}"], args=[rate.capacity, rate.refill]))
+
+
+# RATE_LIMIT_STORE 설정으로 백엔드 선택: memory / sqlite:///경로 / redis://호스트
+def create_rate_limit_store(url: str) -> RateLimitStore:
+    if url.startswith("sqlite:///"):
+        return SqliteRateLimitStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimitStore(url)
+    return MemoryRateLimitStore()
+
+
+def _too_many_requests(retry_after: float):
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+# 비싼 인증 요청(bcrypt, RSA 서명, 메일 발송)의 입장 제어
+# - 라우트별 IP/계정 토큰 버킷 (저장소를 공유하면 모든 워커에 걸쳐 적용)
+# - 이 라우트들이 동시에 처리 중인 요청 수 제한 (CPU를 쓰는 워커마다 적용)
+class AuthLimiter:
+    def __init__(self, store: RateLimitStore, limits: Dict[str, Dict[str, Rate]], max_concurrency: int, enabled: bool = True):
+        self.store = store
+        self.limits = limits
+        self.max_concurrency = max_concurrency
+        self.enabled = enabled
+        self.in_flight = 0
+        self.rejected: Dict[str, int] = {}
+
+    def _reject(self, reason: str, retry_after: float):
+        reason = reason.replace("-", "_")
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        _too_many_requests(retry_after)
+
+    # route의 scope(ip/account) 버킷에서 토큰 하나를 씀. 저장소 장애 시에는 막지 않고 기록만 함
+    async def hit(self, route: str, scope: str, value: str):
+        rate = self.limits.get(route, {}).get(scope)
+        if not self.enabled or rate is None:
+            return
+        try:
+            retry_after = await self.store.take(f"{route}:{scope}:{value.lower()}", rate)
+        except Exception:
+            logger.exception("요청 제한 저장소를 사용할 수 없어 제한 없이 처리합니다.")
+            return
+        if retry_after > 0:
+            self._reject(f"{route}_{scope}", retry_after)
+
+    # 라우트 의존성: IP 버킷을 확인하고, 처리하는 동안 동시 실행 슬롯 하나를 차지
+    def guard(self, route: str):
+        async def dependency(request: Request):
+            await self.hit(route, "ip", client_ip(request))
+            if self.enabled and self.in_flight >= self.max_concurrency:
+                self._reject("concurrency", 1)
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        return dependency
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "rejected_total": sum(self.rejected.values()),
+            "rejected": dict(self.rejected),
+        }
+
+
+rate_limit_store = create_rate_limit_store(settings.RATE_LIMIT_STORE)
+auth_limiter = AuthLimiter(
+    rate_limit_store,
+    limits={
+        "signin": parse_limits(settings.RATE_LIMIT_SIGNIN),
+        "request-code": parse_limits(settings.RATE_LIMIT_REQUEST_CODE),
+        "refresh-token": parse_limits(settings.RATE_LIMIT_REFRESH_TOKEN),
+        "verify-code": parse_limits(settings.RATE_LIMIT_VERIFY_CODE),
+    },
+    max_concurrency=settings.AUTH_MAX_CONCURRENCY,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
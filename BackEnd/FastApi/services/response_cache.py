@@ -0,0 +1,201 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from time import time
+from typing import Awaitable, Callable, Iterable, List, NamedTuple, Optional, Set, Tuple
+from fastapi import Request, Response
+from database.connection import get_settings
+from services.serialization import encode
+from storage.downloads import etag_matches
+
+settings = get_settings()
+
+PUBLIC_SCOPE = "public"  # 로그인 없이 보는 응답
+
+# 캐시 항목의 태그: 어떤 쓰기가 이 응답을 무효화하는지 표시
+PUBLIC_PAGES = "pages:public"
+PAGE_TITLES = "pages:titles"
+USERS = "users"
+CALENDAR = "calendar"
+CALENDAR_PUBLIC = "calendar:public"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def calendar_owner(owner_id: int) -> str:
+    return f"calendar:owner:{owner_id}"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: dict
+    tags: Set[str]
+    span: Optional[Tuple[datetime, datetime]]  # 날짜 범위 응답이면 (시작, 끝)
+    expires_at: float
+
+
+# 경로 + 쿼리 + 가시성 범위를 키로 직렬화된 JSON 응답을 보관 (항목 수와 총 바이트로 제한하는 LRU)
+class ResponseCache:
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # 다른 워커의 무효화를 받지 못할 때(버스가 memory)를 위한 최대 유지 시간
+        self._listeners: List[Callable[[dict], None]] = []
+        self._data: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._lock = Lock()
+        self._bytes = 0
+        self._generation = 0  # 무효화할 때마다 증가, 계산 중에 무효화된 응답은 저장하지 않음
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(request: Request, scope: str) -> tuple:
+        return request.url.path, tuple(sorted(request.query_params.multi_items())), scope
+
+    def _pop(self, key: tuple):
+        entry = self._data.pop(key)
+        self._bytes -= len(entry.body)
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.expires_at <= time():
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: tuple, entry: CachedResponse, generation: int):
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    # 이 워커에서 일어난 무효화를 받을 함수 등록 (다른 워커로 전달하는 데 사용)
+    def subscribe(self, listener: Callable[[dict], None]):
+        self._listeners.append(listener)
+
+    def _notify(self, message: dict):
+        for listener in self._listeners:
+            listener(message)
+
+    # 태그가 겹치는 항목 제거. days를 주면 날짜 범위 응답은 그 날짜를 포함할 때만 제거
+    # publish=False는 다른 워커에서 받은 무효화를 적용할 때 (다시 보내지 않음)
+    def invalidate(self, tags: Iterable[str], days: Iterable[Optional[datetime]] = (), publish: bool = True):
+        tags = set(tags)
+        days = [day.date() for day in days if day is not None]
+        if publish:
+            self._notify({"type": "invalidate", "tags": sorted(tags), "days": [day.isoformat() for day in days]})
+        with self._lock:
+            self._generation += 1
+            for key, entry in list(self._data.items()):
+                if not entry.tags & tags:
+                    continue
+                if entry.span and days and not any(entry.span[0].date() <= day <= entry.span[1].date() for day in days):
+                    continue
+                self._pop(key)
+                self.invalidations += 1
+
+    def clear(self, publish: bool = True):
+        if publish:
+            self._notify({"type": "invalidate", "clear": True})
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._bytes = 0
+
+    # 다른 워커가 보낸 무효화 메시지 적용
+    def apply(self, message: dict):
+        if message.get("clear"):
+            self.clear(publish=False)
+        else:
+            self.invalidate(message["tags"], [datetime.fromisoformat(day) for day in message["days"]], publish=False)
+
+    # 캐시된 응답을 돌려주거나, build로 새로 만들어 저장. If-None-Match가 맞으면 304
+    async def serve(
+        self,
+        request: Request,
+        scope: str,
+        tags: Iterable[str],
+        build: Callable[[Response], Awaitable],
+        span: Optional[Tuple[datetime, datetime]] = None,
+    ) -> Response:
+        key = self.key(request, scope)
+        entry = self.get(key)
+        if entry is None:
+            generation = self._generation
+            scratch = Response()  # build가 설정한 헤더(X-Next-Cursor 등)를 받아 둠
+            body = encode(await build(scratch))
+            headers = {name: value for name, value in scratch.headers.items() if name.lower() not in ("content-length", "content-type")}
+            entry = CachedResponse(
+                body=body,
+                etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+                headers=headers,
+                tags=set(tags),
+                span=span,
+                expires_at=time() + self.ttl,
+            )
+            self.set(key, entry, generation)
+
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL
+)
+
+
+# 페이지 쓰기 후 호출: 변경 전/후 상태로 영향을 받는 응답만 무효화
+def invalidate_page(
+    owner_id: int,
+    public: Iterable[bool],
+    scheduled_at: Iterable[Optional[datetime]],
+    title_changed: bool = True,
+):
+    tags = {calendar_owner(owner_id)}
+    scheduled_at = list(scheduled_at)
+    if any(public):
+        tags |= {PUBLIC_PAGES, CALENDAR_PUBLIC}
+    response_cache.invalidate(tags, scheduled_at)
+    if title_changed:
+        response_cache.invalidate({PAGE_TITLES})
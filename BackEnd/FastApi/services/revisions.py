@@ -0,0 +1,149 @@
+import asyncio
+import difflib
+import json
+import zlib
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_settings
+from models.users import Page, PageRevision
+
+settings = get_settings()
+
+DELTA_RATIO = 0.5  # delta가 전체 압축본의 절반보다 크면 스냅샷으로 저장
+MAX_NUMBER_RETRIES = 3  # 동시에 저장되어 번호가 겹칠 때
+
+# delta 연산: [시작, 끝]은 스냅샷의 줄 범위를 복사, 문자열은 그대로 삽입
+Delta = List[Union[List[int], str]]
+
+
+def _lines(text: str) -> List[str]:
+    return text.splitlines(keepends=True)
+
+
+def make_delta(base: str, content: str) -> Delta:
+    base_lines, lines = _lines(base), _lines(content)
+    ops: Delta = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, base_lines, lines).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(lines[j1:j2]))
+    return ops
+
+
+def apply_delta(base: str, ops: Delta) -> str:
+    base_lines = _lines(base)
+    return "".join("".join(base_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def _snapshot_data(content: str) -> bytes:
+    return zlib.compress(content.encode())
+
+
+def _content(row: PageRevision, base: Optional[PageRevision]) -> str:
+    if base is None:
+        return zlib.decompress(row.data).decode()
+    return apply_delta(zlib.decompress(base.data).decode(), json.loads(zlib.decompress(row.data)))
+
+
+# 새 리비전 데이터: 스냅샷 압축본, 또는 충분히 작으면 기준 스냅샷 대비 delta -> (데이터, delta 여부)
+def _encode(content: str, snapshot: Optional[PageRevision]) -> Tuple[bytes, bool]:
+    data = _snapshot_data(content)
+    if snapshot is not None:
+        delta = zlib.compress(json.dumps(make_delta(_content(snapshot, None), content)).encode())
+        if len(delta) <= len(data) * DELTA_RATIO:
+            return delta, True
+    return data, False
+
+
+async def _get(session: AsyncSession, page_id: str, number: int) -> Optional[PageRevision]:
+    return await session.get(PageRevision, (page_id, number))
+
+
+async def _append(session: AsyncSession, page_id: str, title: str, content: str, author_id: Optional[int],
+                  created_at: Optional[datetime] = None) -> int:
+    latest = (await session.exec(
+        select(PageRevision.number, PageRevision.base)
+        .where(PageRevision.page_id == page_id)
+        .order_by(PageRevision.number.desc())
+        .limit(1)
+    )).first()
+    number, snapshot = (latest.number + 1 if latest else 1), None
+
+    # 직전 스냅샷 대비 delta로 저장 (복원할 때 최대 두 행만 읽으면 됨)
+    if latest and latest.number + 1 - latest.base < settings.REVISION_SNAPSHOT_INTERVAL:
+        snapshot = await _get(session, page_id, latest.base)
+    # diff와 압축은 CPU 작업이라 스레드에서 실행 (큰 페이지를 저장하는 동안 다른 요청이 멈추지 않게), DB 쓰기는 루프에서
+    data, is_delta = await asyncio.to_thread(_encode, content, snapshot)
+    base = latest.base if is_delta else None
+
+    await session.execute(insert(PageRevision).values(
+        page_id=page_id,
+        number=number,
+        base=base or number,
+        title=title,
+        data=data,
+        size=len(content),
+        author_id=author_id,
+        created_at=created_at or datetime.now()
+    ))
+    return number
+
+
+# 페이지의 현재 제목/내용을 새 리비전으로 추가 (이전 행은 수정하지 않음)
+async def record_revision(session: AsyncSession, page: Page, content: str, author_id: Optional[int]) -> int:
+    for attempt in range(MAX_NUMBER_RETRIES):
+        try:
+            async with session.begin_nested():
+                return await _append(session, page.id, page.title, content, author_id)
+        except IntegrityError:
+            if attempt == MAX_NUMBER_RETRIES - 1:
+                raise
+
+
+# 이력이 없는 기존 페이지를 처음 수정할 때 수정 전 내용을 첫 리비전으로 남김
+async def ensure_initial_revision(session: AsyncSession, page_id: str, title: str, content: str,
+                                  author_id: Optional[int], created_at: Optional[datetime]):
+    exists = (await session.exec(select(PageRevision.number).where(PageRevision.page_id == page_id).limit(1))).first()
+    if exists is None:
+        async with session.begin_nested():
+            await _append(session, page_id, title, content, author_id, created_at)
+
+
+async def load_revision(session: AsyncSession, page_id: str, number: int) -> Tuple[PageRevision, str]:
+    row = await _get(session, page_id, number)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="리비전을 찾을 수 없습니다.")
+    base = None if row.base == row.number else await _get(session, page_id, row.base)
+    return row, await asyncio.to_thread(_content, row, base)
+
+
+NO_NEWLINE = "\\ No newline at end of file\n"
+
+
+# 마지막 줄에 줄바꿈이 없으면 diff/git처럼 표시 (그대로 이으면 -줄과 +줄이 한 줄로 붙음)
+def _unified_diff(old: int, new: int, old_content: str, new_content: str) -> str:
+    lines = difflib.unified_diff(_lines(old_content), _lines(new_content), fromfile=f"r{old}", tofile=f"r{new}")
+    # 줄 구분은 _lines(splitlines)와 같게 판단 ("\r" 등으로 끝나는 줄도 끝난 줄)
+    return "".join(line if line != line.splitlines()[0] else f"{line}\n{NO_NEWLINE}" for line in lines)
+
+
+# 두 리비전의 unified diff
+async def diff_revisions(session: AsyncSession, page_id: str, old: int, new: int) -> dict:
+    old_row, old_content = await load_revision(session, page_id, old)
+    new_row, new_content = await load_revision(session, page_id, new)
+    return {
+        "from": old,
+        "to": new,
+        "title_changed": old_row.title != new_row.title,
+        "diff": await asyncio.to_thread(_unified_diff, old, new, old_content, new_content),
+    }
+
+
+async def delete_revisions(session: AsyncSession, page_id: str):
+    await session.execute(delete(PageRevision).where(PageRevision.page_id == page_id))
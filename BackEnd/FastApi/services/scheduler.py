@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import update
+from sqlmodel import select
+from database.connection import get_settings, async_session
+from models.users import Page, PageTerm
+from services.calendar import count_page_moved
+from services.response_cache import invalidate_page
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 30  # 공개 처리에 실패한 페이지를 다시 시도할 때까지 (초)
+
+Listener = Callable[[Page], Awaitable[None]]
+
+
+# 예약 시각은 서버 로컬 시간(시간대 없음)으로 저장하고 비교함. 시간대가 있는 입력(...Z, +09:00)은 로컬 시간으로 변환
+def local_time(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+# scheduled_at이 되면 예약 공개 페이지를 공개로 바꾸는 타이머
+# 최소 힙 + 페이지별 현재 예약 시각(dict): 예약/변경은 push만 하고, 꺼낼 때 dict와 다르면 버림 (O(log n))
+class PublishScheduler:
+    def __init__(self, horizon: float, resync_interval: float):
+        self.horizon = horizon  # 이 시간 안에 도래하는 예약만 메모리에 올림 (초)
+        self.resync_interval = resync_interval  # 다른 워커의 예약 변경을 DB에서 다시 읽는 주기 (초)
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due: Dict[str, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Listener] = []
+        self.fired = 0
+        self.lost = 0  # 다른 워커가 먼저 처리했거나 예약이 바뀐 경우
+
+    def subscribe(self, listener: Listener):
+        self._listeners.append(listener)
+
+    def schedule(self, page_id: str, when: datetime):
+        if when > datetime.now() + timedelta(seconds=self.horizon):
+            self.cancel(page_id)  # 다음 재동기화 때 올라옴
+            return
+        earliest = self._heap[0][0] if self._heap else None
+        self._due[page_id] = when
+        heapq.heappush(self._heap, (when, page_id))
+        if earliest is None or when < earliest:
+            self._wakeup.set()
+        # 버려진 항목이 많이 쌓이면 힙을 다시 만듦
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(when, page_id) for page_id, when in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, page_id: str):
+        self._due.pop(page_id, None)
+
+    def _pop_due(self, now: datetime) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, page_id = heapq.heappop(self._heap)
+            if self._due.get(page_id) == when:
+                del self._due[page_id]
+                due.append(page_id)
+        return due
+
+    # 기간 안에 도래하는 예약을 (scheduled_public, scheduled_at) 인덱스로 읽어 힙에 반영
+    async def reload(self):
+        async with async_session() as session:
+            rows = (await session.exec(
+                select(Page.id, Page.scheduled_at)
+                .where(
+                    Page.scheduled_public == True,
+                    Page.scheduled_at <= datetime.now() + timedelta(seconds=self.horizon)
+                )
+                .order_by(Page.scheduled_at)
+            )).all()
+        for row in rows:
+            if self._due.get(row.id) != row.scheduled_at:
+                self.schedule(row.id, row.scheduled_at)
+
+    # 조건부 UPDATE가 이벤트별 lease 역할: 여러 워커가 같은 예약을 꺼내도 한 곳에서만 성공
+    async def fire(self, page_id: str) -> bool:
+        now = datetime.now()
+        async with async_session() as session:
+            claimed = await session.execute(
+                update(Page)
+                .where(Page.id == page_id, Page.scheduled_public == True, Page.scheduled_at <= now)
+                .values(public=True, scheduled_public=False, updated_at=now)
+            )
+            if claimed.rowcount != 1:
+                await session.rollback()
+                self.lost += 1
+                return False
+
+            page = await session.get(Page, page_id)
+            await session.execute(update(PageTerm).where(PageTerm.page_id == page_id).values(public=True))
+            await count_page_moved(session, page, page.scheduled_at, False)
+            await session.commit()
+
+        self.fired += 1
+        invalidate_page(page.owner_id, [True], [page.scheduled_at])
+        for listener in self._listeners:
+            try:
+                await listener(page)
+            except Exception:
+                logger.exception("예약 공개 이벤트 처리 중 오류 (%s)", page_id)
+        return True
+
+    async def run(self):
+        next_resync = datetime.now()
+        while True:
+            now = datetime.now()
+            if now >= next_resync:
+                try:
+                    await self.reload()
+                except Exception:
+                    logger.exception("예약 목록을 불러오지 못했습니다.")
+                next_resync = now + timedelta(seconds=self.resync_interval)
+
+            for page_id in self._pop_due(datetime.now()):
+                try:
+                    await self.fire(page_id)
+                except Exception:
+                    logger.exception("예약 공개 처리 실패, %d초 후 다시 시도 (%s)", RETRY_DELAY, page_id)
+                    self.schedule(page_id, datetime.now() + timedelta(seconds=RETRY_DELAY))
+
+            wake_at = min(next_resync, self._heap[0][0]) if self._heap else next_resync
+            timeout = max((wake_at - datetime.now()).total_seconds(), 0)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._due),
+            "heap": len(self._heap),
+            "next": min(self._due.values()) if self._due else None,
+            "fired": self.fired,
+            "lost": self.lost,
+        }
+
+
+scheduler = PublishScheduler(
+    horizon=settings.SCHEDULER_HORIZON,
+    resync_interval=settings.SCHEDULER_RESYNC_INTERVAL
+)
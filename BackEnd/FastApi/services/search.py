@@ -0,0 +1,188 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from time import time
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import Select, and_, case, delete, exists, func, insert, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.pagination import decode_cursor, encode_cursor
+from models.users import Page, PageBody, PageTerm
+from services.page_content import decode_body
+
+TITLE_WEIGHT = 3  # 제목에 나온 토큰은 본문보다 3배 가중치
+MAX_TERM_LENGTH = 64
+PAGE_COUNT_TTL = 300  # 전체 페이지 수 캐시 유지 시간 (초)
+
+# 영문/숫자 단어, 한글, 한자/가나를 각각 토큰으로 분리
+TOKEN_RE = re.compile(r"[0-9a-z]+|[ㄱ-ㆎ가-힣]+|[぀-ヿ一-鿿]+")
+
+_page_count = {"value": 0, "expires_at": 0.0}
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+# 색인용 토큰화: 영문은 단어 단위, 한글/CJK는 글자 1-gram과 2-gram
+def index_terms(text: str) -> Counter:
+    terms = Counter()
+    for token in TOKEN_RE.findall(_normalize(text)):
+        if token.isascii():
+            terms[token[:MAX_TERM_LENGTH]] += 1
+        else:
+            terms.update(token)
+            terms.update(token[i:i + 2] for i in range(len(token) - 1))
+    return terms
+
+
+# 검색어 토큰화: 한 글자 한글은 1-gram, 두 글자 이상은 2-gram으로만 찾음
+def query_terms(text: str) -> Set[str]:
+    terms = set()
+    for token in TOKEN_RE.findall(_normalize(text)):
+        if token.isascii():
+            terms.add(token[:MAX_TERM_LENGTH])
+        elif len(token) == 1:
+            terms.add(token)
+        else:
+            terms.update(token[i:i + 2] for i in range(len(token) - 1))
+    return terms
+
+
+def page_terms(page: Page, content: str) -> Counter:
+    terms = index_terms(content)
+    for term, count in index_terms(page.title).items():
+        terms[term] += count * TITLE_WEIGHT
+    return terms
+
+
+def _posting_rows(page: Page, content: str) -> List[dict]:
+    return [
+        {"term": term, "page_id": page.id, "weight": weight, "public": page.public, "owner_id": page.owner_id}
+        for term, weight in page_terms(page, content).items()
+    ]
+
+
+# 페이지 생성/수정 시 색인 갱신 (기존 posting을 지우고 다시 씀)
+async def index_page(session: AsyncSession, page: Page, content: str):
+    await unindex_page(session, page.id)
+    rows = _posting_rows(page, content)
+    if rows:
+        await session.execute(insert(PageTerm), rows)
+
+
+# 새로 추가된 여러 페이지를 한 번에 색인 (기존 posting이 없으므로 삭제 생략): [(페이지, 본문)]
+async def index_new_pages(session: AsyncSession, pages: List[Tuple[Page, str]]):
+    rows = [row for page, content in pages for row in _posting_rows(page, content)]
+    if rows:
+        await session.execute(insert(PageTerm), rows)
+
+
+# 페이지 삭제 시 색인 제거
+async def unindex_page(session: AsyncSession, page_id: str):
+    await session.execute(delete(PageTerm).where(PageTerm.page_id == page_id))
+
+
+async def _count_pages(session: AsyncSession) -> int:
+    if _page_count["expires_at"] < time():
+        _page_count["value"] = (await session.exec(select(func.count()).select_from(Page))).one()
+        _page_count["expires_at"] = time() + PAGE_COUNT_TTL
+    return _page_count["value"]
+
+
+# 모든 검색어를 포함하는 페이지를 tf-idf 점수 순으로 반환 (공개 페이지 + 본인 페이지만)
+# (점수 내림차순, page_id 오름차순) 키셋 커서로 다음 페이지를 이어 읽음: (결과, 다음 커서)
+async def search_pages(
+        session: AsyncSession, text: str, user_id: int, size: int = 20, cursor: Optional[str] = None
+) -> Tuple[dict, Optional[str]]:
+    terms = query_terms(text)
+    result = {"query": text, "size": size, "has_next": False, "results": []}
+    if not terms:
+        return result, None
+
+    # 검색어별 문서 빈도
+    doc_freq = dict((await session.exec(
+        select(PageTerm.term, func.count()).where(PageTerm.term.in_(terms)).group_by(PageTerm.term)
+    )).all())
+    if len(doc_freq) < len(terms):
+        return result, None  # 어느 페이지에도 없는 검색어가 있음
+
+    total_pages = max(await _count_pages(session), 1)
+    idf = {term: math.log(1 + total_pages / df) for term, df in doc_freq.items()}
+    score = func.sum(PageTerm.weight * case(idf, value=PageTerm.term, else_=0.0))
+
+    statement = (
+        select(PageTerm.page_id, score.label("score"))
+        .where(PageTerm.term.in_(terms), or_(PageTerm.public == True, PageTerm.owner_id == user_id))
+        .group_by(PageTerm.page_id)
+        .having(func.count() == len(terms))
+    )
+    if cursor:
+        # 이전 페이지의 마지막 (점수, page_id) 다음부터: 앞쪽 결과를 다시 정렬하거나 건너뛰지 않음
+        last_score, last_id = decode_cursor(cursor, [score, PageTerm.page_id])
+        statement = statement.having(or_(score < last_score, and_(score == last_score, PageTerm.page_id > last_id)))
+    hits = (await session.exec(statement.order_by(score.desc(), PageTerm.page_id).limit(size + 1))).all()
+    next_cursor = None
+    if len(hits) > size:
+        hits = hits[:size]
+        next_cursor = encode_cursor([hits[-1].score, hits[-1].page_id])
+    result["has_next"] = next_cursor is not None
+    if not hits:
+        return result, None
+
+    pages = {
+        row.id: row
+        for row in (await session.exec(
+            select(
+                Page.id, Page.title, Page.excerpt, Page.public, Page.created_at, Page.updated_at,
+                Page.scheduled_at, Page.owner_id
+            )
+            .where(Page.id.in_([page_id for page_id, _ in hits]))
+        )).all()
+    }
+    result["results"] = [
+        {**pages[page_id]._asdict(), "score": round(hit_score, 4)}
+        for page_id, hit_score in hits if page_id in pages
+    ]
+    return result, next_cursor
+
+
+# 기존 페이지 전체를 다시 색인 (색인 도입 전 데이터용)
+# 색인할 페이지를 id 순서로 batch_size개씩 (missing_only이면 posting이 하나도 없는 페이지만)
+def page_batch_query(last_id: str, batch_size: int, missing_only: bool = False) -> Select:
+    statement = (
+        select(Page.id, Page.title, Page.public, Page.owner_id, PageBody.encoding, PageBody.data)
+        .outerjoin(PageBody, PageBody.page_id == Page.id)
+        .where(Page.id > last_id)
+        .order_by(Page.id)
+        .limit(batch_size)
+    )
+    if missing_only:
+        statement = statement.where(~exists().where(PageTerm.page_id == Page.id))
+    return statement
+
+
+def batch_posting_rows(pages) -> List[dict]:
+    return [
+        row
+        for page in pages
+        for row in _posting_rows(page, decode_body(page.encoding, page.data) if page.data is not None else "")
+    ]
+
+
+async def reindex_all_pages(session: AsyncSession, batch_size: int = 500) -> int:
+    await session.execute(delete(PageTerm))
+    count = 0
+    last_id = ""
+    while True:
+        pages = (await session.exec(page_batch_query(last_id, batch_size))).all()
+        if not pages:
+            break
+        rows = batch_posting_rows(pages)
+        if rows:
+            await session.execute(insert(PageTerm), rows)
+        count += len(pages)
+        last_id = pages[-1].id
+        await session.commit()
+    return count
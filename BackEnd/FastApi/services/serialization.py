@@ -0,0 +1,39 @@
+import json
+from datetime import date, datetime
+from typing import Any
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# orjson이 있으면 사용 (datetime 등을 C에서 바로 직렬화), 없으면 표준 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__}은(는) JSON으로 변환할 수 없습니다.")
+
+
+# dict/list/datetime 등 기본 타입을 JSON 바이트로 (pydantic 모델은 model_dump 후 전달)
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+# 기본 타입만 있으면 바로 직렬화하고, 모델 객체 등이 섞여 있으면 jsonable_encoder로 변환 후 직렬화
+def encode(content: Any) -> bytes:
+    try:
+        return dumps(content)
+    except TypeError:
+        return dumps(jsonable_encoder(content))
+
+
+# 라우터 기본 응답 클래스. dict/list를 그대로 반환하면 FastAPI가 먼저 jsonable_encoder를 거치므로
+# 목록처럼 큰 응답은 FastJSONResponse(...)를 직접 반환해야 변환 없이 바로 직렬화됨
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
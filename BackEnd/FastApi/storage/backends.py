@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response, StreamingResponse
+from database.connection import get_settings
+from storage.uploads import StoredUpload, save_upload
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+# 저장소에 기록된 객체: 어느 백엔드의 어떤 위치인지 (롤백/삭제 후 정리 대상)
+# hash는 blob 내용이면 그 해시, blob 저장소 이전의 첨부 파일이면 None
+class StoredObject(NamedTuple):
+    backend: str
+    location: str
+    hash: Optional[str] = None
+
+
+# write 결과: location은 Blob.path, data는 DB에 함께 저장할 내용, created는 이번에 새로 만들었는지
+class BlobWrite(NamedTuple):
+    location: str
+    data: Optional[bytes]
+    created: bool
+
+
+def _content_changed():
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="업로드 도중 파일 내용이 변경되었습니다.")
+
+
+# 첨부 저장소 인터페이스: 내용 해시(sha256)를 키로 쓰고, 다운로드 응답도 백엔드가 만듦
+class StorageBackend:
+    name = ""
+
+    # 내용 해시로 정해지는 위치 (Blob.path) - 기록하기 전에 Blob 행을 먼저 만들 수 있음
+    def location(self, sha256: str) -> str:
+        raise NotImplementedError
+
+    async def write(self, file: UploadFile, digest: StoredUpload) -> BlobWrite:
+        raise NotImplementedError
+
+    async def delete(self, locations: List[str]):
+        raise NotImplementedError
+
+    # Range 처리 전에 전송을 통째로 넘길 수 있으면 그 응답 (프록시 위임 등), 아니면 None
+    def delegate(self, location: str, headers: dict, media_type: str) -> Optional[Response]:
+        return None
+
+    # [start, start + count) 구간을 보내는 응답 (304/416 판단과 공통 헤더는 호출하는 쪽에서 처리)
+    def response(self, location: str, data: Optional[bytes], start: int, count: int,
+                 status_code: int, headers: dict, media_type: str) -> Response:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+# 로컬 파일 시스템: 해시 앞 두 단계로 샤딩한 경로 (uploads/ab/cd/abcd...) - 한 디렉터리에 파일이 몰리지 않음
+class LocalBackend(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def location(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    async def write(self, file: UploadFile, digest: StoredUpload) -> BlobWrite:
+        path = self.location(digest.sha256)
+        if await run_in_threadpool(os.path.exists, path):
+            return BlobWrite(path, None, False)
+        stored = await save_upload(file, path)
+        if stored.sha256 != digest.sha256:
+            await self.delete([path])
+            raise _content_changed()
+        return BlobWrite(path, None, True)
+
+    async def delete(self, locations: List[str]):
+        await run_in_threadpool(_remove_files, locations)
+
+    # 프록시(nginx 등)가 있으면 X-Accel-Redirect로 전송을 위임 (프록시가 sendfile과 Range를 처리)
+    def delegate(self, location, headers, media_type) -> Optional[Response]:
+        if not settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX:
+            return None
+        relative_path = os.path.relpath(location, self.root)
+        headers = {
+            **headers,
+            "x-accel-redirect": settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative_path)
+        }
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    def response(self, location, data, start, count, status_code, headers, media_type) -> Response:
+        from storage.downloads import SendfileResponse, open_file
+
+        return SendfileResponse(
+            open_file(location), start, count, status_code=status_code, headers=headers, media_type=media_type
+        )
+
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# DB 안에 저장: 아주 작은 파일은 Blob.data에 넣어 파일 하나당 inode/open 비용을 없앰
+class DatabaseBackend(StorageBackend):
+    name = "db"
+
+    def location(self, sha256: str) -> str:
+        return sha256
+
+    async def write(self, file: UploadFile, digest: StoredUpload) -> BlobWrite:
+        data = await file.read()
+        await file.seek(0)
+        if hashlib.sha256(data).hexdigest() != digest.sha256:
+            raise _content_changed()
+        return BlobWrite(self.location(digest.sha256), data, False)
+
+    async def delete(self, locations: List[str]):
+        pass  # Blob 행과 함께 삭제됨
+
+    def response(self, location, data, start, count, status_code, headers, media_type) -> Response:
+        return Response((data or b"")[start:start + count], status_code=status_code, headers=headers, media_type=media_type)
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+# AWS Signature Version 4 (헤더 방식): headers(소문자 이름)를 모두 서명한 Authorization 값
+# uri와 query는 이미 인코딩된 canonical 형태, amz_date는 "YYYYMMDDTHHMMSSZ"
+def sigv4_authorization(method: str, uri: str, query: str, headers: Dict[str, str], payload_sha256: str,
+                        access_key: str, secret_key: str, region: str, service: str, amz_date: str) -> str:
+    day = amz_date[:8]
+    signed = ";".join(sorted(headers))
+    canonical_request = "\n".join([
+        method, uri, query,
+        "".join(f"{name}:{headers[name].strip()}\n" for name in sorted(headers)),
+        signed, payload_sha256,
+    ])
+    scope = f"{day}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    signing_key = _hmac(("AWS4" + secret_key).encode(), day)
+    for part in (region, service, "aws4_request"):
+        signing_key = _hmac(signing_key, part)
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    return f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, SignedHeaders={signed}, Signature={signature}"
+
+
+# S3 호환 저장소 (AWS S3, MinIO 등): path-style URL + SigV4 서명, httpx로 직접 요청
+class S3Backend(StorageBackend):
+    name = "s3"
+
+    def __init__(self, endpoint_url: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = "us-east-1", prefix: str = "", timeout: float = 30.0):
+        import httpx
+
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = httpx.URL(self.endpoint_url).netloc.decode()
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    def location(self, sha256: str) -> str:
+        return f"{self.prefix}{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def _uri(self, key: str) -> str:
+        return "/" + quote(self.bucket, safe="") + "/" + quote(key, safe="/~")
+
+    # S3 요청 헤더: host / x-amz-content-sha256 / x-amz-date에 서명하고 extra는 서명 없이 덧붙임
+    def _signed_headers(self, method: str, uri: str, payload_sha256: str, extra: Optional[dict] = None) -> dict:
+        amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        headers = {"host": self.host, "x-amz-content-sha256": payload_sha256, "x-amz-date": amz_date}
+        headers["authorization"] = sigv4_authorization(
+            method, uri, "", headers, payload_sha256, self.access_key, self.secret_key, self.region, "s3", amz_date
+        )
+        return {**headers, **(extra or {})}
+
+    # 업로드 내용을 청크로 흘려보냄. 서명한 sha256과 다르면 S3가 거절하므로 따로 검증하지 않음
+    async def write(self, file: UploadFile, digest: StoredUpload) -> BlobWrite:
+        key = self.location(digest.sha256)
+        uri = self._uri(key)
+
+        async def body():
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+        headers = self._signed_headers("PUT", uri, digest.sha256, {"content-length": str(digest.size)})
+        response = await self.client.put(self.endpoint_url + uri, content=body(), headers=headers)
+        await file.seek(0)
+        if response.status_code == 400 and b"XAmzContentSHA256Mismatch" in response.content:
+            raise _content_changed()
+        if response.status_code >= 300:
+            logger.error("S3 업로드 실패 (%s): %s %s", key, response.status_code, response.text[:200])
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="파일 저장소에 업로드하지 못했습니다.")
+        return BlobWrite(key, None, True)
+
+    async def _delete(self, key: str):
+        uri = self._uri(key)
+        response = await self.client.delete(self.endpoint_url + uri, headers=self._signed_headers("DELETE", uri, EMPTY_SHA256))
+        if response.status_code >= 300 and response.status_code != 404:
+            logger.error("S3 삭제 실패 (%s): %s", key, response.status_code)
+
+    async def delete(self, locations: List[str]):
+        await asyncio.gather(*(self._delete(key) for key in locations))
+
+    # 요청한 구간만 S3에서 받아 그대로 흘려보냄 (인증/권한 확인은 앱에서 끝난 상태)
+    def response(self, location, data, start, count, status_code, headers, media_type) -> Response:
+        uri = self._uri(location)
+
+        async def stream():
+            if count == 0:
+                return
+            request_headers = self._signed_headers(
+                "GET", uri, EMPTY_SHA256, {"range": f"bytes={start}-{start + count - 1}"}
+            )
+            async with self.client.stream("GET", self.endpoint_url + uri, headers=request_headers) as upstream:
+                if upstream.status_code >= 300:
+                    logger.error("S3 다운로드 실패 (%s): %s", location, upstream.status_code)
+                    return
+                async for chunk in upstream.aiter_bytes():
+                    yield chunk
+
+        return StreamingResponse(
+            stream(), status_code=status_code, headers={**headers, "content-length": str(count)}, media_type=media_type
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+
+# "최대크기=백엔드" 목록 (마지막은 *=백엔드): 예) "8192=db,104857600=local,*=s3"
+def parse_size_classes(spec: str) -> List[Tuple[Optional[int], str]]:
+    classes = []
+    for item in spec.split(","):
+        limit, _, name = item.strip().partition("=")
+        classes.append((None if limit.strip() == "*" else int(limit), name.strip()))
+    if not classes or classes[-1][0] is not None:
+        raise ValueError(f"STORAGE_SIZE_CLASSES의 마지막 항목은 *=백엔드여야 합니다: {spec}")
+    return classes
+
+
+class StorageRegistry:
+    def __init__(self, size_classes: str):
+        self.size_classes = parse_size_classes(size_classes)
+        self._backends: Dict[str, StorageBackend] = {}
+
+    def _create(self, name: str) -> StorageBackend:
+        if name == "local":
+            return LocalBackend(settings.UPLOAD_DIR)
+        if name == "db":
+            return DatabaseBackend()
+        if name == "s3":
+            if not (settings.S3_ENDPOINT_URL and settings.S3_BUCKET):
+                raise ValueError("s3 저장소를 쓰려면 S3_ENDPOINT_URL과 S3_BUCKET이 필요합니다.")
+            return S3Backend(
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                bucket=settings.S3_BUCKET,
+                access_key=settings.S3_ACCESS_KEY or "",
+                secret_key=settings.S3_SECRET_KEY or "",
+                region=settings.S3_REGION,
+                prefix=settings.S3_PREFIX,
+            )
+        raise ValueError(f"알 수 없는 저장소 백엔드입니다: {name}")
+
+    # 백엔드는 처음 쓸 때 생성 (S3 클라이언트 등)
+    def get(self, name: str) -> StorageBackend:
+        backend = self._backends.get(name)
+        if backend is None:
+            backend = self._backends[name] = self._create(name)
+        return backend
+
+    def for_size(self, size: int) -> StorageBackend:
+        for limit, name in self.size_classes:
+            if limit is None or size <= limit:
+                return self.get(name)
+
+    async def delete(self, objects: List[StoredObject]):
+        by_backend: Dict[str, List[str]] = {}
+        for stored in objects:
+            by_backend.setdefault(stored.backend, []).append(stored.location)
+        for name, locations in by_backend.items():
+            try:
+                await self.get(name).delete(locations)
+            except Exception:
+                logger.exception("%s 저장소에서 파일을 지우지 못했습니다: %s", name, locations[:5])
+
+    async def close(self):
+        for backend in self._backends.values():
+            await backend.close()
+
+
+storage = StorageRegistry(settings.STORAGE_SIZE_CLASSES)
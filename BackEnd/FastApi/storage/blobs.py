@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, List, Tuple
+from fastapi import UploadFile
+from sqlalchemy import bindparam, case, delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models.users import Blob, FileModel
+from storage.backends import StoredObject, storage
+from storage.uploads import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+MAX_ACQUIRE_ATTEMPTS = 3  # 같은 내용의 blob이 동시에 만들어지거나 지워질 때
+
+# 저장소 객체를 만들거나 지우는 쪽은 항상 그 blob 행(키)을 잡은 트랜잭션 안에서만 함
+# - acquire_blobs: 기존 행은 잠그고(FOR UPDATE) 참조 수를 늘림, 없는 행은 먼저 INSERT한 뒤에 내용을 기록
+# - purge_files: 빈 행(ref_count=0)을 INSERT해 키를 잡은 뒤에 객체를 지우고 그 행도 지움
+# 키를 잡는 INSERT는 같은 키를 만들거나 지우는 중인 다른 트랜잭션이 끝날 때까지 기다리므로,
+# 다른 요청이 참조하려는 객체를 지우거나, 지워지는 중인 객체를 참조하는 일이 없음
+
+
+# 크기에 맞는 백엔드의 Blob 행 (내용은 행을 INSERT한 뒤에 기록)
+def _new_blob(digest: StoredUpload, ref_count: int) -> Blob:
+    backend = storage.for_size(digest.size)
+    return Blob(
+        hash=digest.sha256, path=backend.location(digest.sha256), size=digest.size,
+        ref_count=ref_count, backend=backend.name
+    )
+
+
+# 행을 만든 blob의 내용을 기록. 새로 쓴 객체는 written에 추가
+async def _write_blob(file: UploadFile, digest: StoredUpload, blob: Blob, written: List[StoredObject]):
+    result = await storage.get(blob.backend).write(file, digest)
+    if result.created:
+        written.append(StoredObject(blob.backend, result.location, blob.hash))
+    if result.data is not None:
+        blob.data = result.data
+
+
+async def _insert_blobs(session: AsyncSession, blobs: List[Blob]) -> List[Blob]:
+    try:
+        async with session.begin_nested():
+            await session.execute(insert(Blob), [blob.model_dump() for blob in blobs])
+        return blobs
+    except IntegrityError:
+        # 다른 요청이 같은 내용의 행을 먼저 만들었으면 하나씩 다시 시도 (만들지 못한 것은 다음 시도에서 참조 수만 늘림)
+        inserted = []
+        for blob in blobs:
+            try:
+                async with session.begin_nested():
+                    await session.execute(insert(Blob).values(**blob.model_dump()))
+                inserted.append(blob)
+            except IntegrityError:
+                pass
+        return inserted
+
+
+# 업로드 묶음의 blob 참조 수를 한 번에 늘림. 처음 보는 내용만 동시에 저장소에 기록
+# written에는 이 요청이 새로 쓴 객체가 쌓이므로, 롤백하면 purge_files(session, written)으로 정리
+async def acquire_blobs(
+        session: AsyncSession,
+        uploads: List[Tuple[UploadFile, StoredUpload]],
+        written: List[StoredObject]
+) -> Dict[str, Blob]:
+    if not uploads:
+        return {}
+    # 요청 안에서 내용이 같은 파일은 한 번만 기록
+    by_hash = {digest.sha256: (file, digest) for file, digest in uploads}
+    pending = Counter(digest.sha256 for _, digest in uploads)
+    blobs: Dict[str, Blob] = {}
+    for _ in range(MAX_ACQUIRE_ATTEMPTS):
+        # 기존 행은 잠가서 참조 수를 늘리는 동안 detach_files가 지우지 못하게 함 (이미 지워진 행은 결과에 없음)
+        existing = (await session.exec(
+            select(Blob).where(Blob.hash.in_(pending)).options(defer(Blob.data)).with_for_update()
+        )).all()
+        if existing:
+            references = {blob.hash: pending.pop(blob.hash) for blob in existing}
+            result = await session.execute(
+                update(Blob)
+                .where(Blob.hash.in_(references))
+                .values(ref_count=Blob.ref_count + case(references, value=Blob.hash, else_=0))
+            )
+            if result.rowcount != len(references):
+                raise RuntimeError("blob 참조 수를 갱신하지 못했습니다.")
+            blobs.update((blob.hash, blob) for blob in existing)
+        if not pending:
+            return blobs
+
+        # 없는 내용은 행부터 만들고(키를 잡은 뒤) 저장소에 기록
+        inserted = await _insert_blobs(
+            session, [_new_blob(by_hash[sha256][1], count) for sha256, count in pending.items()]
+        )
+        results = await asyncio.gather(
+            *(_write_blob(*by_hash[blob.hash], blob, written) for blob in inserted),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        stored_data = [blob for blob in inserted if blob.data is not None]
+        if stored_data:  # db 백엔드는 내용을 행에 저장
+            await session.execute(
+                update(Blob.__table__)
+                .where(Blob.__table__.c.hash == bindparam("target_hash"))
+                .values(data=bindparam("new_data")),
+                [{"target_hash": blob.hash, "new_data": blob.data} for blob in stored_data]
+            )
+        for blob in inserted:
+            del pending[blob.hash]
+            blobs[blob.hash] = blob
+        if not pending:
+            return blobs
+    raise RuntimeError("같은 내용의 첨부가 동시에 변경되어 blob을 만들지 못했습니다.")
+
+
+# 여러 첨부를 한 번에 지우고 blob 참조를 반납. 커밋 후 저장소에서 지워야 할 객체 목록을 반환
+async def detach_files(session: AsyncSession, files: List[FileModel]) -> List[StoredObject]:
+    if not files:
+        return []
+    for file in files:
+        await session.delete(file)
+    await session.flush()  # DELETE 한 번으로 묶여 실행됨
+
+    # blob 저장소 도입 이전 파일은 로컬 경로
+    orphans = [StoredObject("local", file.fileurl) for file in files if file.blob_hash is None and file.fileurl]
+    references = Counter(file.blob_hash for file in files if file.blob_hash is not None)
+    if references:
+        await session.execute(
+            update(Blob)
+            .where(Blob.hash.in_(references))
+            .values(ref_count=Blob.ref_count - case(dict(references), value=Blob.hash, else_=0))
+        )
+        unreferenced = (await session.exec(
+            select(Blob.hash, Blob.backend, Blob.path).where(Blob.hash.in_(references), Blob.ref_count <= 0)
+        )).all()
+        if unreferenced:
+            await session.execute(
+                delete(Blob).where(Blob.hash.in_([row.hash for row in unreferenced]), Blob.ref_count <= 0)
+            )
+            orphans.extend(StoredObject(row.backend, row.path, row.hash) for row in unreferenced)
+    return orphans
+
+
+# 커밋(또는 롤백)이 끝난 뒤 참조가 사라진 객체를 백엔드별로 모아 삭제
+async def purge_files(session: AsyncSession, objects: List[StoredObject]):
+    if not objects:
+        return
+    # blob 객체는 빈 행으로 키를 잡은 트랜잭션 안에서 지움. 행을 만들 수 없으면 그 사이 다시 참조된 것이므로 남김
+    removable = [stored for stored in objects if stored.hash is None]
+    claimed = []
+    try:
+        for stored in objects:
+            if stored.hash is None:
+                continue
+            try:
+                async with session.begin_nested():
+                    await session.execute(insert(Blob).values(
+                        hash=stored.hash, path=stored.location, size=0, ref_count=0, backend=stored.backend
+                    ))
+                claimed.append(stored.hash)
+                removable.append(stored)
+            except IntegrityError:
+                pass
+        await storage.delete(removable)
+        if claimed:
+            await session.execute(delete(Blob).where(Blob.hash.in_(claimed), Blob.ref_count <= 0))
+        await session.commit()
+    except Exception:
+        # 요청은 이미 끝났으므로 실패를 알리지 않고 객체만 남김
+        await session.rollback()
+        logger.exception("참조가 사라진 첨부를 정리하지 못했습니다: %s", objects[:5])
@@ -0,0 +1,172 @@
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import BinaryIO, Optional, Tuple
+from urllib.parse import quote
+import anyio
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from models.users import Blob, FileModel
+from storage.backends import storage
+
+CHUNK_SIZE = 256 * 1024
+
+
+# blob 해시에서 만든 강한 ETag (blob은 내용이 바뀌지 않음)
+def file_etag(file: FileModel) -> str:
+    if file.blob_hash:
+        return f'"{file.blob_hash}"'
+    return f'"{file.id}-{file.size}-{int(file.created_at.timestamp())}"'
+
+
+def file_last_modified(file: FileModel) -> datetime:
+    return file.created_at.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+# If-None-Match / If-Modified-Since 확인 (디스크 접근 없이 DB 값만으로 판단)
+def is_not_modified(headers: Headers, etag: str, last_modified: datetime) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+# "bytes=start-end" 형식의 단일 범위를 (start, end) 로 변환. 해석할 수 없으면 None (전체 전송)
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text == "":
+            suffix = int(end_text)  # 마지막 N 바이트
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - suffix, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+# 파일을 먼저 열어 둠: 없으면 응답을 시작하기 전에 404 (헤더를 보낸 뒤에는 상태 코드를 바꿀 수 없음)
+def open_file(path: str) -> BinaryIO:
+    try:
+        return open(path, "rb")
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파일을 찾을 수 없습니다.")
+
+
+# ASGI 서버가 zero-copy 확장을 지원하면 sendfile로, 아니면 청크 단위로 파일 구간을 전송
+# file은 open_file로 미리 연 파일이며 응답을 보낸 뒤 닫음
+class SendfileResponse(Response):
+    def __init__(
+            self,
+            file: BinaryIO,
+            offset: int,
+            count: int,
+            status_code: int = 200,
+            headers: Optional[dict] = None,
+            media_type: Optional[str] = None
+    ):
+        self.file = file
+        self.offset = offset
+        self.count = count
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**(headers or {}), "content-length": str(count)})
+
+    async def __call__(self, scope, receive, send):
+        with self.file as f:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if scope["method"] == "HEAD" or self.count == 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+                return
+
+            remaining = self.count
+            position = self.offset
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(os.pread, f.fileno(), min(CHUNK_SIZE, remaining), position)
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                position += len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+# 첨부 파일 응답 생성: 304 / 416 / 206 / 200 (실제 전송은 blob이 있는 백엔드가 담당)
+def file_response(headers: Headers, file: FileModel, blob: Optional[Blob] = None) -> Response:
+    etag = file_etag(file)
+    last_modified = file_last_modified(file)
+    common_headers = {
+        "etag": etag,
+        "last-modified": format_datetime(last_modified, usegmt=True),
+        "accept-ranges": "bytes",
+        "cache-control": "private, max-age=0, must-revalidate",
+    }
+
+    if is_not_modified(headers, etag, last_modified):
+        return Response(status_code=304, headers=common_headers)
+
+    common_headers["content-disposition"] = f"inline; filename*=UTF-8''{quote(file.filename)}"
+    media_type = file.content_type or "application/octet-stream"
+
+    # blob 저장소 도입 이전 파일은 로컬 경로 그대로
+    backend = storage.get(blob.backend if blob else "local")
+    location = blob.path if blob else file.fileurl
+    data = blob.data if blob else None
+
+    delegated = backend.delegate(location, common_headers, media_type)
+    if delegated is not None:
+        return delegated
+
+    size = file.size
+    http_range = headers.get("range")
+    if_range = headers.get("if-range")
+    if if_range is not None and if_range.strip() != etag:
+        http_range = None  # 파일이 바뀌었으면 범위 요청을 무시하고 전체 전송
+
+    try:
+        byte_range = parse_range(http_range, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**common_headers, "content-range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return backend.response(location, data, 0, size, 200, common_headers, media_type)
+
+    start, end = byte_range
+    common_headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return backend.response(location, data, start, end - start + 1, 206, common_headers, media_type)
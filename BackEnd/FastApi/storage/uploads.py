@@ -0,0 +1,131 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from database.connection import get_settings
+
+settings = get_settings()
+
+
+# 스트리밍 저장 결과 (크기와 해시는 저장하면서 계산됨)
+@dataclass
+class StoredUpload:
+    path: Optional[str]
+    size: int
+    sha256: str
+
+
+# 요청 하나에 포함된 파일들의 전체 크기를 제한
+class UploadLimiter:
+    def __init__(
+            self,
+            max_file_size: int = settings.MAX_UPLOAD_FILE_SIZE,
+            max_request_size: int = settings.MAX_UPLOAD_REQUEST_SIZE
+    ):
+        self.max_file_size = max_file_size
+        self.remaining = max_request_size
+
+    def check_declared(self, file: UploadFile):
+        # 크기를 미리 알 수 있으면 읽기 전에 거절
+        if file.size is not None:
+            self._check(file.size, file.size)
+
+    def consume(self, file_size: int, chunk_size: int):
+        self._check(file_size, chunk_size)
+        self.remaining -= chunk_size
+
+    def _check(self, file_size: int, request_bytes: int):
+        if file_size > self.max_file_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"파일 하나의 크기는 {self.max_file_size} 바이트를 넘을 수 없습니다."
+            )
+        if request_bytes > self.remaining:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="요청의 전체 파일 크기가 허용 범위를 넘었습니다."
+            )
+
+
+def _write_chunk(out, chunk: bytes):
+    out.write(chunk)
+
+
+def _finish(out, tmp_path: str, dest_path: str):
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+    os.replace(tmp_path, dest_path)  # 같은 디렉터리 안에서의 rename은 원자적
+
+
+def _discard(out, tmp_path: str):
+    out.close()
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+# 디스크에 쓰지 않고 크기와 SHA-256만 계산 (읽은 뒤 파일 위치는 처음으로 되돌림)
+async def digest_upload(file: UploadFile, limiter: Optional[UploadLimiter] = None) -> StoredUpload:
+    limiter = limiter or UploadLimiter()
+    limiter.check_declared(file)
+
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        limiter.consume(size, len(chunk))
+        digest.update(chunk)
+    await file.seek(0)
+
+    return StoredUpload(path=None, size=size, sha256=digest.hexdigest())
+
+
+# 업로드 파일을 고정 크기 청크로 임시 파일에 쓰고, 완료되면 dest_path로 rename
+async def save_upload(file: UploadFile, dest_path: str, limiter: Optional[UploadLimiter] = None) -> StoredUpload:
+    limiter = limiter or UploadLimiter()
+    limiter.check_declared(file)
+
+    dest_dir = os.path.dirname(dest_path) or "."
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-")
+    out = os.fdopen(fd, "wb")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            limiter.consume(size, len(chunk))
+            digest.update(chunk)
+            await run_in_threadpool(_write_chunk, out, chunk)
+        await run_in_threadpool(_finish, out, tmp_path, dest_path)
+    except BaseException:
+        await run_in_threadpool(_discard, out, tmp_path)
+        raise
+
+    return StoredUpload(path=dest_path, size=size, sha256=digest.hexdigest())
+
+
+# Content-Length가 요청 상한을 넘으면 본문을 읽기 전에 413으로 거절하는 ASGI 미들웨어
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, max_request_size: int = settings.MAX_UPLOAD_REQUEST_SIZE, exempt_paths: tuple = ()):
+        self.app = app
+        # multipart 경계와 폼 필드를 위한 여유분
+        self.max_body_size = max_request_size + 64 * 1024
+        self.exempt_paths = exempt_paths  # 자체 크기 제한을 가진 경로 (대량 가져오기 등)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] in ("POST", "PUT") and scope["path"] not in self.exempt_paths:
+            for name, value in scope["headers"]:
+                if name == b"content-length" and value.isdigit() and int(value) > self.max_body_size:
+                    response = JSONResponse(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        content={"detail": "요청 본문이 너무 큽니다."}
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+import models.users  # noqa: F401 (테이블 등록)
+from database.connection import SQLITE_POOL, serialize_sqlite_transactions
+
+
+# 비동기 테스트는 asyncio로만 실행 (@pytest.mark.anyio)
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+# 모델 전체 스키마를 만든 임시 SQLite DB (파일이라 여러 연결이 같은 DB를 봄, 트랜잭션은 앱과 같게 설정)
+@pytest.fixture
+async def engine(tmp_path):
+    engine = serialize_sqlite_transactions(create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", **SQLITE_POOL
+    ))
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
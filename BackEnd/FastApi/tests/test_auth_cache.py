@@ -0,0 +1,96 @@
+import pytest
+from fastapi import HTTPException
+from auth import cache as cache_module
+from auth import jwt_handler
+from auth.authenticate import authenticate
+from auth.cache import TTLCache, invalidate_principal, principal_cache, token_cache, token_key
+from auth.jwt_handler import create_tokens, verify_jwt_token
+from models.users import User
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    token_cache.clear()
+    principal_cache.clear()
+    yield
+    token_cache.clear()
+    principal_cache.clear()
+
+
+def test_entries_expire_at_their_own_time(clock):
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1, expires_at=1010)
+    cache.set("b", 2, expires_at=1020)
+    clock.now = 1010
+    assert cache.get("a") is None  # exp 시각이 되면 바로 만료
+    assert cache.get("b") == 2
+    assert cache.stats()["size"] == 1
+
+
+def test_default_ttl_caps_explicit_expiry(clock):
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1, expires_at=2000)
+    clock.now = 1005
+    assert cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_verified_payload_is_cached_until_exp(monkeypatch):
+    token = create_tokens("a@x.com", 1, access_expires=60)["access_token"]
+    payload = verify_jwt_token(token)
+    assert token_cache.get(token_key(token)) == payload
+
+    # 캐시에서 꺼낼 때는 서명을 다시 검증하지 않음
+    monkeypatch.setattr(jwt_handler, "load_keys", lambda: pytest.fail("서명을 다시 검증함"))
+    assert verify_jwt_token(token) == payload
+
+    # exp가 지나면 캐시에서 빠지고, 토큰도 거부됨
+    monkeypatch.setattr(cache_module, "time", lambda: payload["exp"])
+    assert token_cache.get(token_key(token)) is None
+    monkeypatch.undo()
+    monkeypatch.setattr(jwt_handler, "time", lambda: payload["exp"] + 1)
+    with pytest.raises(HTTPException):
+        verify_jwt_token(token)
+
+
+@pytest.mark.anyio
+async def test_deleted_user_is_not_served_from_principal_cache(db):
+    user = User(id=1, email="a@x.com", password="x", username="a")
+    db.add(user)
+    await db.commit()
+    token = create_tokens("a@x.com", 1)["access_token"]
+
+    assert (await authenticate(token, db)).username == "a"
+    assert principal_cache.get(1)["username"] == "a"
+
+    # 사용자 삭제(#10)와 같은 순서: DB에서 지우고 캐시 무효화
+    await db.delete(user)
+    await db.commit()
+    invalidate_principal(1)
+    with pytest.raises(HTTPException) as error:
+        await authenticate(token, db)
+    assert error.value.status_code == 404
+    assert principal_cache.get(1) is None
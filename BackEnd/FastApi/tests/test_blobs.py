@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from fastapi import UploadFile
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models.users import Blob, FileModel, Page, User
+from starlette.datastructures import Headers
+from storage import backends, blobs, downloads
+from storage.backends import StorageRegistry
+from storage.blobs import acquire_blobs, detach_files, purge_files
+from storage.downloads import SendfileResponse, file_response
+from storage.uploads import StoredUpload
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(backends.settings, "UPLOAD_DIR", str(tmp_path / "blobs"))
+    registry = StorageRegistry("*=local")
+    monkeypatch.setattr(blobs, "storage", registry)
+    return registry
+
+
+@pytest.fixture
+async def page(db):
+    db.add(User(id=1, email="a@x.com", password="x", username="a"))
+    db.add(Page(id="p", title="t", owner_id=1))
+    await db.commit()
+
+
+def upload(data: bytes):
+    return UploadFile(io.BytesIO(data), filename="a.bin"), StoredUpload(None, len(data), hashlib.sha256(data).hexdigest())
+
+
+# 페이지 생성(#5)과 같이 blob 참조를 얻고 첨부 행을 만들어 커밋
+async def attach(session: AsyncSession, *contents: bytes) -> list:
+    written = []
+    uploads = [upload(data) for data in contents]
+    acquired = await acquire_blobs(session, uploads, written)
+    files = [
+        FileModel(filename="a.bin", fileurl=acquired[digest.sha256].path, blob_hash=digest.sha256,
+                  size=digest.size, page_id="p")
+        for _, digest in uploads
+    ]
+    session.add_all(files)
+    await session.commit()
+    return files
+
+
+# 페이지 삭제(#11)와 같이 참조를 반납하고 커밋한 뒤 저장소 정리
+async def detach(session: AsyncSession, files: list):
+    orphans = await detach_files(session, files)
+    await session.commit()
+    await purge_files(session, orphans)
+
+
+async def blob_rows(session: AsyncSession) -> dict:
+    rows = (await session.exec(select(Blob.hash, Blob.ref_count))).all()
+    return {row.hash: row.ref_count for row in rows}
+
+
+def sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def test_same_content_shares_one_blob(db, page, registry):
+    first = await attach(db, b"same", b"same", b"other")
+    second = await attach(db, b"same")
+    assert await blob_rows(db) == {sha(b"same"): 3, sha(b"other"): 1}
+    location = registry.for_size(4).location(sha(b"same"))
+    assert first[0].fileurl == second[0].fileurl == location
+    assert os.path.exists(location)
+
+    # 참조가 남아 있는 동안에는 내용을 지우지 않음
+    await detach(db, first)
+    assert await blob_rows(db) == {sha(b"same"): 1}
+    assert os.path.exists(location)
+    assert not os.path.exists(registry.for_size(5).location(sha(b"other")))
+
+    await detach(db, second)
+    assert await blob_rows(db) == {}
+    assert not os.path.exists(location)
+
+
+async def test_size_classes_route_small_content_into_rows(db, page, registry, monkeypatch):
+    routed = StorageRegistry("10=db,*=local")
+    monkeypatch.setattr(blobs, "storage", routed)
+    monkeypatch.setattr(downloads, "storage", routed)
+    small, large = b"0123456789", b"0123456789a"
+    files = await attach(db, small, large)
+
+    rows = {row.hash: row for row in (await db.exec(select(Blob.hash, Blob.backend, Blob.path, Blob.data))).all()}
+    assert (rows[sha(small)].backend, rows[sha(small)].data) == ("db", small)
+    assert (rows[sha(large)].backend, rows[sha(large)].data) == ("local", None)
+    assert not os.path.exists(registry.get("local").location(sha(small)))  # 작은 내용은 파일을 만들지 않음
+    assert os.path.exists(rows[sha(large)].path)
+
+    # 다운로드도 blob이 있는 백엔드에서: db는 행의 내용(Range 포함), local은 파일 전송
+    small_blob, large_blob = await db.get(Blob, sha(small)), await db.get(Blob, sha(large))
+    assert file_response(Headers(), files[0], small_blob).body == small
+    partial = file_response(Headers({"range": "bytes=2-4"}), files[0], small_blob)
+    assert (partial.status_code, partial.body) == (206, b"234")
+    sent = file_response(Headers(), files[1], large_blob)
+    assert isinstance(sent, SendfileResponse) and sent.file.name == large_blob.path
+    sent.file.close()
+
+    await detach(db, files)
+    assert await blob_rows(db) == {}
+    assert not os.path.exists(rows[sha(large)].path)
+
+
+async def test_purge_keeps_content_acquired_again_after_detach(db, engine, page, registry):
+    files = await attach(db, b"shared")
+    orphans = await detach_files(db, files)
+    await db.commit()
+
+    # 커밋과 저장소 정리 사이에 다른 요청이 같은 내용을 다시 올림
+    async with AsyncSession(engine, expire_on_commit=False) as other:
+        await attach(other, b"shared")
+    await purge_files(db, orphans)
+
+    location = registry.for_size(6).location(sha(b"shared"))
+    assert await blob_rows(db) == {sha(b"shared"): 1}
+    assert os.path.exists(location)
+
+
+async def test_concurrent_attach_and_detach_keep_counts_consistent(db, engine, page, registry):
+    contents = [b"alpha", b"beta"]
+    current = await attach(db, *contents)
+
+    # 같은 내용을 한쪽은 새로 붙이고 다른 쪽은 떼어 내는 요청을 여러 번 겹쳐 실행
+    async def remove(session: AsyncSession, ids: list):
+        await detach(session, (await session.exec(select(FileModel).where(FileModel.id.in_(ids)))).all())
+
+    async def replace(ids: list) -> list:
+        async with AsyncSession(engine, expire_on_commit=False) as adding, \
+                AsyncSession(engine, expire_on_commit=False) as removing:
+            added, _ = await asyncio.gather(attach(adding, *contents), remove(removing, ids))
+        return [file.id for file in added]
+
+    ids = [file.id for file in current]
+    for _ in range(10):
+        ids = await replace(ids)
+
+    assert await blob_rows(db) == {sha(data): 1 for data in contents}
+    file_rows = (await db.exec(select(FileModel.blob_hash))).all()
+    assert sorted(file_rows) == sorted(sha(data) for data in contents)
+    for data in contents:
+        assert os.path.exists(registry.for_size(len(data)).location(sha(data)))
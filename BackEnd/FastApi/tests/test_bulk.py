@@ -0,0 +1,133 @@
+import json
+from datetime import datetime
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models.users import FileModel, ImportJob, Page, User
+from services import bulk
+from services.bulk import PageImporter, export_ndjson, ndjson_lines
+from services.page_content import load_content
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def users(db):
+    db.add(User(id=1, email="a@x.com", password="x", username="a"))
+    db.add(User(id=2, email="b@x.com", password="x", username="b"))
+    await db.commit()
+
+
+@pytest.fixture(autouse=True)
+def export_session(engine, monkeypatch):
+    monkeypatch.setattr(bulk, "async_session", lambda: AsyncSession(engine, expire_on_commit=False))
+
+
+def ndjson(*records) -> bytes:
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode()
+
+
+async def chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def run_import(db, user_id: int, data: bytes, batch_size: int = 2) -> PageImporter:
+    user = await db.get(User, user_id)
+    job = ImportJob(id=f"job-{user_id}-{datetime.now().timestamp()}", owner_id=user_id)
+    db.add(job)
+    await db.commit()
+    importer = PageImporter(db, user, job, batch_size)
+    await importer.run(ndjson_lines(chunks(data), max_size=1 << 20))
+    return importer
+
+
+async def export(owner_id) -> bytes:
+    return "".join([part async for part in export_ndjson(owner_id)]).encode()
+
+
+SAMPLE = ndjson(
+    {"type": "page", "id": "p1", "title": "첫 페이지", "content": "안녕 " * 300, "public": False,
+     "created_at": "2024-03-01T09:00:00", "scheduled_at": "2024-03-02T09:00:00"},
+    {"type": "page", "id": "p2", "title": "둘째", "content": "", "created_at": "2024-03-03T09:00:00"},
+    {"type": "page", "id": "p3", "title": "셋째", "content": "본문", "created_at": "2024-03-04T09:00:00"},
+    {"type": "file", "filename": "a.txt", "fileurl": "files/a.txt", "size": 3, "page_id": "p1",
+     "created_at": "2024-03-01T09:00:00"},
+)
+
+
+async def test_export_round_trips_into_an_empty_database(db, users, tmp_path):
+    importer = await run_import(db, 1, SAMPLE)
+    assert (importer.job.status, importer.job.pages, importer.job.files, importer.skipped) == ("done", 3, 1, 0)
+    exported = await export(1)
+
+    # 내보낸 파일을 새 DB에 그대로 가져오면 같은 페이지/본문/첨부가 됨
+    other = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'other.db'}")
+    async with other.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(other, expire_on_commit=False) as target:
+        target.add(User(id=1, email="a@x.com", password="x", username="a"))
+        await target.commit()
+        copied = await run_import(target, 1, exported)
+        assert (copied.job.status, copied.job.pages, copied.job.files) == ("done", 3, 1)
+
+        def pages(rows):
+            return sorted(
+                (page.id, page.title, page.public, page.created_at, page.updated_at, page.scheduled_at, page.owner_id)
+                for page in rows
+            )
+
+        source_pages = (await db.exec(select(Page))).all()
+        target_pages = (await target.exec(select(Page))).all()
+        assert pages(source_pages) == pages(target_pages)
+        for page in target_pages:
+            assert await load_content(target, page.id) == await load_content(db, page.id)
+        files = (await target.exec(select(FileModel))).all()
+        assert [(file.filename, file.fileurl, file.size, file.page_id) for file in files] == [("a.txt", "files/a.txt", 3, "p1")]
+    await other.dispose()
+
+
+async def test_reimport_reports_each_existing_id_as_conflict(db, users):
+    await run_import(db, 1, SAMPLE)
+    importer = await run_import(db, 1, await export(1))
+    assert importer.job.status == "done"
+    assert (importer.job.pages, importer.job.files, importer.skipped) == (0, 0, 4)
+    assert [(conflict["line"], conflict["status"], conflict["id"]) for conflict in importer.conflicts] == [
+        (1, 409, "p1"), (2, 409, "p2"), (3, 409, "p3"), (4, 409, "p1")  # 건너뛴 페이지의 첨부도 건너뜀
+    ]
+    assert len((await db.exec(select(FileModel))).all()) == 1
+
+
+async def test_import_as_another_user_keeps_existing_pages(db, users):
+    await run_import(db, 1, SAMPLE)
+    data = await export(1) + ndjson({"type": "page", "id": "p9", "title": "새 페이지", "content": "x"})
+    importer = await run_import(db, 2, data)
+    assert (importer.job.status, importer.job.pages, importer.skipped) == ("done", 1, 4)
+    assert {page.id: page.owner_id for page in (await db.exec(select(Page))).all()} == {
+        "p1": 1, "p2": 1, "p3": 1, "p9": 2
+    }
+
+
+async def test_repeated_id_in_one_import_is_a_conflict(db, users):
+    data = ndjson(
+        {"type": "page", "id": "p1", "title": "a", "content": "a"},
+        {"type": "page", "id": "p1", "title": "b", "content": "b"},
+        {"type": "page", "title": "no id", "content": "c"},  # ID가 없으면 새로 만듦
+    )
+    importer = await run_import(db, 1, data, batch_size=10)
+    assert (importer.job.pages, importer.skipped) == (2, 1)
+    assert importer.conflicts[0]["line"] == 2
+    assert (await db.get(Page, "p1")).title == "a"
+
+
+async def test_race_after_the_check_fails_the_chunk_with_409(db, users, monkeypatch):
+    await run_import(db, 1, SAMPLE)
+
+    async def unchecked(self, records):
+        return [record for _, record in records]
+
+    monkeypatch.setattr(PageImporter, "_without_conflicts", unchecked)  # 확인과 INSERT 사이에 다른 요청이 넣은 경우
+    importer = await run_import(db, 1, ndjson({"type": "page", "id": "p1", "title": "x", "content": "x"}))
+    assert (importer.job.status, importer.error_status, importer.job.lines_done) == ("failed", 409, 0)
+    assert (await db.get(Page, "p1")).title == "첫 페이지"
@@ -0,0 +1,78 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import insert
+from models.users import Page, User
+from services.calendar import (
+    calendar_counts, calendar_pages, count_page_moved, count_pages_added, count_pages_removed, rebuild_day_counts
+)
+
+pytestmark = pytest.mark.anyio
+
+# (id, 소유자, 공개, 날짜) - 3월 1일~5일에 시각을 섞어 배치
+PAGES = [
+    ("a", 1, True, datetime(2024, 3, 1, 0, 0)),
+    ("b", 1, False, datetime(2024, 3, 1, 12, 0)),
+    ("c", 2, False, datetime(2024, 3, 1, 23, 59, 59)),
+    ("d", 2, True, datetime(2024, 3, 2, 8, 30)),
+    ("e", 1, False, datetime(2024, 3, 3, 9, 0)),
+    ("f", 2, True, datetime(2024, 3, 3, 18, 0)),
+    ("g", 2, False, datetime(2024, 3, 4, 6, 0)),
+    ("h", 1, True, datetime(2024, 3, 5, 15, 0)),
+    ("i", 2, True, datetime(2024, 3, 5, 23, 0)),
+]
+
+RANGES = [
+    (datetime(2024, 3, 1), datetime(2024, 3, 5, 23, 59, 59, 999999)),  # 온전한 날짜만 (집계 테이블)
+    (datetime(2024, 3, 1, 12, 0), datetime(2024, 3, 5, 15, 0)),  # 처음/마지막 날짜는 일부만
+    (datetime(2024, 3, 1, 6, 0), datetime(2024, 3, 1, 23, 0)),  # 하루 안의 일부
+    (datetime(2024, 3, 2, 9, 0), datetime(2024, 3, 3, 10, 0)),  # 이어진 두 날짜의 일부 (온전한 날짜 없음)
+    (datetime(2024, 2, 20), datetime(2024, 3, 2, 8, 30)),  # 경계 시각의 페이지 포함
+]
+
+
+@pytest.fixture
+async def pages(db):
+    db.add(User(id=1, email="a@x.com", password="x", username="a"))
+    db.add(User(id=2, email="b@x.com", password="x", username="b"))
+    rows = [Page(id=i, title=i, owner_id=owner, public=public, scheduled_at=at) for i, owner, public, at in PAGES]
+    await db.execute(insert(Page), [page.model_dump(exclude={"owner", "files"}) for page in rows])
+    await count_pages_added(db, rows)
+    await db.commit()
+    return rows
+
+
+# 기준값: 같은 범위의 페이지 목록을 날짜별로 센 것
+async def expected_counts(db, start, end, user_id):
+    return [{"date": day["date"], "count": len(day["pages"])} for day in await calendar_pages(db, start, end, user_id)]
+
+
+def as_strings(counts):
+    return [{"date": str(day["date"]), "count": day["count"]} for day in counts]
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+@pytest.mark.parametrize("user_id", [1, 2, 3])
+async def test_counts_match_pages_for_full_and_partial_days(db, pages, start, end, user_id):
+    assert as_strings(await calendar_counts(db, start, end, user_id)) == await expected_counts(db, start, end, user_id)
+
+
+async def test_counts_follow_moves_and_removals(db, pages):
+    start, end = RANGES[0]
+    moved = await db.get(Page, "b")
+    old_scheduled_at, old_public = moved.scheduled_at, moved.public
+    moved.scheduled_at, moved.public = datetime(2024, 3, 4, 10, 0), True
+    db.add(moved)
+    await count_page_moved(db, moved, old_scheduled_at, old_public)
+    removed = [await db.get(Page, page_id) for page_id in ("d", "h")]
+    for page in removed:
+        await db.delete(page)
+    await count_pages_removed(db, removed)
+    await db.commit()
+
+    for user_id in (1, 2):
+        assert as_strings(await calendar_counts(db, start, end, user_id)) == await expected_counts(db, start, end, user_id)
+
+    # 다시 계산한 집계도 같은 결과
+    before = await calendar_counts(db, start, end, 1)
+    await rebuild_day_counts(db)
+    assert await calendar_counts(db, start, end, 1) == before
@@ -0,0 +1,122 @@
+import pytest
+from fastapi import HTTPException
+from services import code_store as code_store_module
+from services.code_store import CodeStore, MemoryCodeStore, SqliteCodeStore, verify_code
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(code_store_module, "time", clock)
+    return clock
+
+
+def sequence(*codes):
+    codes = iter(codes)
+    return lambda: next(codes)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(generate) -> CodeStore:
+        if request.param == "sqlite":
+            return SqliteCodeStore(str(tmp_path / "codes.db"), ttl=60, generate=generate)
+        return MemoryCodeStore(ttl=60, generate=generate)
+    return make
+
+
+async def test_issue_get_find_delete(make_store, clock):
+    store = make_store(sequence("1111", "2222", "3333"))
+    assert await store.issue("a@x.com", {"username": "a"}) == "1111"
+    assert (await store.get("a@x.com")).data == {"username": "a"}
+    assert (await store.find("1111")).email == "a@x.com"
+
+    assert await store.issue("a@x.com", {"username": "a2"}) == "2222"  # 다시 요청하면 이전 코드는 무효
+    assert await store.find("1111") is None
+    assert (await store.get("a@x.com")).code == "2222"
+
+    await store.delete("a@x.com")
+    assert await store.get("a@x.com") is None
+    assert await store.find("2222") is None
+
+
+async def test_issue_skips_codes_in_use(make_store, clock):
+    store = make_store(sequence("1111", "1111", "2222"))
+    assert await store.issue("a@x.com", {}) == "1111"
+    assert await store.issue("b@x.com", {}) == "2222"  # a가 쓰는 코드는 건너뜀
+    assert (await store.find("1111")).email == "a@x.com"
+
+
+async def test_codes_and_failures_expire(make_store, clock):
+    store = make_store(sequence("1111", "1111"))
+    await store.issue("a@x.com", {})
+    assert await store.record_failure("ip:1") == 1
+    assert await store.record_failure("ip:1") == 2
+    clock.now += 61
+    assert await store.get("a@x.com") is None
+    assert await store.find("1111") is None
+    assert await store.failures("ip:1") == 0
+    assert await store.issue("b@x.com", {}) == "1111"  # 만료된 코드는 다시 쓸 수 있음
+    assert await store.record_failure("ip:1") == 1
+
+
+async def _verify(store, code, email, ip, max_attempts=3, max_ip_failures=5):
+    return await verify_code(store, code, email, ip, max_attempts=max_attempts, max_ip_failures=max_ip_failures)
+
+
+async def _rejected(status_code, *args, **kwargs):
+    with pytest.raises(HTTPException) as error:
+        await _verify(*args, **kwargs)
+    assert error.value.status_code == status_code
+
+
+async def test_code_is_invalidated_after_failures_from_any_ip(make_store, clock):
+    store = make_store(sequence("1234"))
+    await store.issue("a@x.com", {})
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):  # IP를 바꿔도 같은 코드에 대한 실패는 쌓임
+        await _rejected(400, store, "0000", "a@x.com", ip)
+    assert await store.get("a@x.com") is None
+    await _rejected(400, store, "1234", "a@x.com", "10.0.0.4")
+
+
+async def test_new_code_starts_a_new_failure_count(make_store, clock):
+    store = make_store(sequence("1234", "5678"))
+    await store.issue("a@x.com", {})
+    for _ in range(2):
+        await _rejected(400, store, "0000", "a@x.com", "10.0.0.1")
+    await store.issue("a@x.com", {})
+    for _ in range(2):
+        await _rejected(400, store, "0000", "a@x.com", "10.0.0.2")
+    assert (await _verify(store, "5678", "a@x.com", "10.0.0.3")).email == "a@x.com"
+
+
+async def test_failures_without_a_code_do_not_invalidate_later_codes(make_store, clock):
+    store = make_store(sequence("1234"))
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"):
+        await _rejected(400, store, "0000", "a@x.com", ip)
+    await store.issue("a@x.com", {})
+    assert (await _verify(store, "1234", "a@x.com", "10.0.0.5")).email == "a@x.com"
+
+
+async def test_ip_is_blocked_without_invalidating_codes(make_store, clock):
+    store = make_store(sequence("1234", "5678"))
+    await store.issue("a@x.com", {})
+    await store.issue("b@x.com", {})
+    for attempt in range(5):  # 코드만으로 확인: 이메일이 없으므로 IP별로만 셈
+        await _rejected(400, store, f"000{attempt}", None, "10.0.0.1")
+    await _rejected(429, store, "1234", None, "10.0.0.1")  # 맞는 코드여도 차단된 IP는 거부
+    assert (await _verify(store, "1234", None, "10.0.0.2")).email == "a@x.com"
+    assert (await _verify(store, "5678", "b@x.com", "10.0.0.2")).email == "b@x.com"
+
+    clock.now += 61
+    assert await store.failures("ip:10.0.0.1") == 0  # 실패 기록도 만료됨
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from starlette.datastructures import Headers
+from models.users import Blob, FileModel
+from storage.downloads import (
+    RangeNotSatisfiable, etag_matches, file_etag, file_last_modified, file_response, is_not_modified, parse_range
+)
+
+SHA256 = "ab" * 32
+DATA = b"0123456789"
+
+
+def _file(**values) -> FileModel:
+    return FileModel(**{
+        "id": 7, "filename": "노트.txt", "content_type": "text/plain", "size": len(DATA), "blob_hash": SHA256,
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 678000), **values
+    })
+
+
+def _blob() -> Blob:
+    return Blob(hash=SHA256, path=SHA256, size=len(DATA), ref_count=1, backend="db", data=DATA)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("items=0-1", None),
+    ("bytes=0-1,4-5", None),  # 여러 구간은 지원하지 않으므로 전체 전송
+    ("bytes=a-b", None),
+    ("bytes=0-0", (0, 0)),
+    ("bytes=2-4", (2, 4)),
+    ("bytes=7-", (7, 9)),
+    ("bytes=5-100", (5, 9)),
+    ("bytes=-3", (7, 9)),
+    ("bytes=-100", (0, 9)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, len(DATA)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=10-20", "bytes=5-4", "bytes=-0"])
+def test_parse_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, len(DATA))
+
+
+def test_etag_from_blob_hash_or_metadata():
+    assert file_etag(_file()) == f'"{SHA256}"'
+    legacy = _file(blob_hash=None)
+    assert file_etag(legacy) == f'"7-10-{int(legacy.created_at.timestamp())}"'
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"x"', True),
+    ('"y", "x"', True),
+    ('W/"x"', True),
+    ("*", True),
+    ('"y"', False),
+    ("x", False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"x"') is matches
+
+
+def test_is_not_modified():
+    last_modified = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    since = lambda value: Headers({"if-modified-since": format_datetime(value, usegmt=True)})
+    assert is_not_modified(Headers({"if-none-match": '"x"'}), '"x"', last_modified)
+    assert not is_not_modified(Headers({"if-none-match": '"y"'}), '"x"', last_modified)
+    assert is_not_modified(since(last_modified), '"x"', last_modified)
+    assert not is_not_modified(since(last_modified - timedelta(seconds=1)), '"x"', last_modified)
+    assert not is_not_modified(Headers({"if-modified-since": "yesterday"}), '"x"', last_modified)
+    # If-None-Match가 있으면 If-Modified-Since는 보지 않음
+    assert not is_not_modified(
+        Headers({"if-none-match": '"y"', "if-modified-since": format_datetime(last_modified, usegmt=True)}),
+        '"x"', last_modified
+    )
+
+
+def test_file_response_statuses():
+    file, blob = _file(), _blob()
+    etag = file_etag(file)
+
+    response = file_response(Headers({}), file, blob)
+    assert (response.status_code, response.body) == (200, DATA)
+    assert response.headers["etag"] == etag
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"] == "inline; filename*=UTF-8''%EB%85%B8%ED%8A%B8.txt"
+
+    response = file_response(Headers({"range": "bytes=2-4"}), file, blob)
+    assert (response.status_code, response.body, response.headers["content-range"]) == (206, b"234", "bytes 2-4/10")
+
+    response = file_response(Headers({"range": "bytes=20-"}), file, blob)
+    assert (response.status_code, response.headers["content-range"]) == (416, "bytes */10")
+
+    response = file_response(Headers({"if-none-match": etag}), file, blob)
+    assert (response.status_code, response.body) == (304, b"")
+
+    response = file_response(Headers({"if-modified-since": format_datetime(file_last_modified(file), usegmt=True)}), file, blob)
+    assert response.status_code == 304
+
+    # If-Range가 현재 ETag와 다르면 범위를 무시하고 전체 전송
+    response = file_response(Headers({"range": "bytes=2-4", "if-range": '"old"'}), file, blob)
+    assert (response.status_code, response.body) == (200, DATA)
+    response = file_response(Headers({"range": "bytes=2-4", "if-range": etag}), file, blob)
+    assert response.status_code == 206
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from auth import hash_password
+from auth.hash_password import HashingPool, HashPassword
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = HashingPool(workers=1, queue_limit=1)
+    monkeypatch.setattr(hash_password, "hash_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+# 테스트는 빠른 비용으로 해싱하고, 끝나면 공유 컨텍스트를 원래 설정으로 되돌림
+@pytest.fixture
+def rounds(monkeypatch):
+    def set_rounds(value: int):
+        monkeypatch.setattr(hash_password.settings, "BCRYPT_ROUNDS", value)
+        monkeypatch.setattr(hash_password, "_worker_context", None)
+    return set_rounds
+
+
+async def test_pool_rejects_beyond_workers_and_queue(pool):
+    release = threading.Event()
+    running = [asyncio.ensure_future(pool.submit(release.wait)) for _ in range(2)]  # 작업 1 + 대기 1
+    await asyncio.sleep(0)
+    assert pool.pending == 2
+
+    with pytest.raises(HTTPException) as error:
+        await pool.submit(release.wait)
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert pool.pending == 0
+    assert await pool.submit(len, "abc") == 3  # 자리가 나면 다시 받음
+
+
+async def test_hash_and_verify_on_pool(pool, rounds):
+    rounds(4)
+    hashed = await HashPassword().hash_password_async("secret")
+    assert hashed.startswith("$2b$04$")
+    assert await HashPassword().verify_and_update("secret", hashed) == (True, None)
+    assert (await HashPassword().verify_and_update("wrong", hashed))[0] is False
+
+
+async def test_verify_and_update_rehashes_after_cost_change(pool, rounds):
+    rounds(4)
+    hashed = await HashPassword().hash_password_async("secret")
+
+    rounds(5)  # BCRYPT_ROUNDS를 올린 뒤의 로그인
+    verified, new_hash = await HashPassword().verify_and_update("secret", hashed)
+    assert verified and new_hash.startswith("$2b$05$")
+    assert HashPassword().verify_password("secret", new_hash)
+
+    # 틀린 비밀번호로는 새 해시를 만들지 않음
+    assert await HashPassword().verify_and_update("wrong", hashed) == (False, None)
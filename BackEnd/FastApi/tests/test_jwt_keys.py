@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import hmac
+import json
+from time import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from fastapi import HTTPException
+from jose import jwt
+from auth import jwt_handler
+from auth.cache import token_cache
+from auth.jwt_handler import create_tokens, load_keys, verify_jwt_token
+from auth.jwt_keys import load_keyring
+
+GENERATORS = {
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": Ed25519PrivateKey.generate,
+}
+
+
+def write_key(key_dir, kid: str, algorithm: str):
+    private_key = GENERATORS[algorithm]()
+    (key_dir / f"{kid}.private.pem").write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    (key_dir / f"{kid}.public.pem").write_bytes(private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ))
+
+
+@pytest.fixture
+def keys(tmp_path, monkeypatch):
+    # 설정을 바꾸고 키를 다시 읽게 함 (kid 회전은 설정 변경 + 재시작과 같음)
+    def configure(spec: str, active: str):
+        monkeypatch.setattr(jwt_handler.settings, "JWT_KEYS", spec)
+        monkeypatch.setattr(jwt_handler.settings, "JWT_ACTIVE_KID", active)
+        monkeypatch.setattr(jwt_handler.settings, "JWT_KEY_DIR", str(tmp_path))
+        load_keys.cache_clear()
+        token_cache.clear()
+
+    yield configure
+    load_keys.cache_clear()
+    token_cache.clear()
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def payload(**extra) -> dict:
+    return {"user": "a@x.com", "user_id": 1, "exp": time() + 60, "type": "access", **extra}
+
+
+def rejected(token: str):
+    with pytest.raises(HTTPException) as error:
+        verify_jwt_token(token)
+    return error.value
+
+
+def header_kid(token: str) -> str:
+    return jwt.get_unverified_header(token)["kid"]
+
+
+@pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+def test_tokens_round_trip_per_algorithm(tmp_path, keys, algorithm):
+    write_key(tmp_path, "k1", algorithm)
+    keys(f"k1={algorithm}", "k1")
+    token = create_tokens("a@x.com", 1)["access_token"]
+    assert jwt.get_unverified_header(token)["alg"] == algorithm
+    assert verify_jwt_token(token)["user_id"] == 1
+
+
+def test_retired_kid_still_verifies_but_no_longer_signs(tmp_path, keys):
+    write_key(tmp_path, "old", "ES256")
+    keys("old=ES256", "old")
+    old_token = create_tokens("a@x.com", 1)["access_token"]
+
+    # 회전: 새 키로 서명하고, 이전 키는 공개 키만 남겨 검증에만 사용
+    write_key(tmp_path, "new", "EdDSA")
+    (tmp_path / "old.private.pem").unlink()
+    keys("new=EdDSA,old=ES256", "new")
+    keyring, signing_key = load_keys()
+    assert signing_key.kid == "new"
+    assert keyring["old"].private_key is None
+
+    assert verify_jwt_token(old_token)["user_id"] == 1
+    assert header_kid(create_tokens("a@x.com", 1)["access_token"]) == "new"
+
+    keys("new=EdDSA,old=ES256", "old")  # 개인 키가 없는 kid로는 서명할 수 없음
+    with pytest.raises(ValueError):
+        load_keys()
+
+
+def test_unknown_kid_is_rejected(tmp_path, keys):
+    write_key(tmp_path, "gone", "ES256")
+    keys("gone=ES256", "gone")
+    token = create_tokens("a@x.com", 1)["access_token"]
+
+    write_key(tmp_path, "k1", "ES256")
+    keys("k1=ES256", "k1")
+    assert "gone" in rejected(token).detail
+
+
+def test_signature_from_another_key_type_is_rejected(tmp_path, keys):
+    write_key(tmp_path, "ec", "ES256")
+    write_key(tmp_path, "ed", "EdDSA")
+    keys("ec=ES256,ed=EdDSA", "ec")
+    ec_key = load_keyring("ec=ES256", tmp_path)["ec"]
+    ed_key = load_keyring("ed=EdDSA", tmp_path)["ed"]
+
+    # kid가 가리키는 키의 알고리즘만 허용: ES256 서명에 EdDSA kid를 붙여도, 그 반대도 거부
+    rejected(jwt.encode(payload(), ec_key.private_key, algorithm="ES256", headers={"kid": "ed"}))
+    rejected(jwt.encode(payload(), ed_key.private_key, algorithm="EdDSA", headers={"kid": "ec"}))
+
+
+@pytest.mark.parametrize("kid", ["ec", "ed"])
+def test_hs256_signed_with_public_key_is_rejected(tmp_path, keys, kid):
+    write_key(tmp_path, "ec", "ES256")
+    write_key(tmp_path, "ed", "EdDSA")
+    keys("ec=ES256,ed=EdDSA", "ec")
+
+    # 공개 키 파일 내용을 HMAC 비밀 키로 쓴 위조 토큰 (알고리즘 혼동 공격)
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT", "kid": kid}).encode())
+    body = _b64(json.dumps(payload()).encode())
+    secret = (tmp_path / f"{kid}.public.pem").read_bytes()
+    signature = _b64(hmac.new(secret, f"{header}.{body}".encode(), hashlib.sha256).digest())
+    rejected(f"{header}.{body}.{signature}")
+
+
+def test_unsigned_token_is_rejected(tmp_path, keys):
+    write_key(tmp_path, "ec", "ES256")
+    keys("ec=ES256", "ec")
+    header = _b64(json.dumps({"alg": "none", "typ": "JWT", "kid": "ec"}).encode())
+    rejected(f"{header}.{_b64(json.dumps(payload()).encode())}.")
@@ -0,0 +1,73 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from services import metrics
+from services.metrics import MetricsMiddleware, instrument_engine, render_metrics
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    for metric in metrics.METRICS:
+        monkeypatch.setattr(metric, "values", {})
+
+
+@pytest.fixture
+async def client(engine):
+    instrument_engine(engine)
+    app = FastAPI()
+
+    # 경로 변수마다 라벨이 생기지 않고 템플릿으로 묶이는지 확인하려고 n을 경로로 받음
+    @app.get("/queries/{n}")
+    async def run_queries(n: int):
+        async with AsyncSession(engine) as session:
+            for _ in range(n):
+                await session.execute(text("SELECT 1"))
+        return {"n": n}
+
+    @app.get("/plain")
+    async def plain():
+        return {}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=MetricsMiddleware(app, n_plus_one_threshold=5)), base_url="http://t"
+    ) as client:
+        yield client
+
+
+def observed(metric, route: str) -> list:
+    return metric.values[(("method", "GET"), ("route", route))]
+
+
+async def test_sql_statements_are_counted_per_route(client):
+    for n in (1, 3):
+        assert (await client.get(f"/queries/{n}")).status_code == 200
+    await client.get("/plain")
+
+    # 요청 2번, SELECT 4개 + 트랜잭션마다 BEGIN IMMEDIATE 하나 (SQLite 엔진 설정, COMMIT은 세지 않음)
+    queries = observed(metrics.sql_queries, "/queries/{n}")
+    assert (queries[-1], queries[-2]) == (2, 6)
+    buckets = dict(zip(metrics.QUERY_BUCKETS, queries))
+    assert (buckets[2], buckets[5]) == (1, 1)  # 2개는 le=2, 4개는 le=5 버킷
+    assert observed(metrics.sql_queries, "/plain")[-2:] == [0, 1]
+    assert metrics.http_requests.values[(("method", "GET"), ("route", "/queries/{n}"), ("status", "200"))] == 2
+    assert metrics.n_plus_one.values == {}
+
+
+async def test_repeated_statement_is_reported_as_n_plus_one(client):
+    await client.get("/queries/6")
+    assert metrics.n_plus_one.values == {(("method", "GET"), ("route", "/queries/{n}")): 1}
+
+    text_format = render_metrics()
+    assert 'http_request_sql_queries_sum{method="GET",route="/queries/{n}"} 7' in text_format
+    assert 'http_request_sql_queries_bucket{method="GET",route="/queries/{n}",le="10"} 1' in text_format
+    assert 'http_request_n_plus_one_total{method="GET",route="/queries/{n}"} 1' in text_format
+
+
+async def test_unmatched_paths_share_one_label(client):
+    await client.get("/missing/1")
+    await client.get("/missing/2")
+    assert metrics.http_requests.values[(("method", "GET"), ("route", "unmatched"), ("status", "404"))] == 2
@@ -0,0 +1,66 @@
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.dialects import mysql, postgresql
+from sqlmodel import SQLModel
+from database import migrations
+from database.migrations import add_scheduled_public, backfill_page_terms
+from models.users import Page, PageBody, PageTerm
+from services.page_content import body_values
+from services.search import page_terms
+
+
+# 실행할 SQL만 모아 두는 연결 (DB 종류별로 만들어지는 DDL 확인용)
+class RecordingConnection:
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+
+
+def test_add_scheduled_public_fills_existing_rows():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE page (id VARCHAR PRIMARY KEY, title VARCHAR)"))
+        connection.execute(text("INSERT INTO page (id, title) VALUES ('p1', 'old')"))
+        add_scheduled_public(connection)
+        add_scheduled_public(connection)  # 이미 있으면 건너뜀
+        assert connection.execute(text("SELECT scheduled_public FROM page")).scalar_one() == 0
+        connection.execute(text("INSERT INTO page (id, title) VALUES ('p2', 'new')"))
+        assert connection.execute(text("SELECT scheduled_public FROM page WHERE id = 'p2'")).scalar_one() == 0
+
+
+def test_add_scheduled_public_renders_boolean_default_per_dialect(monkeypatch):
+    monkeypatch.setattr(migrations, "_columns", lambda connection, table_name: {"id"})
+    rendered = {}
+    for dialect in (postgresql.dialect(), mysql.dialect()):
+        connection = RecordingConnection(dialect)
+        add_scheduled_public(connection)
+        rendered[dialect.name] = connection.statements[0]
+    assert "DEFAULT false" in rendered["postgresql"]
+    assert "DEFAULT 0" not in rendered["postgresql"]
+    assert "DEFAULT false" in rendered["mysql"]
+
+
+def test_backfill_page_terms_indexes_only_unindexed_pages(monkeypatch):
+    monkeypatch.setattr(migrations, "BATCH_SIZE", 2)  # 여러 묶음에 걸쳐 실행
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    pages = [Page(id=f"p{i}", title=f"제목{i}", public=i % 2 == 0, owner_id=1) for i in range(5)]
+    contents = {"p0": "안녕 노트", "p1": "x" * 600, "p2": "", "p3": "본문", "p4": "Hello"}  # p1은 gzip으로 저장됨
+    with engine.begin() as connection:
+        connection.execute(insert(Page), [page.model_dump() for page in pages])
+        connection.execute(insert(PageBody), [body_values(page_id, content) for page_id, content in contents.items()])
+        # 이미 색인된 페이지는 그대로 둠
+        connection.execute(insert(PageTerm), [{"term": "old", "page_id": "p3", "weight": 1, "public": False, "owner_id": 1}])
+        backfill_page_terms(connection)
+        rows = connection.execute(select(PageTerm.page_id, PageTerm.term, PageTerm.weight, PageTerm.public)).all()
+
+    postings = {}
+    for row in rows:
+        postings.setdefault(row.page_id, {})[row.term] = (row.weight, row.public)
+    assert postings["p3"] == {"old": (1, False)}
+    for page in pages:
+        if page.id != "p3":
+            expected = {term: (weight, page.public) for term, weight in page_terms(page, contents[page.id]).items()}
+            assert postings[page.id] == expected
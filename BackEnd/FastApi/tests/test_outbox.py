@@ -0,0 +1,142 @@
+import asyncio
+import socket
+from email.mime.text import MIMEText
+import pytest
+from aiosmtpd.controller import Controller
+from fastapi import HTTPException
+from services import outbox as outbox_module
+from services.outbox import EmailOutbox
+
+pytestmark = pytest.mark.anyio
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _message(to: str) -> MIMEText:
+    message = MIMEText("code: 1234")
+    message["Subject"] = "Verification Code"
+    message["From"] = "noreply@example.com"
+    message["To"] = to
+    return message
+
+
+# 받은 메일을 기록하는 SMTP 서버. reject(받는 주소, 시도 횟수)가 True이면 451로 거절
+class RecordingHandler:
+    def __init__(self, reject=lambda rcpt, attempt: False):
+        self.reject = reject
+        self.attempts = {}
+        self.delivered = []
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        rcpt = envelope.rcpt_tos[0]
+        self.attempts[rcpt] = self.attempts.get(rcpt, 0) + 1
+        if self.reject(rcpt, self.attempts[rcpt]):
+            return "451 Try again later"
+        self.delivered.append(rcpt)
+        self.peers.add(session.peer)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    servers = []
+
+    def start(handler: RecordingHandler) -> RecordingHandler:
+        port = _free_port()
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        servers.append(controller)
+        for name, value in {
+            "SMTP_HOST": "127.0.0.1", "SMTP_PORT": port, "SMTP_STARTTLS": False, "SMTP_USER": None
+        }.items():
+            monkeypatch.setattr(outbox_module.settings, name, value)
+        return handler
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+def _outbox(**options) -> EmailOutbox:
+    return EmailOutbox(**{
+        "pool_size": 1, "batch_size": 10, "max_queue": 100, "max_retries": 3, "retry_base_delay": 0.01, **options
+    })
+
+
+async def _drain(outbox: EmailOutbox, done, timeout: float = 10.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not done():
+        assert loop.time() < deadline, outbox.stats()
+        await asyncio.sleep(0.01)
+
+
+async def test_delivers_all_messages_in_batches_over_one_connection(smtp_server):
+    handler = smtp_server(RecordingHandler())
+    outbox = _outbox()
+    connection = outbox.connections[0]
+    batches = []
+    send_batch = connection.send_batch
+
+    def recording_send_batch(messages):
+        batches.append(len(messages))
+        return send_batch(messages)
+
+    connection.send_batch = recording_send_batch
+
+    recipients = [f"user{i}@example.com" for i in range(25)]
+    for rcpt in recipients:
+        outbox.enqueue(_message(rcpt))
+    await outbox.start()
+    await _drain(outbox, lambda: outbox.sent == len(recipients))
+    await outbox.stop()
+
+    assert sorted(handler.delivered) == sorted(recipients)
+    assert batches == [10, 10, 5]  # 대기 중인 메일을 batch_size만큼 묶어서 발송
+    assert len(handler.peers) == 1  # 묶음 사이에도 연결을 재사용
+    assert outbox.stats()["failed"] == 0
+
+
+async def test_retries_temporary_failures(smtp_server):
+    handler = smtp_server(RecordingHandler(reject=lambda rcpt, attempt: rcpt.startswith("flaky") and attempt <= 2))
+    outbox = _outbox()
+
+    for rcpt in ["flaky@example.com", "ok@example.com"]:
+        outbox.enqueue(_message(rcpt))
+    await outbox.start()
+    await _drain(outbox, lambda: outbox.sent == 2)
+    await outbox.stop()
+
+    assert sorted(handler.delivered) == ["flaky@example.com", "ok@example.com"]
+    assert handler.attempts["flaky@example.com"] == 3
+    assert outbox.retried == 2
+    assert outbox.failed == 0
+    assert "451" in outbox.last_error
+
+
+async def test_gives_up_after_max_retries(smtp_server):
+    handler = smtp_server(RecordingHandler(reject=lambda rcpt, attempt: True))
+    outbox = _outbox(max_retries=2)
+
+    outbox.enqueue(_message("never@example.com"))
+    await outbox.start()
+    await _drain(outbox, lambda: outbox.failed == 1)
+    await outbox.stop()
+
+    assert handler.delivered == []
+    assert handler.attempts["never@example.com"] == 3  # 처음 1번 + 재시도 2번
+    assert outbox.retried == 2
+    assert outbox.retrying == 0
+
+
+def test_full_queue_rejects_with_503():
+    outbox = _outbox(max_queue=1)
+    outbox.enqueue(_message("a@example.com"))
+    with pytest.raises(HTTPException) as error:
+        outbox.enqueue(_message("b@example.com"))
+    assert error.value.status_code == 503
@@ -0,0 +1,98 @@
+import gzip
+import os
+from datetime import datetime
+import pytest
+from starlette.datastructures import Headers
+from models.users import Page, PageBody, User
+from services.page_content import (
+    EXCERPT_LENGTH, MIN_COMPRESS_SIZE, accepts_gzip, body_values, content_response, insert_contents, load_content,
+    make_excerpt
+)
+
+LONG = "본문 한 줄입니다.\n" * 100
+SHORT = "짧은 본문"
+
+
+def test_body_values_compress_only_when_large_and_smaller():
+    assert body_values("p", SHORT)["encoding"] == "identity"
+    assert body_values("p", "x" * (MIN_COMPRESS_SIZE - 1))["encoding"] == "identity"
+
+    stored = body_values("p", LONG)
+    assert stored["encoding"] == "gzip" and stored["size"] == len(LONG.encode())
+    assert gzip.decompress(stored["data"]).decode() == LONG
+    assert body_values("p", LONG)["data"] == stored["data"]  # mtime=0: 같은 본문은 같은 바이트
+
+    noise = os.urandom(MIN_COMPRESS_SIZE).hex()
+    assert len(body_values("p", noise)["data"]) <= len(noise.encode())  # 압축이 커지면 원문 저장
+
+
+def test_make_excerpt_collapses_whitespace_and_truncates():
+    assert make_excerpt("  a\n\n b\tc ") == "a b c"
+    excerpt = make_excerpt("단어 " * 200)
+    assert len(excerpt) <= EXCERPT_LENGTH and excerpt.endswith("…")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("deflate, gzip;q=0.5", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("identity", False),
+    ("", False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.fixture
+async def pages(db):
+    db.add(User(id=1, email="a@x.com", password="x", username="a"))
+    for page_id in ("long", "short", "empty"):
+        db.add(Page(id=page_id, title=page_id, owner_id=1, created_at=datetime(2024, 3, 1)))
+    await db.flush()
+    await insert_contents(db, [("long", LONG), ("short", SHORT)])
+    await db.commit()
+
+
+async def respond(db, page_id: str, **headers):
+    return await content_response(db, Headers(headers), await db.get(Page, page_id))
+
+
+@pytest.mark.anyio
+async def test_gzip_client_gets_stored_bytes(db, pages):
+    response = await respond(db, "long", **{"accept-encoding": "gzip, deflate"})
+    stored = await db.get(PageBody, "long")
+    assert stored.encoding == "gzip"
+    assert response.body == stored.data  # 다시 압축하지 않고 저장된 바이트 그대로
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(stored.data) < len(LONG.encode())
+    assert gzip.decompress(response.body).decode() == LONG
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("headers", [{}, {"accept-encoding": "gzip;q=0"}, {"accept-encoding": "br"}])
+async def test_other_clients_get_identity(db, pages, headers):
+    response = await respond(db, "long", **headers)
+    assert "content-encoding" not in response.headers
+    assert response.body.decode() == LONG
+
+
+@pytest.mark.anyio
+async def test_small_body_is_identity_even_for_gzip_clients(db, pages):
+    response = await respond(db, "short", **{"accept-encoding": "gzip"})
+    assert (await db.get(PageBody, "short")).encoding == "identity"
+    assert "content-encoding" not in response.headers
+    assert response.body.decode() == SHORT
+    assert await load_content(db, "short") == SHORT
+
+
+@pytest.mark.anyio
+async def test_missing_body_and_not_modified(db, pages):
+    assert (await respond(db, "empty")).body == b""
+
+    etag = (await respond(db, "long")).headers["etag"]
+    not_modified = await respond(db, "long", **{"if-none-match": etag, "accept-encoding": "gzip"})
+    assert (not_modified.status_code, not_modified.body) == (304, b"")
+    assert not_modified.headers["etag"] == etag
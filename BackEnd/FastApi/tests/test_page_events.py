@@ -0,0 +1,97 @@
+import asyncio
+import json
+from datetime import date
+from typing import Optional, Tuple
+import pytest
+from services.page_events import PageEventBus, PageEventHub, PageEvents
+from services.response_cache import USERS, CachedResponse, ResponseCache
+
+
+def hub(**kwargs) -> PageEventHub:
+    options = {"queue_size": 4, "max_connections": 10, "max_range_days": 31, "max_ranges": 3}
+    return PageEventHub(**{**options, **kwargs})
+
+
+def test_overlapping_ranges_keep_shared_days_indexed():
+    events = hub()
+    subscriber = events.connect(1)
+    events.subscribe(subscriber, "range", date(2024, 3, 1), date(2024, 3, 10))
+    events.subscribe(subscriber, "range", date(2024, 3, 5), date(2024, 3, 15))
+    assert events.stats()["indexed_days"] == 15
+
+    events.unsubscribe(subscriber, "range", date(2024, 3, 1), date(2024, 3, 10))
+    assert events.stats()["indexed_days"] == 11
+    assert subscriber in events._by_day[date(2024, 3, 5)]
+    assert date(2024, 3, 4) not in events._by_day
+
+    events.unsubscribe(subscriber, "range", date(2024, 3, 5), date(2024, 3, 15))
+    assert events.stats()["indexed_days"] == 0
+    assert subscriber.days == {}
+
+
+def test_ranges_per_subscriber_are_capped():
+    events = hub(max_ranges=2)
+    subscriber = events.connect(1)
+    events.subscribe(subscriber, "range", date(2024, 3, 1), date(2024, 3, 1))
+    events.subscribe(subscriber, "range", date(2024, 3, 2), date(2024, 3, 2))
+    events.subscribe(subscriber, "range", date(2024, 3, 2), date(2024, 3, 2))  # 같은 구간은 다시 세지 않음
+    with pytest.raises(ValueError):
+        events.subscribe(subscriber, "range", date(2024, 3, 3), date(2024, 3, 3))
+
+    events.unsubscribe(subscriber, "range", date(2024, 3, 1), date(2024, 3, 1))
+    events.subscribe(subscriber, "range", date(2024, 3, 3), date(2024, 3, 3))
+    assert len(subscriber.ranges) == 2
+
+
+def test_disconnect_clears_day_index():
+    events = hub()
+    first, second = events.connect(1), events.connect(2)
+    events.subscribe(first, "range", date(2024, 3, 1), date(2024, 3, 20))
+    events.subscribe(first, "range", date(2024, 3, 10), date(2024, 3, 31))
+    events.subscribe(second, "range", date(2024, 3, 15), date(2024, 3, 15))
+
+    events.disconnect(first)
+    assert events.stats()["connections"] == 1
+    assert list(events._by_day) == [date(2024, 3, 15)]
+    assert events._by_day[date(2024, 3, 15)] == {second}
+
+
+# 두 워커를 잇는 버스 (publish하면 상대 워커의 on_event 호출)
+class PairedBus(PageEventBus):
+    def __init__(self):
+        self.peer: Optional["PairedBus"] = None
+        self.on_event = None
+
+    async def start(self, on_event):
+        self.on_event = on_event
+
+    async def publish(self, message: str):
+        self.peer.on_event(json.loads(message)["event"])
+
+
+def worker(bus: PageEventBus) -> Tuple[PageEvents, ResponseCache]:
+    cache = ResponseCache(max_entries=10, max_bytes=10000, ttl=60)
+    return PageEvents(hub(), bus, cache), cache
+
+
+@pytest.mark.anyio
+async def test_cache_invalidations_reach_other_workers():
+    first_bus, second_bus = PairedBus(), PairedBus()
+    first_bus.peer, second_bus.peer = second_bus, first_bus
+    (first, first_cache), (second, second_cache) = worker(first_bus), worker(second_bus)
+    await first.start()
+    await second.start()
+    entry = CachedResponse(body=b"[]", etag='"e"', headers={}, tags={USERS}, span=None, expires_at=float("inf"))
+    second_cache.set("users", entry, second_cache._generation)
+    first_cache.set("users", entry, first_cache._generation)
+
+    first_cache.invalidate({USERS})
+    await asyncio.gather(*first._sending)
+    assert second_cache.get("users") is None
+    assert second.received == 1
+
+    second_cache.set("users", entry, second_cache._generation)
+    second_cache.clear()
+    await asyncio.gather(*second._sending)
+    assert first.received == 1  # 받은 쪽은 다시 보내지 않음
+    assert not first._sending
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.websockets import WebSocketDisconnect
+from auth.cache import invalidate_principal, principal_cache
+from auth.jwt_handler import create_tokens
+from models.users import User
+from routes import users as users_route
+from services.page_events import page_events
+
+
+# 사용자 한 명이 있는 임시 DB로 웹소켓 라우트만 띄움 (테스트 클라이언트는 자체 이벤트 루프를 씀)
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "socket.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, email="a@x.com", password="x", username="a"))
+        session.commit()
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    monkeypatch.setattr(users_route, "async_session", lambda: AsyncSession(async_engine, expire_on_commit=False))
+    principal_cache.clear()
+    app = FastAPI()
+    app.include_router(users_route.user_router, prefix="/user")
+    with TestClient(app) as client:
+        yield client
+    principal_cache.clear()
+
+
+def token(user_id: int = 1, expires: int = 3600) -> str:
+    return create_tokens("a@x.com", user_id, access_expires=expires)["access_token"]
+
+
+def closed_code(websocket) -> int:
+    with pytest.raises(WebSocketDisconnect) as error:
+        websocket.receive_text()
+    return error.value.code
+
+
+def test_socket_subscribes_with_valid_token(client):
+    with client.websocket_connect(f"/user/pages/events?token={token()}") as websocket:
+        websocket.send_json({"action": "subscribe", "topic": "own"})
+        assert websocket.receive_json()["type"] == "subscribed"
+
+
+def test_socket_rejects_missing_user(client):
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect(f"/user/pages/events?token={token(user_id=2)}"):
+            pass
+    assert error.value.code == 1008
+
+
+def test_socket_closes_when_token_expires(client):
+    with client.websocket_connect(f"/user/pages/events?token={token(expires=1)}") as websocket:
+        assert closed_code(websocket) == 1008  # 클라이언트가 아무것도 보내지 않아도 만료 시 닫힘
+
+
+def test_socket_rechecks_user_on_resubscribe(client, monkeypatch):
+    with client.websocket_connect(f"/user/pages/events?token={token()}") as websocket:
+        websocket.send_json({"action": "subscribe", "topic": "own"})
+        assert websocket.receive_json()["type"] == "subscribed"
+
+        async def missing(session, user_id):
+            return None
+
+        monkeypatch.setattr(users_route, "load_principal", missing)  # 그 사이 사용자가 삭제됨
+        invalidate_principal(1)
+        websocket.send_json({"action": "subscribe", "topic": "public"})
+        assert closed_code(websocket) == 1008
+
+
+def test_revoked_user_socket_is_closed(client):
+    with client.websocket_connect(f"/user/pages/events?token={token()}") as websocket:
+        websocket.send_json({"action": "subscribe", "topic": "own"})
+        assert websocket.receive_json()["type"] == "subscribed"
+        # 사용자 삭제(#10)와 같은 경로: 다른 워커에서 온 종료 메시지도 같은 방식으로 처리됨
+        client.portal.call(page_events._on_remote, {"type": "revoke", "user_id": 1})
+        assert closed_code(websocket) == 1008
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.pagination import decode_cursor, encode_cursor, keyset_predicate, paginate
+
+pytestmark = pytest.mark.anyio
+
+metadata = MetaData()
+item = Table(
+    "item", metadata,
+    Column("created_at", DateTime, nullable=False),
+    Column("id", String, primary_key=True),
+    Column("rank", Integer, nullable=False),
+)
+COLUMNS = [item.c.created_at, item.c.id]
+
+START = datetime(2024, 1, 1, 9, 30)
+# created_at이 같은 행이 여러 개 있어도 (created_at, id)로 순서가 정해짐
+ROWS = [
+    {"created_at": START + timedelta(minutes=i // 3), "id": f"{(i * 7) % 20:03d}", "rank": i}
+    for i in range(20)
+]
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.create_all)
+        await connection.execute(insert(item), ROWS)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 5, 6, 7, 8, 9, 123456), "page-id"]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor  # URL에 그대로 쓰도록 패딩 제거
+    assert decode_cursor(cursor, COLUMNS) == values
+
+
+def test_cursor_keeps_non_datetime_values():
+    columns = [item.c.rank, item.c.id]
+    assert decode_cursor(encode_cursor([3, None]), columns) == [3, None]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    encode_cursor(["only one value"]),
+    encode_cursor(["not a date", "id"]),
+    "eyJhIjogMX0",  # {"a": 1}
+])
+def test_invalid_cursor_is_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, COLUMNS)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("descending", [False, True])
+async def test_keyset_predicate_matches_tuple_comparison(session, descending):
+    ordered = sorted(ROWS, key=lambda row: (row["created_at"], row["id"]), reverse=descending)
+    for position, row in enumerate(ordered):
+        values = [row["created_at"], row["id"]]
+        ids = (await session.exec(
+            select(item.c.id)
+            .where(keyset_predicate(COLUMNS, values, descending))
+            .order_by(*(column.desc() if descending else column for column in COLUMNS))
+        )).all()
+        assert list(ids) == [later["id"] for later in ordered[position + 1:]]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 3, 7, 20, 50])
+async def test_paginate_visits_every_row_once(session, descending, limit):
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = await paginate(session, select(item.c.created_at, item.c.id, item.c.rank), COLUMNS, limit, cursor, descending)
+        assert len(rows) <= limit
+        seen.extend(row.id for row in rows)
+        pages += 1
+        if cursor is None:
+            break
+    expected = sorted(ROWS, key=lambda row: (row["created_at"], row["id"]), reverse=descending)
+    assert seen == [row["id"] for row in expected]
+    assert pages == max(1, -(-len(ROWS) // limit))
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import HTTPException
+from services import rate_limit
+from services.rate_limit import (
+    AuthLimiter, MemoryRateLimitStore, Rate, RateLimitStore, SqliteRateLimitStore, _take, parse_limits, parse_rate
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_parse_rate_and_limits():
+    assert parse_rate("5/60") == Rate(5.0, 5 / 60)
+    assert parse_rate("3") == Rate(3.0, 3.0)
+    assert parse_limits("ip=20/60, account=5/60") == {"ip": Rate(20.0, 20 / 60), "account": Rate(5.0, 5 / 60)}
+    assert parse_limits("") == {}
+
+
+def test_take_spends_and_refills():
+    rate = Rate(capacity=2, refill=0.5)  # 2번까지 몰아서, 2초에 1번씩 다시 참
+    tokens, retry_after, refill_seconds = _take(2, 0, rate)
+    assert (tokens, retry_after, refill_seconds) == (1, 0, 2)
+    tokens, retry_after, _ = _take(tokens, 0, rate)
+    assert (tokens, retry_after) == (0, 0)
+    tokens, retry_after, refill_seconds = _take(tokens, 1, rate)  # 1초 뒤에는 반 개만 참
+    assert (tokens, retry_after, refill_seconds) == (0.5, 1, 3)
+    assert _take(0, 100, rate)[0] == 1  # 오래 쉬어도 capacity를 넘지 않음
+    assert _take(0, -5, rate)[1] == 2  # 시계가 거꾸로 가도 토큰이 줄지 않음
+
+
+async def _exercise_store(store: RateLimitStore, clock: Clock):
+    rate = Rate(capacity=3, refill=1)
+    assert [await store.take("k", rate) for _ in range(3)] == [0, 0, 0]
+    assert await store.take("k", rate) == pytest.approx(1)
+    assert await store.take("other", rate) == 0  # 키마다 따로 셈
+    clock.now += 1.5
+    assert await store.take("k", rate) == 0
+    assert await store.take("k", rate) == pytest.approx(0.5)
+    clock.now += 10
+    assert await store.sweep() == 2  # 가득 찬 버킷은 정리
+    assert await store.sweep() == 0
+
+
+async def test_memory_store(clock):
+    await _exercise_store(MemoryRateLimitStore(), clock)
+
+
+async def test_sqlite_store(clock, tmp_path):
+    await _exercise_store(SqliteRateLimitStore(str(tmp_path / "limits.db")), clock)
+
+
+async def test_auth_limiter_rejects_with_retry_after(clock):
+    limiter = AuthLimiter(MemoryRateLimitStore(), {"signin": parse_limits("account=2/60")}, max_concurrency=4)
+    await limiter.hit("signin", "account", "A@example.com")
+    await limiter.hit("signin", "account", "a@example.com")  # 대소문자가 달라도 같은 계정
+    with pytest.raises(HTTPException) as error:
+        await limiter.hit("signin", "account", "a@example.com")
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "30"
+    assert limiter.stats()["rejected"] == {"signin_account": 1}
+    await limiter.hit("signin", "ip", "127.0.0.1")  # 설정되지 않은 범위는 제한 없음
+
+
+async def test_auth_limiter_disabled_or_store_down_allows(clock):
+    class BrokenStore(RateLimitStore):
+        async def take(self, key, rate):
+            raise ConnectionError("down")
+
+    limits = {"signin": parse_limits("account=1/60")}
+    disabled = AuthLimiter(MemoryRateLimitStore(), limits, max_concurrency=4, enabled=False)
+    broken = AuthLimiter(BrokenStore(), limits, max_concurrency=4)
+    for _ in range(3):
+        await disabled.hit("signin", "account", "a@example.com")
+        await broken.hit("signin", "account", "a@example.com")
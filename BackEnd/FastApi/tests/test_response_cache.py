@@ -0,0 +1,136 @@
+from datetime import datetime
+import pytest
+from starlette.requests import Request
+from services import response_cache as cache_module
+from services.response_cache import (
+    CALENDAR_PUBLIC, PAGE_TITLES, PUBLIC_PAGES, USERS, CachedResponse, ResponseCache, calendar_owner, invalidate_page
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def _entry(body: bytes = b"{}", tags=(PUBLIC_PAGES,), span=None, expires_at: float = float("inf")) -> CachedResponse:
+    return CachedResponse(body=body, etag='"e"', headers={}, tags=set(tags), span=span, expires_at=expires_at)
+
+
+def _cache(**options) -> ResponseCache:
+    return ResponseCache(**{"max_entries": 100, "max_bytes": 10000, "ttl": 60, **options})
+
+
+def _request(path: str = "/user/pages", query: str = "", headers=None) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": path, "query_string": query.encode(),
+        "headers": [(name.encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+def test_invalidate_by_tag():
+    cache = _cache()
+    cache.set("public", _entry(tags={PUBLIC_PAGES}), cache._generation)
+    cache.set("titles", _entry(tags={PAGE_TITLES}), cache._generation)
+    cache.invalidate({PUBLIC_PAGES})
+    assert cache.get("public") is None
+    assert cache.get("titles") is not None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_invalidate_calendar_only_when_day_in_span():
+    cache = _cache()
+    march = (datetime(2024, 3, 1), datetime(2024, 3, 31, 23, 59))
+    cache.set("march", _entry(tags={CALENDAR_PUBLIC}, span=march), cache._generation)
+    cache.set("list", _entry(tags={CALENDAR_PUBLIC}), cache._generation)
+
+    cache.invalidate({CALENDAR_PUBLIC}, [datetime(2024, 4, 1, 0, 0), None])
+    assert cache.get("march") is not None  # 범위 밖 날짜의 변경은 무시
+    assert cache.get("list") is None  # 범위가 없는 응답은 항상 무효화
+
+    cache.invalidate({CALENDAR_PUBLIC}, [datetime(2024, 3, 31, 23, 59, 59)])
+    assert cache.get("march") is None
+
+
+def test_response_built_during_invalidation_is_not_stored():
+    cache = _cache()
+    generation = cache._generation
+    cache.invalidate({PUBLIC_PAGES})  # build 도중 쓰기가 일어남
+    cache.set("stale", _entry(), generation)
+    assert cache.get("stale") is None
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = _cache(max_entries=2, max_bytes=10)
+    for key in ("a", "b"):
+        cache.set(key, _entry(b"12345"), cache._generation)
+    cache.get("a")  # a를 최근에 사용
+    cache.set("c", _entry(b"1"), cache._generation)
+    assert cache.get("b") is None and cache.get("a") is not None
+    cache.set("big", _entry(b"x" * 11), cache._generation)  # max_bytes보다 큰 응답은 저장하지 않음
+    assert cache.get("big") is None
+
+    monkeypatch.setattr(cache_module, "time", lambda: 10.0)
+    cache.set("old", _entry(b"1", expires_at=5.0), cache._generation)
+    assert cache.get("old") is None
+    assert cache.stats()["bytes"] <= 10
+
+
+async def test_serve_caches_and_answers_conditional_requests():
+    cache = _cache()
+    calls = []
+
+    async def build(response):
+        calls.append(1)
+        response.headers["X-Next-Cursor"] = "next"
+        return {"pages": [1, 2, 3]}
+
+    first = await cache.serve(_request(query="b=2&a=1"), "user:1", {PUBLIC_PAGES}, build)
+    second = await cache.serve(_request(query="a=1&b=2"), "user:1", {PUBLIC_PAGES}, build)  # 쿼리 순서는 무관
+    assert len(calls) == 1
+    assert first.body == second.body == b'{"pages":[1,2,3]}'
+    assert second.headers["x-next-cursor"] == "next"
+
+    etag = first.headers["etag"]
+    not_modified = await cache.serve(_request(query="a=1&b=2", headers={"if-none-match": etag}), "user:1", {PUBLIC_PAGES}, build)
+    assert (not_modified.status_code, not_modified.body) == (304, b"")
+
+    await cache.serve(_request(query="a=1&b=2"), "user:2", {PUBLIC_PAGES}, build)  # 가시성 범위가 다르면 따로 계산
+    assert len(calls) == 2
+    cache.invalidate({PUBLIC_PAGES})
+    await cache.serve(_request(query="a=1&b=2"), "user:1", {PUBLIC_PAGES}, build)
+    assert len(calls) == 3
+
+
+def test_invalidate_page_targets_owner_public_and_titles(monkeypatch):
+    cache = _cache()
+    monkeypatch.setattr(cache_module, "response_cache", cache)
+    for key, tags in {
+        "public": {PUBLIC_PAGES}, "titles": {PAGE_TITLES}, "owner1": {calendar_owner(1)}, "owner2": {calendar_owner(2)}
+    }.items():
+        cache.set(key, _entry(tags=tags), cache._generation)
+
+    invalidate_page(1, [False], [None], title_changed=False)  # 비공개 페이지: 소유자 응답만
+    assert [key for key in ("public", "titles", "owner1", "owner2") if cache.get(key)] == ["public", "titles", "owner2"]
+
+    invalidate_page(2, [False, True], [None])  # 공개였거나 공개가 된 페이지
+    assert [key for key in ("public", "titles", "owner2") if cache.get(key)] == []
+
+
+def test_invalidations_are_published_and_applied_without_echo():
+    source, target = _cache(), _cache()
+    published = []
+    source.subscribe(published.append)
+    target.subscribe(lambda message: pytest.fail("다른 워커에서 받은 무효화를 다시 보냄"))
+    march = (datetime(2024, 3, 1), datetime(2024, 3, 31, 23, 59))
+    target.set("march", _entry(tags={CALENDAR_PUBLIC}, span=march), target._generation)
+    target.set("users", _entry(tags={USERS}), target._generation)
+
+    source.invalidate({CALENDAR_PUBLIC}, [datetime(2024, 4, 2, 9, 0)])
+    source.invalidate({USERS})
+    assert published[0] == {"type": "invalidate", "tags": [CALENDAR_PUBLIC], "days": ["2024-04-02"]}
+    for message in published:
+        target.apply(message)
+    assert target.get("march") is not None  # 범위 밖의 날짜는 그대로
+    assert target.get("users") is None
+
+    source.clear()
+    target.apply(published[-1])
+    assert published[-1] == {"type": "invalidate", "clear": True}
+    assert target.get("march") is None
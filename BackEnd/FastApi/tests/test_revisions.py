@@ -0,0 +1,103 @@
+import json
+import zlib
+import httpx
+import pytest
+from fastapi import FastAPI
+from auth.authenticate import authenticate
+from database.connection import get_session
+from models.users import Page, PageRevision, User
+from routes import users as users_route
+from services.revisions import (
+    DELTA_RATIO, NO_NEWLINE, _content, _encode, _unified_diff, apply_delta, make_delta, record_revision
+)
+
+BASE = "".join(f"line {i}\n" for i in range(200))
+
+
+@pytest.mark.parametrize("base, content", [
+    ("", ""),
+    ("", "new page\n"),
+    ("old page\n", ""),
+    (BASE, BASE),
+    (BASE, BASE.replace("line 50\n", "changed 50\n")),
+    (BASE, "prepended\n" + BASE + "appended without newline"),
+    (BASE, BASE.replace("line 10\n", "").replace("line 150\n", "")),
+    (BASE, "\n".join(reversed(BASE.splitlines()))),
+    ("no trailing newline", "no trailing newline\nand more"),
+    ("a\r\nb\r\n", "a\r\nc\r\n"),
+    ("한글 줄\n둘째 줄\n", "한글 줄\n바뀐 줄\n"),
+])
+def test_delta_round_trip(base, content):
+    ops = make_delta(base, content)
+    assert apply_delta(base, ops) == content
+    assert apply_delta(base, json.loads(json.dumps(ops))) == content  # 저장 형식(JSON)을 거쳐도 같음
+
+
+def test_delta_copies_unchanged_lines_by_range():
+    ops = make_delta(BASE, BASE.replace("line 50\n", "changed 50\n"))
+    assert ops == [[0, 50], "changed 50\n", [51, 200]]
+
+
+def _revision(number: int, base: int, data: bytes) -> PageRevision:
+    return PageRevision(page_id="p", number=number, base=base, title="t", data=data, size=0)
+
+
+def test_encode_stores_small_changes_as_delta():
+    snapshot_data, is_delta = _encode(BASE, None)
+    assert not is_delta and zlib.decompress(snapshot_data).decode() == BASE
+    snapshot = _revision(1, 1, snapshot_data)
+
+    content = BASE.replace("line 99\n", "edited\n")
+    data, is_delta = _encode(content, snapshot)
+    assert is_delta and len(data) <= len(zlib.compress(content.encode())) * DELTA_RATIO
+    assert _content(_revision(2, 1, data), snapshot) == content
+
+
+def test_encode_falls_back_to_snapshot_for_rewrites():
+    snapshot = _revision(1, 1, _encode(BASE, None)[0])
+    content = "".join(f"completely different {i}\n" for i in range(200))
+    data, is_delta = _encode(content, snapshot)
+    assert not is_delta
+    assert _content(_revision(2, 2, data), None) == content
+
+
+@pytest.mark.parametrize("old, new, expected", [
+    ("a\nb", "a\nc", ["-b", NO_NEWLINE.rstrip("\n"), "+c", NO_NEWLINE.rstrip("\n")]),
+    ("a\nb\n", "a\nb", ["-b", "+b", NO_NEWLINE.rstrip("\n")]),
+    ("a\nb", "a\nb\nc\n", ["-b", NO_NEWLINE.rstrip("\n"), "+b", "+c"]),
+    ("a\r\nb\r\n", "a\r\nc\r\n", ["-b\r", "+c\r"]),
+])
+def test_unified_diff_marks_missing_final_newline(old, new, expected):
+    lines = _unified_diff(1, 2, old, new).split("\n")
+    assert lines[:2] == ["--- r1", "+++ r2"]
+    assert [line for line in lines[3:] if line and not line.startswith(" ")] == expected
+
+
+@pytest.fixture
+async def diff_client(db):
+    user = User(id=1, email="a@x.com", password="x", username="a")
+    db.add(user)
+    db.add(Page(id="p", title="t", owner_id=1))
+    await db.commit()
+
+    app = FastAPI()
+    app.include_router(users_route.user_router, prefix="/user")
+    app.dependency_overrides[get_session] = lambda: db
+    app.dependency_overrides[authenticate] = lambda: user
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_diff_endpoint_keeps_changed_last_lines_apart(db, diff_client):
+    page = await db.get(Page, "p")
+    for content in ("first\nlast", "first\nchanged"):
+        await record_revision(db, page, content, author_id=1)
+    await db.commit()
+
+    response = await diff_client.get("/user/pages/p/revisions/diff", params={"from": 1, "to": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["from"], body["to"], body["title_changed"]) == (1, 2, False)
+    assert body["diff"].endswith(f"-last\n{NO_NEWLINE}+changed\n{NO_NEWLINE}")
+    assert (await diff_client.get("/user/pages/p/revisions/diff", params={"from": 1, "to": 3})).status_code == 404
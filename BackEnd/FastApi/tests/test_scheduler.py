@@ -0,0 +1,16 @@
+from datetime import datetime, timedelta, timezone
+from services.scheduler import local_time
+
+
+def test_local_time_keeps_naive_values():
+    value = datetime(2024, 3, 1, 9, 0)
+    assert local_time(value) is value
+    assert local_time(None) is None
+
+
+def test_local_time_converts_aware_values():
+    utc = datetime(2024, 3, 1, 0, 0, tzinfo=timezone.utc)
+    seoul = utc.astimezone(timezone(timedelta(hours=9)))
+    assert local_time(utc).tzinfo is None
+    assert local_time(utc) == local_time(seoul) == utc.astimezone().replace(tzinfo=None)
+    assert local_time(datetime.now(timezone.utc) + timedelta(minutes=1)) > datetime.now()  # naive 값과 비교 가능
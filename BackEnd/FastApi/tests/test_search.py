@@ -0,0 +1,109 @@
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+from models.users import Page, PageTerm
+from services import search
+from services.search import TITLE_WEIGHT, index_new_pages, index_terms, page_terms, query_terms, search_pages
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fresh_page_count(monkeypatch):
+    monkeypatch.setattr(search, "_page_count", {"value": 0, "expires_at": 0.0})
+
+
+def test_index_terms_splits_hangul_into_unigrams_and_bigrams():
+    terms = index_terms("안녕하세요 노트")
+    assert {"안", "녕", "하", "세", "요", "노", "트"} <= set(terms)
+    assert {"안녕", "녕하", "하세", "세요", "노트"} <= set(terms)
+    assert "요노" not in terms  # 공백을 넘는 2-gram은 만들지 않음
+
+
+def test_index_terms_normalizes_words():
+    assert index_terms("Hello, WORLD hello") == {"hello": 2, "world": 1}
+    assert index_terms("ＦａｓｔＡＰＩ 2024") == {"fastapi": 1, "2024": 1}  # 전각 문자는 NFKC로 정규화
+    terms = index_terms("한국語テスト")  # 한글과 한자/가나는 서로 다른 토큰
+    assert {"한국", "語テ", "スト"} <= set(terms)
+    assert "국語" not in terms
+
+
+def test_query_terms_use_bigrams_for_longer_hangul():
+    assert query_terms("안") == {"안"}
+    assert query_terms("안녕하") == {"안녕", "녕하"}
+    assert query_terms("FastAPI 노트") == {"fastapi", "노트"}
+    assert query_terms("!!!") == set()
+
+
+def test_title_terms_are_weighted():
+    page = Page(id="p", title="노트", public=True, owner_id=1)
+    terms = page_terms(page, "노트 본문")
+    assert terms["노트"] == 1 + TITLE_WEIGHT
+    assert terms["본문"] == 1
+
+
+async def _add_pages(db, pages):
+    db.add_all(page for page, _ in pages)
+    await db.flush()
+    await index_new_pages(db, pages)
+    await db.commit()
+
+
+async def test_search_shows_public_and_own_pages_only(db):
+    await _add_pages(db, [
+        (Page(id="public", title="공개", public=True, owner_id=2), "여행 노트"),
+        (Page(id="private", title="비공개", public=False, owner_id=2), "여행 노트"),
+        (Page(id="mine", title="내 것", public=False, owner_id=1), "여행 노트"),
+    ])
+    result, _ = await search_pages(db, "여행", user_id=1)
+    assert {hit["id"] for hit in result["results"]} == {"public", "mine"}
+    result, _ = await search_pages(db, "여행", user_id=2)
+    assert {hit["id"] for hit in result["results"]} == {"public", "private"}
+
+
+async def test_search_requires_every_term(db):
+    await _add_pages(db, [
+        (Page(id="both", title="a", public=True, owner_id=1), "사과 노트"),
+        (Page(id="one", title="b", public=True, owner_id=1), "사과"),
+    ])
+    result, _ = await search_pages(db, "사과 노트", user_id=1)
+    assert [hit["id"] for hit in result["results"]] == ["both"]
+    result, cursor = await search_pages(db, "바나나", user_id=1)
+    assert (result["results"], cursor) == ([], None)
+
+
+async def test_search_cursor_walks_ranked_results_without_gaps(db):
+    # 점수가 같은 페이지가 여러 개 있어도 (점수, page_id) 순서로 이어짐
+    await _add_pages(db, [
+        (Page(id=f"p{i:02d}", title="제목", public=True, owner_id=1), "노트 " * (i % 4 + 1))
+        for i in range(11)
+    ])
+    expected, _ = await search_pages(db, "노트", user_id=1, size=100)
+    expected_ids = [hit["id"] for hit in expected["results"]]
+    assert len(expected_ids) == 11
+
+    seen, cursor = [], None
+    while True:
+        result, cursor = await search_pages(db, "노트", user_id=1, size=3, cursor=cursor)
+        seen += [hit["id"] for hit in result["results"]]
+        assert result["has_next"] == (cursor is not None)
+        if cursor is None:
+            break
+    assert seen == expected_ids
+    scores = [hit["score"] for hit in expected["results"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+async def test_search_rejects_malformed_cursor(db):
+    await _add_pages(db, [(Page(id="p", title="노트", public=True, owner_id=1), "")])
+    with pytest.raises(HTTPException) as error:
+        await search_pages(db, "노트", user_id=1, cursor="not-a-cursor")
+    assert error.value.status_code == 400
+
+
+async def test_index_new_pages_writes_postings(db):
+    page = Page(id="p", title="제목", public=False, owner_id=7)
+    await _add_pages(db, [(page, "본문")])
+    rows = (await db.exec(select(PageTerm).where(PageTerm.page_id == "p"))).all()
+    assert {row.term: row.weight for row in rows} == dict(page_terms(page, "본문"))
+    assert all((row.public, row.owner_id) == (False, 7) for row in rows)
@@ -0,0 +1,68 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from models.users import FileModel, Page, PageSummary, User
+from routes.users import select_page_summaries
+from services import serialization
+from services.serialization import FastJSONResponse, encode
+
+CONTENT = {
+    "naive": datetime(2024, 3, 1, 9, 0),
+    "micro": datetime(2024, 3, 1, 9, 0, 0, 123456),
+    "aware": datetime(2024, 3, 1, 9, 0, tzinfo=timezone(timedelta(hours=9))),
+    "utc": datetime(2024, 3, 1, 0, 0, tzinfo=timezone.utc),
+    "day": date(2024, 3, 1),
+    "text": "한글 \"따옴표\" \\ 줄\n바꿈 ✓",
+    "numbers": [0, -1, 2 ** 53, 1.5, True, False, None],
+    "nested": {"list": [{"a": 1}], "empty": {}},
+}
+
+
+# orjson이 있을 때와 없을 때(표준 json) 모두 확인
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson이 설치되어 있지 않음")
+    return request.param
+
+
+# 이전 응답: FastAPI 기본 JSONResponse(jsonable_encoder(...))
+def previous(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def test_fast_response_bytes_match_default_response(backend):
+    assert FastJSONResponse(CONTENT).body == previous(CONTENT)
+
+
+def test_int_keys_are_rendered_as_strings(backend):
+    assert json.loads(FastJSONResponse({1: "a"}).body) == json.loads(previous({1: "a"})) == {"1": "a"}
+
+
+def test_encode_falls_back_for_model_objects(backend):
+    page = PageSummary(id="p", title="t", public=True, created_at=datetime(2024, 3, 1), owner_id=1)
+    assert json.loads(encode([page])) == json.loads(previous([page]))
+
+
+@pytest.mark.anyio
+async def test_listing_rows_match_previous_page_summary_schema(db, backend):
+    db.add(User(id=1, email="a@x.com", password="x", username="a"))
+    db.add(Page(id="p1", title="첫", excerpt="요약", owner_id=1, created_at=datetime(2024, 3, 1, 9, 0, 0, 5),
+                scheduled_at=datetime(2024, 3, 2)))
+    db.add(Page(id="p2", title="둘", public=False, owner_id=1, created_at=datetime(2024, 3, 3),
+                updated_at=datetime(2024, 3, 4, 10, 30)))
+    db.add(FileModel(filename="a.txt", size=1, page_id="p1"))
+    db.add(FileModel(filename="b.txt", size=1, page_id="p1"))
+    await db.commit()
+
+    rows = (await db.exec(select_page_summaries().order_by(Page.id))).all()
+    body = FastJSONResponse([row._asdict() for row in rows]).body
+    # response_model=List[PageSummary]로 검증/변환했을 때와 같은 키와 값
+    expected = previous([PageSummary.model_validate(row._asdict()) for row in rows])
+    assert json.loads(body) == json.loads(expected)
+    assert list(json.loads(body)[0]) == list(PageSummary.model_fields)
+    assert [page["file_count"] for page in json.loads(body)] == [2, 0]
@@ -0,0 +1,97 @@
+import hashlib
+import io
+import os
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, UploadFile
+from storage import uploads
+from storage.uploads import UploadLimiter, UploadSizeLimitMiddleware, digest_upload, save_upload
+
+pytestmark = pytest.mark.anyio
+
+CHUNK_SIZE = 4
+
+
+# 읽기 요청 크기를 기록하는 파일 (청크 단위로만 읽는지 확인)
+class RecordingFile(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+def upload(data: bytes, declared: bool = False) -> UploadFile:
+    return UploadFile(RecordingFile(data), filename="a.bin", size=len(data) if declared else None)
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(uploads.settings, "UPLOAD_CHUNK_SIZE", CHUNK_SIZE)
+
+
+async def test_save_upload_reads_in_bounded_chunks(tmp_path):
+    data = b"0123456789"
+    file = upload(data)
+    stored = await save_upload(file, str(tmp_path / "out.bin"), UploadLimiter(max_file_size=100, max_request_size=100))
+    assert file.file.reads and all(size == CHUNK_SIZE for size in file.file.reads)
+    assert (tmp_path / "out.bin").read_bytes() == data
+    assert (stored.size, stored.sha256) == (len(data), hashlib.sha256(data).hexdigest())
+    assert os.listdir(tmp_path) == ["out.bin"]  # 임시 파일이 남지 않음
+
+
+async def test_save_upload_rejects_oversized_file_and_removes_partial_write(tmp_path):
+    file = upload(b"x" * 10)
+    with pytest.raises(HTTPException) as error:
+        await save_upload(file, str(tmp_path / "out.bin"), UploadLimiter(max_file_size=6, max_request_size=100))
+    assert error.value.status_code == 413
+    assert sum(size for size in file.file.reads) <= 2 * CHUNK_SIZE  # 상한을 넘은 청크에서 바로 멈춤
+    assert os.listdir(tmp_path) == []
+
+
+async def test_declared_size_is_rejected_before_reading(tmp_path):
+    file = upload(b"x" * 10, declared=True)
+    with pytest.raises(HTTPException) as error:
+        await save_upload(file, str(tmp_path / "out.bin"), UploadLimiter(max_file_size=6, max_request_size=100))
+    assert error.value.status_code == 413
+    assert file.file.reads == []
+    assert os.listdir(tmp_path) == []
+
+
+async def test_request_limit_spans_files(tmp_path):
+    limiter = UploadLimiter(max_file_size=10, max_request_size=15)
+    await save_upload(upload(b"a" * 10), str(tmp_path / "first"), limiter)
+    with pytest.raises(HTTPException) as error:
+        await save_upload(upload(b"b" * 10), str(tmp_path / "second"), limiter)
+    assert error.value.status_code == 413
+    assert os.listdir(tmp_path) == ["first"]
+
+
+async def test_digest_upload_rewinds_without_writing():
+    data = b"hello world"
+    file = upload(data)
+    stored = await digest_upload(file, UploadLimiter(max_file_size=100, max_request_size=100))
+    assert (stored.path, stored.size, stored.sha256) == (None, len(data), hashlib.sha256(data).hexdigest())
+    assert all(size == CHUNK_SIZE for size in file.file.reads)
+    assert await file.read() == data
+
+
+async def test_middleware_rejects_large_content_length():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def accept():
+        return {"ok": True}
+
+    @app.post("/import")
+    async def exempt():
+        return {"ok": True}
+
+    limited = UploadSizeLimitMiddleware(app, max_request_size=10, exempt_paths=("/import",))
+    body = b"x" * (64 * 1024 + 11)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=limited), base_url="http://t") as client:
+        assert (await client.post("/upload", content=body)).status_code == 413
+        assert (await client.post("/upload", content=b"small")).status_code == 200
+        assert (await client.post("/import", content=body)).status_code == 200